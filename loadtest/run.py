@@ -0,0 +1,272 @@
+"""
+Load test of the application intake flow against a running stack.
+
+Each virtual user repeatedly walks through what the Mini App does: it creates
+a web session, loads the form schema, autosaves the draft several times,
+uploads and links documents and submits the application. Every few
+iterations it also acts as an admin: lists applications, exports them to
+XLSX through a background job (start it, poll it, download the file) and
+downloads the documents of its application as a ZIP archive.
+
+Requests go through the Nginx gateway, so api-service runs against
+PostgreSQL and file-storage-service against MinIO, as in production.
+
+Run from the repository root once the stack is up (docker compose up -d):
+    python loadtest/run.py [--users 10] [--iterations 5] [--autosaves 10] [--files 2]
+    python loadtest/run.py --save-baseline loadtest/baseline.json
+    python loadtest/run.py --baseline loadtest/baseline.json [--tolerance 0.25]
+
+With --baseline, the run fails (exit code 1) if the p95 latency of any
+operation grew by more than the tolerance, or if any request failed. It also
+fails, before sending any load, if the baseline file does not exist: record
+one on the reference machine first.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+
+PERCENTILES = (50, 95, 99)
+# Latencies below this are dominated by noise, so they are not compared to the baseline.
+MIN_COMPARED_MS = 5.0
+JOB_POLL_INTERVAL_SECONDS = 0.5
+JOB_TIMEOUT_SECONDS = 120.0
+
+
+class Recorder:
+    """Collects the latency and outcome of every request, by operation."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+
+    @asynccontextmanager
+    async def measure(self, operation: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except (httpx.HTTPError, KeyError, ValueError):
+            self.errors[operation] += 1
+            raise
+        finally:
+            self.latencies[operation].append((time.perf_counter() - start) * 1000)
+
+    def summary(self, elapsed: float) -> dict[str, dict[str, float]]:
+        summary = {}
+        for operation, values in sorted(self.latencies.items()):
+            cut_points = (
+                statistics.quantiles(values, n=100, method='inclusive')
+                if len(values) > 1
+                else values * 99
+            )
+            summary[operation] = {
+                'count': len(values),
+                'errors': self.errors[operation],
+                'throughput': len(values) / elapsed,
+                **{f'p{p}': cut_points[p - 1] for p in PERCENTILES},
+                'max': max(values),
+            }
+        return summary
+
+
+async def call(
+    client: httpx.AsyncClient, recorder: Recorder, operation: str, method: str, url: str, **kwargs
+) -> httpx.Response:
+    async with recorder.measure(operation):
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        # Read streamed downloads completely, as a browser would.
+        await response.aread()
+    return response
+
+
+async def run_job(client: httpx.AsyncClient, recorder: Recorder, operation: str, url: str) -> None:
+    """
+    Starts a background job, polls it until it finishes and downloads its result,
+    measuring the whole flow as one operation, as an admin waiting for it would.
+    """
+    async with recorder.measure(operation):
+        response = await client.post(url)
+        response.raise_for_status()
+        job_url = response.headers['location']
+        job = response.json()
+        deadline = time.perf_counter() + JOB_TIMEOUT_SECONDS
+        while job['status'] in ('queued', 'running'):
+            if time.perf_counter() > deadline:
+                raise ValueError(f'job {job["id"]} did not finish in {JOB_TIMEOUT_SECONDS} s')
+            await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+            response = await client.get(job_url)
+            response.raise_for_status()
+            job = response.json()
+        if job['status'] != 'completed':
+            raise ValueError(f'job {job["id"]} failed: {job["error"]}')
+
+        download = await client.get(job['download_url'])
+        download.raise_for_status()
+
+
+async def intake(
+    client: httpx.AsyncClient, recorder: Recorder, user: int, autosaves: int, files: int
+) -> str:
+    """Fills in and submits one application, returning its UUID."""
+    response = await call(client, recorder, 'session.create', 'POST', '/api/v1/sessions/web')
+    application_uuid = response.json()['application_uuid']
+    public_url = f'/api/v1/applications/{application_uuid}'
+    await call(client, recorder, 'form.schema', 'GET', '/api/v1/forms/schema/active')
+
+    data = {'beneficiary_name': f'Load Test {user}', 'phone': f'+7916{user:07d}'}
+    for step in range(autosaves):
+        data[f'field_{step}'] = f'answer {step} ' * 20
+        await call(
+            client, recorder, 'draft.autosave', 'PATCH', f'{public_url}/public', json={'data': data}
+        )
+
+    for index in range(files):
+        document = os.urandom(256 * 1024)
+        response = await call(
+            client,
+            recorder,
+            'file.upload',
+            'POST',
+            '/api/v1/files/',
+            files={'file': (f'document_{index}.pdf', document, 'application/pdf')},
+        )
+        link = {
+            'file_id': response.json()['file_id'],
+            'original_filename': f'document_{index}.pdf',
+            'form_field_id': f'upload_{index}',
+        }
+        await call(client, recorder, 'file.link', 'POST', f'{public_url}/files', json=link)
+
+    await call(client, recorder, 'application.submit', 'POST', f'{public_url}/submit')
+    return application_uuid
+
+
+async def admin(
+    client: httpx.AsyncClient, recorder: Recorder, application_uuid: str, with_documents: bool
+) -> None:
+    admin_url = '/api/v1/admin/applications'
+    await call(client, recorder, 'admin.list', 'GET', f'{admin_url}/', params={'limit': 50})
+    await run_job(client, recorder, 'admin.export', f'{admin_url}/export')
+    if with_documents:
+        await call(
+            client,
+            recorder,
+            'admin.zip',
+            'GET',
+            f'{admin_url}/{application_uuid}/download-documents',
+        )
+
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, user: int, args) -> None:
+    for iteration in range(args.iterations):
+        try:
+            application_uuid = await intake(client, recorder, user, args.autosaves, args.files)
+            if iteration % args.admin_every == 0:
+                await admin(client, recorder, application_uuid, with_documents=args.files > 0)
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            # Already counted; carry on with the next iteration.
+            print(f'user {user}, iteration {iteration}: {e!r}', file=sys.stderr)
+
+
+def print_report(summary: dict[str, dict[str, float]], elapsed: float) -> None:
+    total = sum(stats['count'] for stats in summary.values())
+    print(f'{total} requests in {elapsed:.1f} s, {total / elapsed:.1f} req/s')
+    print(
+        f'{"operation":<20}{"count":>7}{"errors":>7}{"req/s":>8}'
+        f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"max ms":>9}'
+    )
+    for operation, stats in summary.items():
+        print(
+            f'{operation:<20}{stats["count"]:>7}{stats["errors"]:>7}{stats["throughput"]:>8.1f}'
+            f'{stats["p50"]:>9.1f}{stats["p95"]:>9.1f}{stats["p99"]:>9.1f}{stats["max"]:>9.1f}'
+        )
+
+
+def find_regressions(
+    summary: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float
+) -> list[str]:
+    """Returns a description of every operation that got slower or failed."""
+    regressions = []
+    for operation, stats in summary.items():
+        if stats['errors']:
+            regressions.append(f'{operation}: {stats["errors"]} failed requests')
+        reference = baseline.get(operation)
+        if reference is None or reference['p95'] < MIN_COMPARED_MS:
+            continue
+        if stats['p95'] > reference['p95'] * (1 + tolerance):
+            regressions.append(
+                f'{operation}: p95 {stats["p95"]:.1f} ms vs {reference["p95"]:.1f} ms in baseline'
+            )
+    return regressions
+
+
+async def run(args) -> dict[str, dict[str, float]]:
+    recorder = Recorder()
+    auth = (args.admin_user, args.admin_password)
+    limits = httpx.Limits(max_connections=args.users * 2)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, auth=auth, timeout=args.timeout, limits=limits
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(virtual_user(client, recorder, user, args) for user in range(args.users))
+        )
+        elapsed = time.perf_counter() - start
+
+    summary = recorder.summary(elapsed)
+    print_report(summary, elapsed)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--admin-user', default=os.getenv('ADMIN_USER', 'admin'))
+    parser.add_argument('--admin-password', default=os.getenv('ADMIN_PASSWORD', 'changeme'))
+    parser.add_argument('--users', type=int, default=10, help='concurrent virtual users')
+    parser.add_argument('--iterations', type=int, default=5, help='applications per user')
+    parser.add_argument('--autosaves', type=int, default=10, help='draft saves per application')
+    parser.add_argument('--files', type=int, default=2, help='documents per application')
+    parser.add_argument(
+        '--admin-every', type=int, default=5, help='admin actions every N iterations'
+    )
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--save-baseline', type=Path, help='store the results as the new baseline')
+    parser.add_argument('--baseline', type=Path, help='compare the results with this baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 growth ratio')
+    args = parser.parse_args()
+    if args.baseline and not args.baseline.exists():
+        sys.exit(f'No baseline at {args.baseline}; record one with --save-baseline.')
+
+    summary = asyncio.run(run(args))
+
+    if args.save_baseline:
+        if any(stats['errors'] for stats in summary.values()):
+            sys.exit('Some requests failed; not saving the baseline.')
+        args.save_baseline.write_text(json.dumps(summary, indent=2) + '\n')
+        print(f'Baseline saved to {args.save_baseline}')
+
+    if args.baseline:
+        regressions = find_regressions(
+            summary, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares the default FastAPI response rendering with the fast JSON path
+(app.core.responses.fast_json_response) for one page of the admin list.
+
+Run from services/api_service:
+    PYTHONPATH=src python benchmarks/bench_serialization.py [--rows 200] [--repeat 50]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from app.core.responses import fast_json_response
+from app.schemas.applications import ApplicationAdmin
+
+
+def make_application(index: int) -> SimpleNamespace:
+    """Builds an object shaped like a loaded Application with a realistic form payload."""
+    data = {f'field_{i}': f'answer {index}-{i} ' * 5 for i in range(60)}
+    data['children'] = [
+        {'name': f'Child {i}', 'age': i, 'diagnosis': 'text ' * 20} for i in range(3)
+    ]
+    files = [
+        SimpleNamespace(
+            id=index * 10 + i,
+            file_id=f'{uuid.uuid4()}.pdf',
+            original_filename=f'document_{i}.pdf',
+            form_field_id=f'upload_{i}',
+            created_at=datetime.now(UTC),
+        )
+        for i in range(3)
+    ]
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        status='new',
+        data=data,
+        admin_comment='Comment',
+        telegram_id=100000 + index,
+        created_at=datetime.now(UTC),
+        files=files,
+    )
+
+
+async def render_default(field, applications) -> bytes:
+    content = await serialize_response(field=field, response_content=applications)
+    return JSONResponse(content).body
+
+
+def render_fast(adapter: TypeAdapter, applications) -> bytes:
+    return fast_json_response(adapter, applications).body
+
+
+def measure(func, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    applications = [make_application(i) for i in range(args.rows)]
+    field = create_response_field(name='response', type_=list[ApplicationAdmin])
+    adapter = TypeAdapter(list[ApplicationAdmin])
+    loop = asyncio.new_event_loop()
+
+    def default():
+        return loop.run_until_complete(render_default(field, applications))
+
+    def fast():
+        return render_fast(adapter, applications)
+
+    size = len(fast())
+    print(f'{args.rows} rows, {size / 1024:.0f} KiB of JSON, {args.repeat} runs each')
+    for name, func in (('default', default), ('fast', fast)):
+        timings = measure(func, args.repeat)
+        print(f'{name:>8}: median {statistics.median(timings):7.2f} ms, min {min(timings):7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
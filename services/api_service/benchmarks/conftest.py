@@ -0,0 +1,168 @@
+"""
+Fixtures for the pytest-benchmark suite of the export and ZIP services.
+
+Run from services/api_service:
+    pytest benchmarks --no-cov --benchmark-only [--benchmark-large]
+    pytest benchmarks --no-cov --benchmark-only --benchmark-autosave   # store the results
+    pytest benchmarks --no-cov --benchmark-only --benchmark-compare    # compare with the last run
+
+Besides wall time, each benchmark records the peak Python heap allocation
+(tracemalloc) and the peak RSS of the process during one extra, untimed run
+in `extra_info`, which appears in the saved JSON results.
+"""
+
+import contextlib
+import json
+import random
+import resource
+import tracemalloc
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.models.db_models import Application, ApplicationFile
+
+
+FORM_SCHEMA_PATH = Path(__file__).parent.parent / 'src' / 'app' / 'static' / 'form_schema.json'
+LOREM = (
+    'Ребенку требуется коляска активного типа и курс реабилитации. Семья живет в небольшом '
+    'городе, мама воспитывает троих детей одна, собрать нужную сумму самостоятельно не удается. '
+)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        '--benchmark-large',
+        action='store_true',
+        help='Also run the largest sizes (100k-row export, 100 x 4 MiB archive).',
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    if config.getoption('--benchmark-large'):
+        return
+    skip_large = pytest.mark.skip(reason='needs --benchmark-large')
+    for item in items:
+        if 'large' in item.keywords:
+            item.add_marker(skip_large)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line('markers', 'large: benchmark sizes only run with --benchmark-large')
+
+
+def _form_fields() -> list[dict[str, Any]]:
+    schema = json.loads(FORM_SCHEMA_PATH.read_text(encoding='utf-8'))
+    return [
+        field
+        for step in schema['steps']
+        for field in step.get('fields', [])
+        if field['type'] not in ('info', 'file')
+    ]
+
+
+def _answer(field: dict[str, Any], rng: random.Random) -> Any:
+    field_type = field['type']
+    if field_type == 'textarea':
+        return LOREM * rng.randint(1, 6)
+    if field_type == 'single_choice_buttons':
+        return rng.choice(field['options'])
+    if field_type == 'multiple_choice_checkbox':
+        return rng.sample(field['options'], k=rng.randint(0, len(field['options'])))
+    if field_type == 'date':
+        return (datetime(2010, 1, 1) + timedelta(days=rng.randint(0, 5000))).strftime('%d.%m.%Y')
+    if field_type == 'phone':
+        return f'+7916{rng.randint(0, 9999999):07d}'
+    if field_type == 'email':
+        return f'user{rng.randint(0, 10**6)}@example.com'
+    return f'Иванов Иван Иванович {rng.randint(0, 10**6)}'
+
+
+@pytest.fixture(scope='session')
+def make_applications() -> Callable[[int], list[Application]]:
+    """
+    Returns a factory of transient Application objects whose `data` answers
+    every question of the bundled form schema, like a fully filled-in form.
+    """
+    fields = _form_fields()
+
+    def factory(count: int) -> list[Application]:
+        rng = random.Random(count)
+        now = datetime.now(UTC)
+        return [
+            Application(
+                id=uuid.uuid4(),
+                telegram_id=100000 + index,
+                status='new',
+                data={field['field_id']: _answer(field, rng) for field in fields},
+                admin_comment='Проверено' if index % 3 == 0 else None,
+                created_at=now,
+                updated_at=now,
+            )
+            for index in range(count)
+        ]
+
+    return factory
+
+
+@pytest.fixture(scope='session')
+def make_application_with_files() -> Callable[[int], Application]:
+    """Returns a factory of an Application with the given number of file records."""
+
+    def factory(count: int) -> Application:
+        application = Application(id=uuid.uuid4(), status='new', data={})
+        application.files = [
+            ApplicationFile(
+                file_id=f'{uuid.uuid4()}.pdf',
+                original_filename=f'document_{index}.pdf',
+                form_field_id='beneficiary_photos',
+            )
+            for index in range(count)
+        ]
+        return application
+
+    return factory
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS since the last reset; ru_maxrss is in KiB on Linux."""
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _reset_peak_rss() -> None:
+    # Linux only: writing 5 to clear_refs resets the VmHWM high-water mark.
+    with contextlib.suppress(OSError):
+        Path('/proc/self/clear_refs').write_text('5')
+
+
+@pytest.fixture
+def record_memory(benchmark) -> Callable[[Callable[[], Any]], None]:
+    """
+    Runs a function once outside the timed rounds and stores its peak heap
+    allocation and peak RSS in the benchmark's extra_info.
+    """
+
+    def measure(func: Callable[[], Any]) -> None:
+        _reset_peak_rss()
+        rss_before = _peak_rss_mb()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info['peak_alloc_mb'] = round(peak / 2**20, 2)
+        benchmark.extra_info['peak_rss_mb'] = round(_peak_rss_mb(), 2)
+        benchmark.extra_info['rss_growth_mb'] = round(_peak_rss_mb() - rss_before, 2)
+
+    return measure
@@ -0,0 +1,23 @@
+"""
+Benchmarks of the XLSX export (app.services.export_service) by number of rows.
+"""
+
+import pytest
+
+from app.services.export_service import generate_xlsx_export
+
+
+EXPORT_ROWS = [100, 1_000, 10_000, pytest.param(100_000, marks=pytest.mark.large)]
+
+
+@pytest.mark.parametrize('rows', EXPORT_ROWS)
+def test_generate_xlsx_export(benchmark, record_memory, make_applications, rows):
+    applications = make_applications(rows)
+    record_memory(lambda: generate_xlsx_export(applications))
+
+    result = benchmark.pedantic(
+        generate_xlsx_export, args=(applications,), rounds=max(1, min(10, 5_000 // rows))
+    )
+
+    benchmark.extra_info['output_mb'] = round(len(result.getvalue()) / 2**20, 2)
+    assert result.getvalue()[:2] == b'PK'
@@ -0,0 +1,67 @@
+"""
+Benchmarks of the documents ZIP archive (app.services.zip_service) by number
+and size of files. File storage and S3 are replaced with an in-process httpx
+transport, so the numbers cover fetching, buffering and compressing the
+documents, but not the network.
+"""
+
+import asyncio
+import os
+import zipfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services.zip_service import create_documents_zip_archive
+
+
+SETTINGS = SimpleNamespace(
+    FILE_STORAGE_SERVICE_URL='http://file-storage-service:8000',
+    S3_PUBLIC_URL='http://localhost:9000',
+    S3_ENDPOINT_URL='http://minio:9000',
+)
+ARCHIVE_SIZES = [
+    (1, 1024),
+    (10, 64),
+    (10, 1024),
+    (100, 64),
+    (100, 1024),
+    pytest.param(100, 4096, marks=pytest.mark.large),
+]
+
+
+def storage_transport(file_size: int) -> httpx.MockTransport:
+    """Serves download links and same-sized incompressible documents, like scans and photos."""
+    content = os.urandom(file_size)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith('/download-link'):
+            file_id = request.url.path.split('/')[-2]
+            return httpx.Response(
+                200, json={'download_url': f'{SETTINGS.S3_PUBLIC_URL}/bucket/{file_id}'}
+            )
+        return httpx.Response(200, content=content)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.parametrize(('files', 'file_kib'), ARCHIVE_SIZES)
+def test_create_documents_zip_archive(
+    benchmark, record_memory, make_application_with_files, files, file_kib
+):
+    application = make_application_with_files(files)
+    transport = storage_transport(file_kib * 1024)
+    client_class = httpx.AsyncClient
+
+    def build_archive():
+        with patch('httpx.AsyncClient', lambda: client_class(transport=transport)):
+            return asyncio.run(create_documents_zip_archive(application, SETTINGS))
+
+    record_memory(build_archive)
+    result = benchmark.pedantic(build_archive, rounds=max(1, min(10, 2000 // (files * file_kib))))
+
+    benchmark.extra_info['output_mb'] = round(len(result.getvalue()) / 2**20, 2)
+    with zipfile.ZipFile(result) as archive:
+        assert len(archive.namelist()) == files
@@ -3,14 +3,14 @@ import sys
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import engine_from_config
+from sqlalchemy import engine_from_config, text
 from sqlalchemy.pool import NullPool
 
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from app.core.config import settings
-from app.core.db import Base
+from app.core.db import STARTUP_LOCK_KEY, Base
 from app.models import db_models  # noqa: F401
 
 
@@ -44,6 +44,11 @@ def run_migrations_online() -> None:
         poolclass=NullPool,
     )
     with connectable.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Session-level lock, released when the connection is closed. Replicas
+            # starting together migrate one at a time; the others find nothing to do.
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': STARTUP_LOCK_KEY})
+            connection.commit()
         context.configure(connection=connection, target_metadata=target_metadata)
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,43 @@
+"""Add (telegram_id, created_at DESC) index
+
+Revision ID: 3c9d5e7f1a2b
+Revises: 1a2b3c4d5e6f
+Create Date: 2025-10-20 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '3c9d5e7f1a2b'
+down_revision: str | None = '1a2b3c4d5e6f'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    print('Creating index on applications (telegram_id, created_at DESC)...')
+    # CONCURRENTLY cannot run inside a transaction, but avoids locking writes on a large table.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_applications_telegram_id_created_at',
+            'applications',
+            ['telegram_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    print('Dropping index on applications (telegram_id, created_at DESC)...')
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_applications_telegram_id_created_at',
+            table_name='applications',
+            postgresql_concurrently=True,
+        )
+    print('Migration downgrade complete.')
@@ -0,0 +1,60 @@
+"""Make the (telegram_id, created_at DESC) index cover status
+
+Revision ID: 4d1e6f8a2b3c
+Revises: 3c9d5e7f1a2b
+Create Date: 2025-10-21 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '4d1e6f8a2b3c'
+down_revision: str | None = '3c9d5e7f1a2b'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # The new index is built before the old one is dropped, so lookups stay indexed.
+    with op.get_context().autocommit_block():
+        print('Creating covering index on applications (telegram_id, created_at DESC)...')
+        op.create_index(
+            'ix_applications_telegram_id_created_at_status',
+            'applications',
+            ['telegram_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_include=['status'],
+            postgresql_concurrently=True,
+        )
+
+        print('Dropping the non-covering index...')
+        op.drop_index(
+            'ix_applications_telegram_id_created_at',
+            table_name='applications',
+            postgresql_concurrently=True,
+        )
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        print('Re-creating the non-covering index...')
+        op.create_index(
+            'ix_applications_telegram_id_created_at',
+            'applications',
+            ['telegram_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+        print('Dropping the covering index...')
+        op.drop_index(
+            'ix_applications_telegram_id_created_at_status',
+            table_name='applications',
+            postgresql_concurrently=True,
+        )
+    print('Migration downgrade complete.')
@@ -0,0 +1,34 @@
+"""Add version column to applications for optimistic concurrency
+
+Revision ID: 5e2f7a9b3c4d
+Revises: 4d1e6f8a2b3c
+Create Date: 2025-10-24 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '5e2f7a9b3c4d'
+down_revision: str | None = '4d1e6f8a2b3c'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # A constant default is stored in the catalog, so existing rows are not rewritten.
+    print('Adding version column to applications...')
+    op.add_column(
+        'applications',
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+    )
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    print('Dropping version column from applications...')
+    op.drop_column('applications', 'version')
+    print('Migration downgrade complete.')
@@ -0,0 +1,103 @@
+"""Add form_version to applications and trigger-maintained application_stats
+
+Revision ID: 6f3a8b0c4d5e
+Revises: 5e2f7a9b3c4d
+Create Date: 2025-10-27 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '6f3a8b0c4d5e'
+down_revision: str | None = '5e2f7a9b3c4d'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    print('Adding form_version column to applications...')
+    op.add_column('applications', sa.Column('form_version', sa.String(), nullable=True))
+
+    print('Creating application_stats table...')
+    op.create_table(
+        'application_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('form_version', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'form_version', 'status'),
+    )
+
+    print('Creating triggers that maintain application_stats...')
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION application_stats_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE application_stats SET count = count - 1
+                WHERE day = (OLD.created_at AT TIME ZONE 'UTC')::date
+                  AND form_version = COALESCE(OLD.form_version, '')
+                  AND status = OLD.status;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO application_stats (day, form_version, status, count)
+                VALUES (
+                    (NEW.created_at AT TIME ZONE 'UTC')::date,
+                    COALESCE(NEW.form_version, ''),
+                    NEW.status,
+                    1
+                )
+                ON CONFLICT (day, form_version, status)
+                DO UPDATE SET count = application_stats.count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # CREATE TRIGGER locks out concurrent writes to applications until this
+    # transaction commits, so the backfill below cannot miss or double count rows.
+    op.execute(
+        """
+        CREATE TRIGGER applications_stats_insert_delete
+        AFTER INSERT OR DELETE ON applications
+        FOR EACH ROW EXECUTE FUNCTION application_stats_apply()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER applications_stats_status_update
+        AFTER UPDATE OF status ON applications
+        FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION application_stats_apply()
+        """
+    )
+
+    print('Backfilling application_stats from existing applications...')
+    op.execute(
+        """
+        INSERT INTO application_stats (day, form_version, status, count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, COALESCE(form_version, ''), status, count(*)
+        FROM applications
+        GROUP BY 1, 2, 3
+        """
+    )
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    print('Dropping application_stats triggers...')
+    op.execute('DROP TRIGGER IF EXISTS applications_stats_status_update ON applications')
+    op.execute('DROP TRIGGER IF EXISTS applications_stats_insert_delete ON applications')
+    op.execute('DROP FUNCTION IF EXISTS application_stats_apply()')
+
+    print('Dropping application_stats table...')
+    op.drop_table('application_stats')
+
+    print('Dropping form_version column from applications...')
+    op.drop_column('applications', 'form_version')
+    print('Migration downgrade complete.')
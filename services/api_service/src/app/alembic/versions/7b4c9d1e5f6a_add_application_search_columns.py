@@ -0,0 +1,93 @@
+"""Add full-text and trigram search columns to applications
+
+Revision ID: 7b4c9d1e5f6a
+Revises: 6f3a8b0c4d5e
+Create Date: 2025-10-29 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = '7b4c9d1e5f6a'
+down_revision: str | None = '6f3a8b0c4d5e'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Adding STORED generated columns rewrites the table once under an exclusive lock.
+    print('Adding search_vector column to applications...')
+    op.execute(
+        """
+        ALTER TABLE applications ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('russian'::regconfig,
+                coalesce(data->>'contact_person_name', '') || ' ' ||
+                coalesce(data->>'beneficiary_name', '')), 'A') ||
+            setweight(to_tsvector('simple'::regconfig,
+                coalesce(data->>'phone', '') || ' ' ||
+                coalesce(data->>'email', '') || ' ' ||
+                coalesce(data->>'city', '')), 'B') ||
+            setweight(json_to_tsvector('russian'::regconfig, data, '["string"]'), 'D')
+        ) STORED
+        """
+    )
+
+    print('Adding search_text column to applications...')
+    op.execute(
+        """
+        ALTER TABLE applications ADD COLUMN search_text text GENERATED ALWAYS AS (
+            lower(
+                coalesce(data->>'contact_person_name', '') || ' ' ||
+                coalesce(data->>'beneficiary_name', '') || ' ' ||
+                coalesce(data->>'email', '') || ' ' ||
+                regexp_replace(coalesce(data->>'phone', ''), '[^0-9]', '', 'g')
+            )
+        ) STORED
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        print('Creating GIN index on applications.search_vector...')
+        op.create_index(
+            'ix_applications_search_vector',
+            'applications',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+        print('Creating trigram index on applications.search_text...')
+        op.create_index(
+            'ix_applications_search_text_trgm',
+            'applications',
+            [sa.text('search_text gin_trgm_ops')],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        print('Dropping search indexes...')
+        op.drop_index(
+            'ix_applications_search_text_trgm',
+            table_name='applications',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_applications_search_vector',
+            table_name='applications',
+            postgresql_concurrently=True,
+        )
+
+    print('Dropping search columns from applications...')
+    op.drop_column('applications', 'search_text')
+    op.drop_column('applications', 'search_vector')
+    print('Migration downgrade complete.')
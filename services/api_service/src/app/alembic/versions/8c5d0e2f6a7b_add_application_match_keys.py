@@ -0,0 +1,111 @@
+"""Add application_match_keys for duplicate detection
+
+Revision ID: 8c5d0e2f6a7b
+Revises: 7b4c9d1e5f6a
+Create Date: 2025-10-31 10:00:00.000000
+
+"""
+
+import re
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '8c5d0e2f6a7b'
+down_revision: str | None = '7b4c9d1e5f6a'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 1000
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y')
+
+
+# The key normalization of app.services.duplicates as of this revision, copied so that
+# later changes to the application code cannot change what this migration backfills.
+def _normalize_phone(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return None
+    digits = re.sub(r'\D', '', value)
+    if len(digits) == 10:
+        digits = f'7{digits}'
+    elif len(digits) == 11 and digits.startswith('8'):
+        digits = f'7{digits[1:]}'
+    return digits if len(digits) >= 10 else None
+
+
+def _normalize_name(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return None
+    words = re.findall(r'\w+', value.lower().replace('ё', 'е'))
+    return ' '.join(sorted(words)) or None
+
+
+def _normalize_date(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _match_keys(data: dict[str, Any]) -> set[str]:
+    keys = set()
+    if phone := _normalize_phone(data.get('phone')):
+        keys.add(f'phone:{phone}')
+    email = data.get('email')
+    if isinstance(email, str) and '@' in email:
+        keys.add(f'email:{email.strip().lower()}')
+
+    name = _normalize_name(data.get('beneficiary_name'))
+    birth_date = _normalize_date(data.get('beneficiary_dob'))
+    if name and birth_date:
+        keys.add(f'name_dob:{name}|{birth_date}')
+    return keys
+
+
+def upgrade() -> None:
+    print('Creating application_match_keys table...')
+    match_keys_table = op.create_table(
+        'application_match_keys',
+        sa.Column('application_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('application_id', 'key'),
+    )
+    op.create_index(
+        op.f('ix_application_match_keys_key'), 'application_match_keys', ['key'], unique=False
+    )
+
+    if op.get_context().as_sql:
+        print('Offline mode: match keys of existing applications are not backfilled.')
+    else:
+        print('Computing match keys for submitted applications...')
+        applications = (
+            op.get_bind()
+            .execution_options(yield_per=BATCH_SIZE)
+            .execute(sa.text("SELECT id, data FROM applications WHERE status != 'draft'"))
+        )
+        for batch in applications.partitions():
+            rows = [
+                {'application_id': application_id, 'key': key}
+                for application_id, data in batch
+                for key in _match_keys(data or {})
+            ]
+            if rows:
+                op.bulk_insert(match_keys_table, rows)
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    print('Dropping application_match_keys table...')
+    op.drop_index(op.f('ix_application_match_keys_key'), table_name='application_match_keys')
+    op.drop_table('application_match_keys')
+    print('Migration downgrade complete.')
@@ -0,0 +1,44 @@
+"""Add application_archives for stored document archives
+
+Revision ID: ae7f2b4c8d9e
+Revises: 9d6e1f3a7b8c
+Create Date: 2025-11-14 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'ae7f2b4c8d9e'
+down_revision: str | None = '9d6e1f3a7b8c'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    print('Creating application_archives table...')
+    op.create_table(
+        'application_archives',
+        sa.Column('application_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('files_hash', sa.String(), nullable=False),
+        sa.Column('file_id', sa.String(), nullable=False),
+        sa.Column(
+            'created_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('application_id'),
+    )
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    print('Dropping application_archives table...')
+    op.drop_table('application_archives')
+    print('Migration downgrade complete.')
@@ -0,0 +1,42 @@
+"""Add heartbeat_at and run_after to jobs
+
+Revision ID: bf8a3c5d9e0f
+Revises: ae7f2b4c8d9e
+Create Date: 2025-11-21 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision: str = 'bf8a3c5d9e0f'
+down_revision: str | None = 'ae7f2b4c8d9e'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    print('Adding heartbeat_at and run_after columns to jobs...')
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        'jobs',
+        sa.Column(
+            'run_after',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+    )
+    # Jobs running during the upgrade have not sent a heartbeat yet.
+    op.execute("UPDATE jobs SET heartbeat_at = started_at WHERE status = 'running'")
+    print('Migration upgrade complete.')
+
+
+def downgrade() -> None:
+    print('Dropping heartbeat_at and run_after columns from jobs...')
+    op.drop_column('jobs', 'run_after')
+    op.drop_column('jobs', 'heartbeat_at')
+    print('Migration downgrade complete.')
@@ -1,25 +1,108 @@
+import logging
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status
-from fastapi.responses import StreamingResponse
+import httpx
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import RedirectResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import settings
-from app.core.dependencies import AppRepo
+from app.core.dependencies import AppRepo, JobRepo
+from app.core.responses import fast_json_response
+from app.repositories.applications import ApplicationRepository
 from app.schemas.applications import (
     ApplicationAdmin,
+    ApplicationAdminDetail,
     ApplicationAdminUpdate,
+    ApplicationBulkItemResult,
+    ApplicationBulkUpdate,
+    ApplicationBulkUpdateResponse,
     ApplicationPublic,
+    ApplicationStatsResponse,
     ApplicationStatus,
     ApplicationStatusResponse,
     ApplicationUpdate,
+    BulkUpdateResult,
+    DuplicateMatch,
     FileLinkRequest,
 )
-from app.services.export_service import generate_xlsx_export
-from app.services.zip_service import create_documents_zip_archive
+from app.schemas.jobs import JobKind, JobResponse
+from app.services.autosave import autosave_buffer
+from app.services.file_storage import get_download_url
+from app.services.status_events import status_event_bus, status_event_stream
+from app.services.zip_service import (
+    build_and_store_documents_archive,
+    discard_stored_archive,
+    documents_hash,
+)
 
 
 router = APIRouter()
 admin_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Serializers for the hot read endpoints, which bypass response_model processing.
+ADMIN_LIST_ADAPTER = TypeAdapter(list[ApplicationAdmin])
+ADMIN_DETAIL_ADAPTER = TypeAdapter(ApplicationAdminDetail)
+PUBLIC_ADAPTER = TypeAdapter(ApplicationPublic)
+
+
+async def _get_existing_status(repo: ApplicationRepository, application_uuid: UUID) -> str:
+    """
+    Returns the current status of an application or raises 404.
+    Used to explain why a guarded write did not match any row.
+    """
+    application_status = await repo.get_status(application_uuid)
+    if application_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Application with id {application_uuid} not found',
+        )
+    return application_status
+
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _parse_if_match(if_match: str | None) -> set[int] | None:
+    """
+    Returns the application versions accepted by an If-Match header, or None if
+    any version is accepted (no header or '*'). Weak tags are compared by value,
+    since the gateway may weaken ETags of compressed responses.
+    """
+    if if_match is None or if_match.strip() == '*':
+        return None
+    versions = set()
+    for tag in if_match.split(','):
+        tag = tag.strip().removeprefix('W/').strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
+
+
+async def _get_existing_state(
+    repo: ApplicationRepository, application_uuid: UUID, expected_versions: set[int] | None
+) -> str:
+    """
+    Returns the current status of an application after a guarded write did not
+    match. Raises 404 if it does not exist and 412 if it was modified since the
+    client read the version given in If-Match.
+    """
+    state = await repo.get_status_and_version(application_uuid)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Application with id {application_uuid} not found',
+        )
+    if expected_versions is not None and state.version not in expected_versions:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail='Application has been modified by another request. Reload it and retry.',
+        )
+    return state.status
 
 
 @admin_router.get(
@@ -36,34 +119,131 @@ async def get_all_applications(
     """
     (Admin) Retrieves a list of applications, with optional filtering and pagination.
     """
-    return await repo.get_all(status=status, limit=limit, offset=offset)
+    applications = await repo.get_all(status=status, limit=limit, offset=offset)
+    return fast_json_response(ADMIN_LIST_ADAPTER, applications)
 
 
 @admin_router.get(
     '/export',
-    response_class=StreamingResponse,
-    summary='(Admin) Export applications to an XLSX file',
+    status_code=status.HTTP_303_SEE_OTHER,
+    deprecated=True,
+    summary='(Admin) Start an XLSX export of all applications (deprecated)',
 )
-async def export_applications_to_xlsx(repo: AppRepo):
+async def export_applications_to_xlsx(job_repo: JobRepo):
     """
-    (Admin) Fetches all applications from the database, flattens the data,
-    and returns it as an XLSX file.
+    (Admin) Deprecated: use POST /export. Building the workbook blocked the
+    worker serving the request, so this endpoint now queues the same export
+    job and redirects to its status; fetch the file from its `download_url`.
     """
-    applications = await repo.get_all(limit=10000)  # A large limit to get all applications
-    xlsx_buffer = generate_xlsx_export(applications)
+    job = await job_repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+    return RedirectResponse(f'/api/v1/admin/jobs/{job.id}', status_code=status.HTTP_303_SEE_OTHER)
 
-    return StreamingResponse(
-        content=xlsx_buffer,
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={
-            'Content-Disposition': 'attachment; filename="applications_export.xlsx"',
-        },
-    )
+
+@admin_router.post(
+    '/export',
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary='(Admin) Start an XLSX export of all applications in the background',
+)
+async def submit_export_job(job_repo: JobRepo, response: Response):
+    """
+    (Admin) Queues an XLSX export for the job worker and returns the job at once.
+    Poll the URL in the Location header until the job is completed, then fetch
+    the file from its `download_url`.
+    """
+    job = await job_repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+    response.headers['Location'] = f'/api/v1/admin/jobs/{job.id}'
+    return job
+
+
+@admin_router.get(
+    '/search',
+    response_model=list[ApplicationAdmin],
+    summary='(Admin) Search applications by applicant data and answers',
+)
+async def search_applications(
+    repo: AppRepo,
+    q: str = Query(..., min_length=2, max_length=200, description='Name, phone, email or any text'),
+    status: ApplicationStatus | None = Query(None, description='Filter by application status'),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    """
+    (Admin) Finds applications by applicant names, phone, email and free-text
+    answers, most relevant first. Tolerates typos in names and any phone formatting.
+    """
+    applications = await repo.search(q, status=status, limit=limit, offset=offset)
+    return fast_json_response(ADMIN_LIST_ADAPTER, applications)
+
+
+@admin_router.get(
+    '/stats',
+    response_model=ApplicationStatsResponse,
+    summary='(Admin) Get application counts for the dashboard',
+)
+async def get_application_stats(
+    repo: AppRepo,
+    days: int = Query(30, ge=1, le=366, description='Number of recent days in by_day'),
+):
+    """
+    (Admin) Returns application counts by status, by form version and by
+    creation day. Served from incrementally maintained counters, so the cost
+    does not grow with the number of applications.
+    """
+    since = datetime.now(UTC).date() - timedelta(days=days - 1)
+    return await repo.get_stats(since=since)
+
+
+@admin_router.post(
+    '/bulk-update',
+    response_model=ApplicationBulkUpdateResponse,
+    summary='(Admin) Update the status or comment of many applications at once',
+)
+async def bulk_update_applications_admin(update_data: ApplicationBulkUpdate, repo: AppRepo):
+    """
+    (Admin) Applies a status change and/or comment to a list of applications, or
+    to the applications in `current_status` (in batches, see `has_more`), with a
+    single UPDATE in one transaction. Returns a result per application;
+    applications whose status does not allow the change are left untouched.
+    """
+    updated, has_more = await repo.bulk_update_admin_details(update_data)
+    results = [
+        ApplicationBulkItemResult(
+            application_id=application_id, result=BulkUpdateResult.UPDATED, status=new_status
+        )
+        for application_id, new_status in updated
+    ]
+
+    if update_data.application_ids is not None:
+        updated_ids = {application_id for application_id, _ in updated}
+        skipped_ids = [
+            application_id
+            for application_id in dict.fromkeys(update_data.application_ids)
+            if application_id not in updated_ids
+        ]
+        current_statuses = await repo.get_statuses(skipped_ids) if skipped_ids else {}
+        results.extend(
+            ApplicationBulkItemResult(
+                application_id=application_id,
+                result=(
+                    BulkUpdateResult.TRANSITION_NOT_ALLOWED
+                    if application_id in current_statuses
+                    else BulkUpdateResult.NOT_FOUND
+                ),
+                status=current_statuses.get(application_id),
+            )
+            for application_id in skipped_ids
+        )
+
+    if update_data.status is not None:
+        await status_event_bus.publish_many(updated)
+    return {'updated': len(updated), 'results': results, 'has_more': has_more}
 
 
 @admin_router.get(
     '/{application_uuid}/download-documents',
     response_class=StreamingResponse,
+    responses={307: {'description': 'Redirect to the stored archive in file storage'}},
     summary='(Admin) Download all documents for an application as a ZIP archive',
 )
 async def download_documents_as_zip(
@@ -71,8 +251,12 @@ async def download_documents_as_zip(
     repo: AppRepo,
 ):
     """
-    (Admin) Generates and streams a ZIP file containing all documents
-    attached to a specific application.
+    (Admin) Returns a ZIP file containing all documents attached to a specific
+    application.
+
+    The archive is built on the first request and stored in file storage;
+    while the application's documents stay the same, later requests are
+    redirected to a temporary link to the stored archive.
     """
     db_application = await repo.get_by_uuid(application_uuid, with_files=True)
 
@@ -87,7 +271,20 @@ async def download_documents_as_zip(
             detail='No documents found for this application.',
         )
 
-    zip_buffer = await create_documents_zip_archive(app=db_application, settings=settings)
+    archive_file_id = await repo.get_archive_file_id(
+        application_uuid, documents_hash(db_application)
+    )
+    if archive_file_id is not None:
+        try:
+            download_url = await get_download_url(archive_file_id, settings)
+            return RedirectResponse(download_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+        except httpx.HTTPError:
+            logger.warning(
+                f'Stored archive {archive_file_id} is unavailable, building it again.',
+                exc_info=True,
+            )
+
+    zip_buffer, _ = await build_and_store_documents_archive(db_application, repo, settings)
 
     zip_filename = f'application_docs_{application_uuid}.zip'
     return StreamingResponse(
@@ -97,9 +294,66 @@ async def download_documents_as_zip(
     )
 
 
+@admin_router.post(
+    '/{application_uuid}/download-documents',
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="(Admin) Start building the ZIP archive of an application's documents",
+)
+async def submit_documents_zip_job(
+    application_uuid: UUID, repo: AppRepo, job_repo: JobRepo, response: Response
+):
+    """
+    (Admin) Queues a ZIP archive of the application's documents for the job
+    worker and returns the job at once. Poll the URL in the Location header
+    until the job is completed, then fetch the archive from its `download_url`.
+    """
+    db_application = await repo.get_by_uuid(application_uuid, with_files=True)
+    if not db_application:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Application with id {application_uuid} not found',
+        )
+    if not db_application.files:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='No documents found for this application.',
+        )
+
+    job = await job_repo.enqueue(JobKind.DOCUMENTS_ZIP, {'application_uuid': str(application_uuid)})
+    response.headers['Location'] = f'/api/v1/admin/jobs/{job.id}'
+    return job
+
+
+@admin_router.post(
+    '/{application_uuid}/match-keys',
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary='(Admin) Re-index an application for duplicate detection',
+)
+async def submit_match_keys_job(
+    application_uuid: UUID, repo: AppRepo, job_repo: JobRepo, response: Response
+):
+    """
+    (Admin) Queues the indexing of a submitted application's identity data,
+    e.g. after its indexing at submission failed. Returns the job at once; poll
+    the URL in the Location header to follow it.
+    """
+    application_status = await _get_existing_status(repo, application_uuid)
+    if application_status == ApplicationStatus.DRAFT.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Drafts are not indexed for duplicate detection.',
+        )
+
+    job = await job_repo.enqueue(JobKind.MATCH_KEYS, {'application_uuid': str(application_uuid)})
+    response.headers['Location'] = f'/api/v1/admin/jobs/{job.id}'
+    return job
+
+
 @admin_router.get(
     '/{application_uuid}',
-    response_model=ApplicationAdmin,
+    response_model=ApplicationAdminDetail,
     summary='(Admin) Get detailed information for a single application',
 )
 async def get_application_details_admin(
@@ -107,7 +361,9 @@ async def get_application_details_admin(
     repo: AppRepo,
 ):
     """
-    (Admin) Retrieves full details for a specific application, including linked files.
+    (Admin) Retrieves full details for a specific application, including linked
+    files and other applications that share its phone, email or beneficiary.
+    The ETag header carries the application version for a later If-Match update.
     """
     db_application = await repo.get_by_uuid(application_uuid, with_files=True)
 
@@ -116,7 +372,13 @@ async def get_application_details_admin(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'Application with id {application_uuid} not found',
         )
-    return db_application
+    detail = ApplicationAdminDetail.model_validate(db_application)
+    detail.possible_duplicates = [
+        DuplicateMatch(**match) for match in await repo.get_possible_duplicates(application_uuid)
+    ]
+    return fast_json_response(
+        ADMIN_DETAIL_ADAPTER, detail, headers={'ETag': _etag(db_application.version)}
+    )
 
 
 @admin_router.patch(
@@ -128,19 +390,34 @@ async def update_application_admin(
     application_uuid: UUID,
     update_data: ApplicationAdminUpdate,
     repo: AppRepo,
+    response: Response,
+    if_match: str | None = Header(None),
 ):
     """
     (Admin) Updates an application's status or internal admin comment.
+    Status changes must be allowed by the status transition table.
+    With an If-Match header, the update is only applied if the application was
+    not modified since that version was read (otherwise 412 is returned).
     """
-    db_application = await repo.get_by_uuid(application_uuid)
+    expected_versions = _parse_if_match(if_match)
+    updated_application = await repo.update_admin_details(
+        application_uuid, update_data, expected_versions
+    )
 
-    if db_application is None:
+    if updated_application is None:
+        current_status = await _get_existing_state(repo, application_uuid, expected_versions)
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f'Application with id {application_uuid} not found',
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Cannot change status from '{current_status}' "
+                f"to '{update_data.status.value if update_data.status else current_status}'."
+            ),
         )
 
-    return await repo.update_admin_details(db_application, update_data)
+    if update_data.status is not None:
+        await status_event_bus.publish(application_uuid, updated_application.status)
+    response.headers['ETag'] = _etag(updated_application.version)
+    return updated_application
 
 
 @router.get(
@@ -156,14 +433,57 @@ async def get_application_status_public(
     Retrieves the current status of a single application by its UUID.
     This is a public endpoint for the web-widget to check status.
     """
-    db_application = await repo.get_by_uuid(application_uuid)
+    application_status = await repo.get_status(application_uuid)
 
-    if db_application is None:
+    if application_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'Application with id {application_uuid} not found',
         )
-    return {'status': db_application.status}
+    return {'status': application_status}
+
+
+@router.get(
+    '/{application_uuid}/public/status/stream',
+    response_class=StreamingResponse,
+    summary='Stream status changes of a specific application (Server-Sent Events)',
+)
+async def stream_application_status_public(
+    application_uuid: UUID,
+    request: Request,
+    repo: AppRepo,
+):
+    """
+    Opens a Server-Sent Events stream that sends the current status of the
+    application and then pushes every status change as it happens.
+    This replaces repeated polling of the status endpoint by the web-widget.
+    """
+    # Subscribe before reading the status so that no change can slip in between.
+    queue = status_event_bus.subscribe(application_uuid)
+    application_status = await repo.get_status(application_uuid)
+    # Release the pooled DB connection: the stream may stay open for minutes.
+    await repo.session.close()
+
+    if application_status is None:
+        status_event_bus.unsubscribe(application_uuid, queue)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f'Application with id {application_uuid} not found',
+        )
+
+    return StreamingResponse(
+        content=status_event_stream(
+            bus=status_event_bus,
+            application_id=application_uuid,
+            queue=queue,
+            initial_status=application_status,
+            is_disconnected=request.is_disconnected,
+            keepalive_seconds=settings.STATUS_STREAM_KEEPALIVE_SECONDS,
+            max_seconds=settings.STATUS_STREAM_MAX_SECONDS,
+        ),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 @router.get(
@@ -177,14 +497,18 @@ async def get_application_data_public(
 ):
     """
     Retrieves the current data for an application, used by the Mini App to resume.
+    The ETag header carries the application version for a later If-Match save.
     """
+    await autosave_buffer.flush(application_uuid)
     db_application = await repo.get_by_uuid(application_uuid)
     if db_application is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'Application with id {application_uuid} not found',
         )
-    return db_application
+    return fast_json_response(
+        PUBLIC_ADAPTER, db_application, headers={'ETag': _etag(db_application.version)}
+    )
 
 
 @router.patch(
@@ -196,24 +520,53 @@ async def save_application_progress(
     application_uuid: UUID,
     application_in: ApplicationUpdate,
     repo: AppRepo,
+    response: Response,
+    if_match: str | None = Header(None),
 ):
     """
     Saves the user's progress from the Mini App.
+
+    With an If-Match header, the save is only applied if the application was not
+    modified since that version was read (otherwise 412 is returned), and the new
+    version is returned in the ETag header.
+
+    If autosave coalescing is enabled, saves without If-Match are buffered and
+    written to the database together with subsequent saves (see AutosaveBuffer);
+    their response carries no ETag, since the new version is not known yet.
     """
-    db_application = await repo.get_by_uuid(application_uuid)
-    if db_application is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f'Application with id {application_uuid} not found',
-        )
+    expected_versions = _parse_if_match(if_match)
+    if expected_versions is not None:
+        # A conditional save must be checked against the latest written version.
+        await autosave_buffer.flush(application_uuid)
+    elif autosave_buffer.enabled:
+        # A pending save means the draft status was already checked in this window.
+        if not autosave_buffer.has_pending(application_uuid):
+            current_status = await _get_existing_status(repo, application_uuid)
+            if current_status != ApplicationStatus.DRAFT.value:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail='Can only update applications in draft status.',
+                )
+        autosave_buffer.save(application_uuid, application_in.data)
+        return {
+            'id': application_uuid,
+            'status': ApplicationStatus.DRAFT,
+            'data': application_in.data,
+        }
+
+    updated_application = await repo.update_progress(
+        application_uuid, application_in, expected_versions
+    )
 
-    if db_application.status != ApplicationStatus.DRAFT.value:
+    if updated_application is None:
+        await _get_existing_state(repo, application_uuid, expected_versions)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Can only update applications in draft status.',
         )
 
-    return await repo.update_progress(db_application, application_in)
+    response.headers['ETag'] = _etag(updated_application.version)
+    return updated_application
 
 
 @router.post(
@@ -230,11 +583,12 @@ async def link_file_to_application(
     After a file is uploaded to the file-storage-service, the Mini App calls
     this endpoint to create a record linking the file_id to the application.
     """
-    db_application = await repo.get_by_uuid(application_uuid)
-    if not db_application:
+    if await repo.get_status(application_uuid) is None:
         raise HTTPException(status_code=404, detail='Application not found')
 
-    await repo.link_file(application_uuid, file_link)
+    stale_archive_id = await repo.link_file(application_uuid, file_link)
+    if stale_archive_id is not None:
+        await discard_stored_archive(stale_archive_id, settings)
     return {'message': 'File linked successfully'}
 
 
@@ -246,22 +600,27 @@ async def link_file_to_application(
 async def submit_application(
     application_uuid: UUID,
     repo: AppRepo,
+    job_repo: JobRepo,
 ):
     """
-    Finalizes the application, changing its status from 'draft' to 'new'.
+    Finalizes the application, changing its status from 'draft' to 'new', and
+    queues the indexing of its identity data for duplicate detection.
     """
-    db_application = await repo.get_by_uuid(application_uuid)
-    if db_application is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f'Application with id {application_uuid} not found',
-        )
-
-    if db_application.status != ApplicationStatus.DRAFT.value:
+    await autosave_buffer.flush(application_uuid)
+    if not await repo.submit_application(application_uuid):
+        await _get_existing_status(repo, application_uuid)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Application has already been submitted.',
         )
 
-    await repo.submit_application(db_application)
+    await status_event_bus.publish(application_uuid, ApplicationStatus.NEW.value)
+
+    try:
+        await job_repo.enqueue(JobKind.MATCH_KEYS, {'application_uuid': str(application_uuid)})
+    except SQLAlchemyError:
+        # The application is already submitted; an admin can queue the indexing again
+        # with POST /admin/applications/{uuid}/match-keys.
+        logger.error(f'Failed to queue match keys indexing for {application_uuid}', exc_info=True)
+
     return {'message': 'Application submitted successfully'}
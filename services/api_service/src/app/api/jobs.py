@@ -0,0 +1,41 @@
+import logging
+from uuid import UUID
+
+import httpx
+from fastapi import APIRouter, HTTPException, status
+
+from app.core.config import settings
+from app.core.dependencies import JobRepo
+from app.schemas.jobs import JobResponse, JobStatus
+from app.services.file_storage import get_download_url
+
+
+admin_router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@admin_router.get(
+    '/{job_id}',
+    response_model=JobResponse,
+    summary='(Admin) Get the status of a background job',
+)
+async def get_job(job_id: UUID, job_repo: JobRepo):
+    """
+    (Admin) Returns the status of a background job. Once a job with a result
+    file is completed, `download_url` is a temporary link to it.
+    """
+    job = await job_repo.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Job not found')
+
+    job_response = JobResponse.model_validate(job)
+    if job.status == JobStatus.COMPLETED.value and job.result_file_id is not None:
+        try:
+            job_response.download_url = await get_download_url(job.result_file_id, settings)
+        except httpx.HTTPError as e:
+            logger.error(f'Failed to get the download link of job {job_id}.', exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail='Could not get a download link for the job result.',
+            ) from e
+    return job_response
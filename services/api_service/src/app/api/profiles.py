@@ -0,0 +1,46 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+
+from app.core.profiling import profile_store
+from app.schemas.profiles import RequestProfileSummary
+
+
+admin_router = APIRouter()
+
+
+@admin_router.get(
+    '/',
+    response_model=list[RequestProfileSummary],
+    summary='(Admin) List the stored request profiles',
+)
+async def list_profiles():
+    """
+    (Admin) Lists the most recent request profiles, newest first. Profiling
+    must be enabled with PROFILING_ENABLED.
+    """
+    return profile_store.list()
+
+
+@admin_router.get('/{profile_id}', summary='(Admin) Download a request profile')
+async def get_profile(
+    profile_id: str,
+    format: Literal['pstats', 'text'] = Query(
+        'pstats', description='A pstats file (for snakeviz and similar tools) or a text report.'
+    ),
+):
+    """
+    (Admin) Returns a stored profile, either as a pstats file or as a text
+    report of the functions with the highest cumulative time.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Profile not found')
+
+    if format == 'text':
+        return Response(profile.report(), media_type='text/plain')
+    return Response(
+        profile.dump(),
+        media_type='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename="{profile_id}.prof"'},
+    )
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 
+from app.core.compression import PrecompressedJSON
 from app.core.dependencies import FormRepo
 from app.schemas.forms import FormSchemaUpload
 
@@ -7,22 +8,34 @@ from app.schemas.forms import FormSchemaUpload
 router = APIRouter()
 admin_router = APIRouter()
 
+# The active schema, serialized and compressed once, keyed by its id.
+active_schema_cache: dict[int, PrecompressedJSON] = {}
+
 
 @router.get('/schema/active', response_model=dict)
-async def get_active_form_schema(repo: FormRepo):
+async def get_active_form_schema(repo: FormRepo, request: Request):
     """
     Returns the currently active form schema from the database.
     This is used by the frontend to render the application form.
-    """
-    active_schema = await repo.get_active_schema()
 
-    if not active_schema:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail='No active form schema found in the database.',
-        )
-
-    return active_schema.schema_data
+    The schema is read on every Mini App start, so it is kept pre-serialized and
+    pre-compressed in memory and only reloaded when another schema becomes active.
+    """
+    schema_id = await repo.get_active_schema_id()
+    cached = active_schema_cache.get(schema_id) if schema_id is not None else None
+
+    if cached is None:
+        active_schema = await repo.get_active_schema()
+        if not active_schema:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail='No active form schema found in the database.',
+            )
+        cached = PrecompressedJSON(active_schema.schema_data)
+        active_schema_cache.clear()
+        active_schema_cache[active_schema.id] = cached
+
+    return cached.response(request.headers.get('accept-encoding', ''))
 
 
 @admin_router.post(
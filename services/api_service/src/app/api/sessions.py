@@ -4,7 +4,12 @@ from fastapi import APIRouter, HTTPException, Query, status
 
 from app.core.dependencies import AppRepo
 from app.schemas.applications import ApplicationStatusResponse
-from app.schemas.sessions import SessionResponse, TelegramSessionRequest
+from app.schemas.sessions import (
+    SessionResponse,
+    TelegramSessionRequest,
+    TelegramStatusBatchRequest,
+    TelegramStatusBatchResponse,
+)
 
 
 router = APIRouter()
@@ -60,14 +65,35 @@ async def get_telegram_application_status(
     """
     Gets the status of the most recent application for a given Telegram user.
     """
-    application = await repo.get_latest_by_telegram_id(telegram_id)
+    application_status = await repo.get_latest_status_by_telegram_id(telegram_id)
 
-    if application is None:
+    if application_status is None:
         logger.warning(f'No application found for telegram_id={telegram_id}')
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f'No application found for Telegram user {telegram_id}',
         )
 
-    logger.info(f'Status for telegram_id={telegram_id} is "{application.status}"')
-    return {'status': application.status}
+    logger.info(f'Status for telegram_id={telegram_id} is "{application_status}"')
+    return {'status': application_status}
+
+
+@router.post('/telegram/status/batch', response_model=TelegramStatusBatchResponse)
+async def get_telegram_application_statuses_batch(
+    request: TelegramStatusBatchRequest,
+    repo: AppRepo,
+):
+    """
+    Gets the status of the most recent application for many Telegram users at once.
+
+    Intended for reminders and broadcasts: all statuses are resolved with a single
+    database query instead of one request per user.
+    """
+    telegram_ids = list(dict.fromkeys(request.telegram_ids))
+    statuses = await repo.get_latest_statuses_by_telegram_ids(telegram_ids)
+
+    logger.info(f'Resolved statuses for {len(statuses)} of {len(telegram_ids)} telegram users')
+    return {
+        'statuses': statuses,
+        'not_found': [telegram_id for telegram_id in telegram_ids if telegram_id not in statuses],
+    }
@@ -0,0 +1,145 @@
+import gzip
+import json
+from typing import Any
+
+import brotli
+from fastapi import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'text/')
+# Server-Sent Events must reach the client unbuffered.
+EXCLUDED_CONTENT_TYPES = ('text/event-stream',)
+# Supported content codings, in order of preference.
+SUPPORTED_ENCODINGS = ('br', 'gzip')
+
+
+def select_encoding(accept_encoding: str) -> str | None:
+    """
+    Picks the preferred content coding accepted by the client, honouring q=0
+    exclusions and '*'. Returns None if the response must not be compressed.
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if coding:
+            accepted[coding] = quality
+
+    for coding in SUPPORTED_ENCODINGS:
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+class CompressionMiddleware:
+    """
+    Compresses single-body responses above `minimum_size` with the best coding
+    the client accepts (brotli, then gzip).
+
+    Streaming responses (SSE, XLSX/ZIP downloads) are passed through untouched,
+    as are responses that are already encoded or not text/JSON. ETags of
+    compressed responses are weakened, since the bytes differ from the original.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                # Hold the headers until the first body chunk shows what to do.
+                start_message = message
+                return
+            if message['type'] != 'http.response.body' or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get('body', b'')
+            headers = MutableHeaders(scope=start)
+            if message.get('more_body', False) or not self._should_compress(headers, body):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers['Content-Encoding'] = encoding
+            headers['Content-Length'] = str(len(compressed))
+            headers.add_vary_header('Accept-Encoding')
+            etag = headers.get('ETag')
+            if etag and not etag.startswith('W/'):
+                headers['ETag'] = f'W/{etag}'
+            await send(start)
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        content_type = headers.get('Content-Type', '')
+        return (
+            len(body) >= self.minimum_size
+            and 'Content-Encoding' not in headers
+            and content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+            and not content_type.startswith(EXCLUDED_CONTENT_TYPES)
+        )
+
+
+class PrecompressedJSON:
+    """
+    A JSON document serialized once and kept together with its compressed
+    variants. Compression runs only once, so the highest levels are used.
+    """
+
+    def __init__(self, content: Any) -> None:
+        # Same rendering as FastAPI's default JSONResponse.
+        self.identity = json.dumps(
+            content, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')
+        ).encode('utf-8')
+        self.variants = {
+            encoding: compress(self.identity, encoding, gzip_level=9, brotli_quality=11)
+            for encoding in SUPPORTED_ENCODINGS
+        }
+
+    def response(self, accept_encoding: str) -> Response:
+        """Returns the variant matching the client's Accept-Encoding header."""
+        headers = {'Vary': 'Accept-Encoding'}
+        encoding = select_encoding(accept_encoding)
+        if encoding is None:
+            return Response(self.identity, media_type='application/json', headers=headers)
+
+        headers['Content-Encoding'] = encoding
+        return Response(self.variants[encoding], media_type='application/json', headers=headers)
@@ -1,4 +1,5 @@
 from functools import cached_property
+from typing import Literal
 
 from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,6 +17,50 @@ class Settings(BaseSettings):
     S3_PUBLIC_URL: str
     S3_ENDPOINT_URL: str
 
+    # gunicorn worker processes (0 starts one per available CPU core); see gunicorn_conf.py
+    API_WORKERS: int = 1
+    API_WORKER_TIMEOUT_SECONDS: int = 60
+    # Restart a worker after this many requests, with jitter, to bound memory growth (0 disables)
+    API_WORKER_MAX_REQUESTS: int = 0
+
+    # Compress responses of at least this many bytes (brotli or gzip)
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Coalesce Mini App autosaves within this window into one DB write (0 disables)
+    AUTOSAVE_COALESCE_WINDOW_SECONDS: float = 0.0
+
+    # Deliver status change events between workers via PostgreSQL LISTEN/NOTIFY
+    STATUS_EVENTS_USE_POSTGRES: bool = True
+    STATUS_STREAM_KEEPALIVE_SECONDS: float = 15.0
+    STATUS_STREAM_MAX_SECONDS: float = 300.0
+
+    # OpenTelemetry tracing: 'otlp' sends spans to the collector, 'file' appends them as JSON lines
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal['otlp', 'file'] = 'otlp'
+    TRACING_OTLP_ENDPOINT: str = 'http://jaeger:4318/v1/traces'
+    TRACING_FILE_PATH: str = 'traces.jsonl'
+
+    # Opt-in request profiling: a sampled share of requests, plus admin requests with 'X-Profile: 1'
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_MAX_STORED: int = 50
+
+    # Log a warning when a request executes more SQL statements than this (0 disables)
+    QUERY_BUDGET_PER_REQUEST: int = 15
+
+    # Background jobs (exports, document archives), run by the worker: python -m app.worker
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+    # Attempt n + 1 of a failed job waits JOB_RETRY_BACKOFF_SECONDS * 2**(n - 1)
+    JOB_RETRY_BACKOFF_SECONDS: float = 30.0
+    # A running job refreshes its heartbeat this often; one without a heartbeat for
+    # JOB_STALE_AFTER_SECONDS is assumed lost with its worker and retried
+    JOB_HEARTBEAT_INTERVAL_SECONDS: float = 30.0
+    JOB_STALE_AFTER_SECONDS: float = 300.0
+
     @computed_field
     @cached_property
     def database_url(self) -> str:
@@ -1,5 +1,6 @@
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
@@ -14,6 +15,19 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+# Key of the PostgreSQL advisory lock held while migrating and seeding, so that
+# workers and replicas starting at the same time do it one after another.
+STARTUP_LOCK_KEY = 0x64766A7A
+
+
+async def acquire_startup_lock(session: AsyncSession) -> None:
+    """
+    Waits for the startup advisory lock and holds it until the session's
+    transaction ends. Does nothing on databases other than PostgreSQL.
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        await session.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': STARTUP_LOCK_KEY})
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
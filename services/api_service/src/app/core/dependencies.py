@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_async_session
 from app.repositories.applications import ApplicationRepository
 from app.repositories.forms import FormSchemaRepository
+from app.repositories.jobs import JobRepository
 
 
 DbSession = Annotated[AsyncSession, Depends(get_async_session)]
@@ -21,5 +22,11 @@ def get_form_schema_repo(session: DbSession) -> FormSchemaRepository:
     return FormSchemaRepository(session=session)
 
 
+def get_job_repo(session: DbSession) -> JobRepository:
+    """Provides an instance of JobRepository."""
+    return JobRepository(session=session)
+
+
 AppRepo = Annotated[ApplicationRepository, Depends(get_application_repo)]
 FormRepo = Annotated[FormSchemaRepository, Depends(get_form_schema_repo)]
+JobRepo = Annotated[JobRepository, Depends(get_job_repo)]
@@ -5,7 +5,7 @@ from pathlib import Path
 from sqlalchemy import func
 from sqlalchemy.future import select
 
-from app.core.db import AsyncSessionLocal
+from app.core.db import AsyncSessionLocal, acquire_startup_lock
 from app.models.db_models import FormSchema
 
 
@@ -19,10 +19,14 @@ async def seed_initial_form_schema():
     """
     Checks if the form_schemas table is empty and, if so, populates it
     with the default schema from form_schema.json.
+
+    Runs under the startup advisory lock, so with several workers only the
+    first one seeds and the others find the table populated.
     """
     logger.info('Checking if initial form schema needs to be seeded...')
 
     async with AsyncSessionLocal() as session, session.begin():
+        await acquire_startup_lock(session)
         result = await session.execute(select(func.count()).select_from(FormSchema))
         count = result.scalar_one()
 
@@ -0,0 +1,104 @@
+import os
+import time
+from collections.abc import Iterator
+
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling HTTP requests, by route template.',
+    ['method', 'route', 'status'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress',
+    'HTTP requests currently being handled.',
+    ['method'],
+    multiprocess_mode='livesum',
+)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Returns the registry to expose on /metrics.
+
+    With several gunicorn workers, PROMETHEUS_MULTIPROC_DIR is set (see
+    gunicorn_conf.py) and the request metrics of all workers are aggregated
+    from the files they write there. Collectors registered on the default
+    registry (the database pool, the autosave buffer) describe a single
+    process, so they are only exposed when running one worker.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class PrometheusMiddleware:
+    """
+    Records the latency and the number of in-flight HTTP requests.
+
+    Requests are labelled with the route template (e.g. '/api/v1/applications/
+    {application_uuid}/public'), never the raw path, to keep label cardinality
+    bounded. Requests that match no route share the 'unmatched' label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope.
+            route = scope.get('route')
+            REQUEST_LATENCY.labels(
+                method=method,
+                route=getattr(route, 'path', 'unmatched'),
+                status=str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+class DatabasePoolCollector(Collector):
+    """Reports the connection pool state of an engine at scrape time."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        connections = GaugeMetricFamily(
+            'db_pool_connections', 'Database connections by state.', labels=['state']
+        )
+        connections.add_metric(['checked_out'], pool.checkedout())
+        connections.add_metric(['idle'], pool.checkedin())
+        yield connections
+        yield GaugeMetricFamily('db_pool_size', 'Configured pool size.', value=pool.size())
+        yield GaugeMetricFamily(
+            'db_pool_overflow', 'Connections opened beyond the pool size.', value=pool.overflow()
+        )
@@ -0,0 +1,236 @@
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from datetime import UTC, datetime
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.query_stats import track_queries
+
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+# The trigger header is only honoured behind the gateway's admin authentication.
+ADMIN_PATH_PREFIX = '/api/v1/admin/'
+
+
+@dataclass
+class RequestProfile:
+    """A profiled request: its timings, SQL statistics and cProfile data."""
+
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    sql_count: int
+    sql_duration_ms: float
+    stats: dict = field(repr=False)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+
+    def dump(self) -> bytes:
+        """Returns the profile in the pstats file format (for snakeviz, pstats, etc.)."""
+        return marshal.dumps(self.stats)
+
+    def report(self, limit: int = 50) -> str:
+        """Returns the top functions by cumulative time as text."""
+        stream = io.StringIO()
+        report = pstats.Stats(stream=stream)
+        report.stats = self.stats
+        report.get_top_level_stats()
+        report.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        return stream.getvalue()
+
+
+class ProfileStore:
+    """Keeps the most recent profiles of this process in memory."""
+
+    def __init__(self, max_items: int) -> None:
+        self.max_items = max_items
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_items:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> list[RequestProfile]:
+        return list(reversed(self._profiles.values()))
+
+    def clear(self) -> None:
+        self._profiles.clear()
+
+
+class SharedProfileStore(ProfileStore):
+    """
+    Keeps the most recent profiles of all gunicorn workers as files in a shared
+    directory, so that whichever worker serves the profile endpoints finds them.
+
+    Each profile is stored as `<id>.prof` (the pstats data) and `<id>.json`
+    (the other fields). The JSON file is written last, atomically, so a
+    profile is only listed once it is complete.
+    """
+
+    def __init__(self, max_items: int, directory: str) -> None:
+        self.max_items = max_items
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def add(self, profile: RequestProfile) -> None:
+        summary = {item.name: getattr(profile, item.name) for item in fields(profile)}
+        del summary['stats']
+        summary['created_at'] = profile.created_at.isoformat()
+        (self.directory / f'{profile.id}.prof').write_bytes(profile.dump())
+        partial = self.directory / f'{profile.id}.json.tmp'
+        partial.write_text(json.dumps(summary))
+        partial.replace(self.directory / f'{profile.id}.json')
+
+        for path in self._summary_paths()[self.max_items :]:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.prof').unlink(missing_ok=True)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        # Profile ids are uuid hex strings; anything else could name a path outside the store.
+        if not profile_id.isalnum():
+            return None
+        try:
+            return self._load(self.directory / f'{profile_id}.json')
+        except FileNotFoundError:
+            return None
+
+    def _summary_paths(self) -> list[Path]:
+        """Returns the profile summary files, newest first."""
+        paths = []
+        for path in self.directory.glob('*.json'):
+            try:
+                paths.append((path.stat().st_mtime_ns, path))
+            except FileNotFoundError:
+                continue
+        return [path for _, path in sorted(paths, reverse=True)]
+
+    def _load(self, summary_path: Path) -> RequestProfile:
+        summary = json.loads(summary_path.read_text())
+        summary['created_at'] = datetime.fromisoformat(summary['created_at'])
+        stats = marshal.loads(summary_path.with_suffix('.prof').read_bytes())
+        return RequestProfile(**summary, stats=stats)
+
+    def list(self) -> list[RequestProfile]:
+        profiles = []
+        for path in self._summary_paths()[: self.max_items]:
+            try:
+                profiles.append(self._load(path))
+            except FileNotFoundError:
+                # Pruned by another worker meanwhile.
+                continue
+        return profiles
+
+    def clear(self) -> None:
+        for path in self.directory.iterdir():
+            path.unlink(missing_ok=True)
+
+
+def create_profile_store() -> ProfileStore:
+    """
+    Returns the profile store of this process. With several gunicorn workers,
+    PROFILING_DIR is set (see gunicorn_conf.py) and profiles are shared
+    through files; otherwise they are kept in memory.
+    """
+    directory = os.environ.get('PROFILING_DIR')
+    if directory:
+        return SharedProfileStore(settings.PROFILING_MAX_STORED, directory)
+    return ProfileStore(max_items=settings.PROFILING_MAX_STORED)
+
+
+profile_store = create_profile_store()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles selected requests with cProfile and counts their SQL statements.
+
+    A request is profiled when a sampled fraction `sample_rate` selects it, or
+    when an admin request carries the `X-Profile: 1` header. The profile is
+    kept in `store` and its id is returned in the `X-Profile-Id` response
+    header, along with a Server-Timing header.
+
+    Only one request is profiled at a time, since cProfile cannot nest. The
+    profile covers the event loop thread, so coroutines of concurrent requests
+    may show up in it. The middleware is only installed when profiling is
+    enabled, so disabled profiling costs nothing.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, sample_rate: float = 0.0) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self._active = False
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self._active:
+            return False
+        if (
+            scope['path'].startswith(ADMIN_PATH_PREFIX)
+            and Headers(scope=scope).get(PROFILE_HEADER) == '1'
+        ):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+
+        with track_queries() as queries:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message['type'] == 'http.response.start':
+                    status_code = message['status']
+                    headers = MutableHeaders(scope=message)
+                    headers[PROFILE_ID_HEADER] = profile_id
+                    headers.append(
+                        'Server-Timing',
+                        f'app;dur={(time.perf_counter() - start) * 1000:.1f}, '
+                        f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries"',
+                    )
+                await send(message)
+
+            self._active = True
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.disable()
+                self._active = False
+                profiler.create_stats()
+                self.store.add(
+                    RequestProfile(
+                        id=profile_id,
+                        method=scope['method'],
+                        path=scope['path'],
+                        status_code=status_code,
+                        duration_ms=(time.perf_counter() - start) * 1000,
+                        sql_count=queries.count,
+                        sql_duration_ms=queries.duration * 1000,
+                        stats=profiler.stats,
+                    )
+                )
@@ -0,0 +1,90 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Number and total duration of the SQL statements executed in a block."""
+
+    count: int = 0
+    duration: float = 0.0
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Counts the statements executed by instrumented engines within the block,
+    including those issued by tasks and threads started from it. Statements
+    of a nested block are also added to the enclosing one.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        outer = _current_stats.get()
+        if outer is not None:
+            outer.count += stats.count
+            outer.duration += stats.duration
+
+
+def count_queries(engine: Engine) -> None:
+    """
+    Registers the engine events feeding `track_queries`. Outside a tracked
+    block the cost is one context variable lookup per statement.
+    For an AsyncEngine, pass its `sync_engine`.
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            context._query_started_at = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        started_at = getattr(context, '_query_started_at', None)
+        if stats is not None and started_at is not None:
+            stats.count += 1
+            stats.duration += time.perf_counter() - started_at
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+class QueryBudgetMiddleware:
+    """
+    Logs a warning for every request that executes more than `budget` SQL
+    statements, which usually points to an N+1 pattern or a missing eager load.
+    """
+
+    def __init__(self, app: ASGIApp, budget: int) -> None:
+        self.app = app
+        self.budget = budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send)
+
+        if stats.count > self.budget:
+            route = getattr(scope.get('route'), 'path', scope['path'])
+            logger.warning(
+                f'{scope["method"]} {route} executed {stats.count} SQL statements '
+                f'({stats.duration * 1000:.1f} ms), over the budget of {self.budget}.'
+            )
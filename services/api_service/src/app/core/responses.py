@@ -0,0 +1,22 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def fast_json_response(
+    adapter: TypeAdapter, content: Any, headers: dict[str, str] | None = None
+) -> Response:
+    """
+    Renders ORM objects to JSON bytes in a single pydantic-core pass.
+
+    By default FastAPI validates the returned objects against `response_model`,
+    dumps them to Python dicts, runs them through `jsonable_encoder` and finally
+    `json.dumps`. Returning a ready Response skips all of that: the objects are
+    validated once and serialized straight to bytes in Rust. Endpoints using this
+    should keep `response_model` for the OpenAPI schema.
+    """
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(value), media_type='application/json', headers=headers
+    )
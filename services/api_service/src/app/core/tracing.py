@@ -0,0 +1,96 @@
+from typing import Any
+
+from fastapi import FastAPI
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+
+
+# Scrapes and health checks would only add noise to the traces.
+EXCLUDED_URLS = 'metrics,api/v1/health'
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """Appends spans to a file as JSON lines, one span per line."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(
+            out=open(path, 'a', encoding='utf-8'),  # noqa: SIM115 - closed in shutdown()
+            formatter=lambda span: span.to_json(indent=None) + '\n',
+        )
+
+    def shutdown(self) -> None:
+        # Called by the span processor on TracerProvider.shutdown(), at interpreter exit.
+        self.out.close()
+
+
+def build_exporter() -> SpanExporter:
+    """Returns the span exporter selected by TRACING_EXPORTER."""
+    if settings.TRACING_EXPORTER == 'file':
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def instrument_engine(engine: Engine, tracer_provider: TracerProvider | None = None) -> None:
+    """
+    Records a client span for every query executed by the engine.
+
+    For an AsyncEngine, pass its `sync_engine`. Spans become children of the
+    current span, i.e. of the HTTP request that issued the query.
+    """
+    tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+    attributes = {'db.system': engine.dialect.name, 'db.name': engine.url.database or ''}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.split(maxsplit=1)[0].upper() if statement else 'QUERY'
+        context._otel_span = tracer.start_span(
+            f'{operation} {attributes["db.name"]}'.strip(),
+            kind=SpanKind.CLIENT,
+            attributes={**attributes, 'db.statement': statement},
+        )
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, '_otel_span', None)
+        if span is not None:
+            span.end()
+            context._otel_span = None
+
+    def handle_error(exception_context: Any) -> None:
+        context = exception_context.execution_context
+        span = getattr(context, '_otel_span', None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+            context._otel_span = None
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+    event.listen(engine, 'handle_error', handle_error)
+
+
+def setup_tracing(app: FastAPI, engine: Engine) -> None:
+    """
+    Enables OpenTelemetry tracing of incoming requests, outgoing httpx calls
+    (file-storage-service and S3 downloads in zip_service) and database queries.
+
+    Trace context is read from and propagated through `traceparent` headers,
+    so spans join the traces started by bot-service.
+    """
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: 'api-service'}))
+    provider.add_span_processor(BatchSpanProcessor(build_exporter()))
+    trace.set_tracer_provider(provider)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider, excluded_urls=EXCLUDED_URLS)
+    HTTPXClientInstrumentor().instrument(tracer_provider=provider)
+    instrument_engine(engine, tracer_provider=provider)
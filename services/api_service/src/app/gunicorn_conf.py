@@ -0,0 +1,57 @@
+"""
+gunicorn configuration of api-service, read from the application settings.
+
+Each worker is a separate process running the app with uvicorn, so the
+service uses several CPU cores. Every worker has its own database pool
+(up to 15 connections), caches and in-memory buffers; see the README for
+sizing. Start from the app directory:
+    gunicorn main:app -c gunicorn_conf.py
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from app.core.config import settings
+
+
+def worker_count(configured: int) -> int:
+    """Returns the configured number of workers, or one per available CPU core for 0."""
+    if configured > 0:
+        return configured
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = '0.0.0.0:8000'
+worker_class = 'uvicorn.workers.UvicornWorker'
+workers = worker_count(settings.API_WORKERS)
+timeout = settings.API_WORKER_TIMEOUT_SECONDS
+graceful_timeout = settings.API_WORKER_TIMEOUT_SECONDS
+max_requests = settings.API_WORKER_MAX_REQUESTS
+max_requests_jitter = settings.API_WORKER_MAX_REQUESTS // 10
+accesslog = '-'
+
+# prometheus_client aggregates the metrics of all workers through files in this
+# directory, and request profiles are shared the same way, so that any worker can
+# serve them. Both must be set before the workers import the app.
+if workers > 1:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+    if settings.PROFILING_ENABLED:
+        os.environ.setdefault('PROFILING_DIR', '/tmp/api_profiles')
+
+
+def on_starting(server) -> None:
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        # Files left by a previous run would be summed into the new metrics.
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        Path(metrics_dir).mkdir(parents=True)
+
+
+def child_exit(server, worker) -> None:
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
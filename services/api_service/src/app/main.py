@@ -1,16 +1,24 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
-from app.api import sessions
+from app.api import jobs, profiles, sessions
 from app.api.applications import (
     admin_router as applications_admin_router,
     router as applications_public_router,
 )
 from app.api.schemas import admin_router as schemas_admin_router, router as schemas_public_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.db import async_engine
 from app.core.initial_data import seed_initial_form_schema
+from app.core.metrics import DatabasePoolCollector, PrometheusMiddleware, metrics_registry
+from app.core.profiling import ProfilingMiddleware, profile_store
+from app.core.query_stats import QueryBudgetMiddleware, count_queries
+from app.services.autosave import AutosaveCollector, autosave_buffer
+from app.services.status_events import status_event_bus
 
 
 logging.basicConfig(
@@ -23,15 +31,45 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager.
-    - On startup, it seeds the initial form schema if the database is empty.
+    - On startup, it seeds the initial form schema if the database is empty
+      and starts listening for application status events.
+    - On shutdown, it flushes buffered autosaves and closes the status events connection.
     """
     logger.info('API Service is starting up...')
     await seed_initial_form_schema()
+    if settings.STATUS_EVENTS_USE_POSTGRES:
+        await status_event_bus.start(settings.database_url.replace('+asyncpg', ''))
     yield
     logger.info('API Service is shutting down...')
+    await autosave_buffer.flush_all()
+    await status_event_bus.stop()
 
 
 app = FastAPI(title=settings.APP_TITLE, lifespan=lifespan)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware, store=profile_store, sample_rate=settings.PROFILING_SAMPLE_RATE
+    )
+if settings.QUERY_BUDGET_PER_REQUEST > 0:
+    app.add_middleware(QueryBudgetMiddleware, budget=settings.QUERY_BUDGET_PER_REQUEST)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+# Added last so it is the outermost middleware and its timings include compression.
+app.add_middleware(PrometheusMiddleware)
+
+count_queries(async_engine.sync_engine)
+REGISTRY.register(DatabasePoolCollector(async_engine))
+REGISTRY.register(AutosaveCollector(autosave_buffer))
+
+if settings.TRACING_ENABLED:
+    # The OpenTelemetry SDK is only imported when tracing is enabled.
+    from app.core.tracing import setup_tracing
+
+    setup_tracing(app, async_engine.sync_engine)
 
 
 app.include_router(applications_public_router, prefix='/api/v1/applications', tags=['Applications'])
@@ -41,8 +79,17 @@ app.include_router(
 app.include_router(schemas_public_router, prefix='/api/v1/forms', tags=['Forms'])
 app.include_router(schemas_admin_router, prefix='/api/v1', tags=['Admin: Forms'])
 app.include_router(sessions.router, prefix='/api/v1/sessions', tags=['Sessions'])
+app.include_router(jobs.admin_router, prefix='/api/v1/admin/jobs', tags=['Admin: Jobs'])
+app.include_router(
+    profiles.admin_router, prefix='/api/v1/admin/profiles', tags=['Admin: Profiling']
+)
 
 
 @app.get('/api/v1/health')
 def health_check():
     return {'status': 'ok', 'service': 'API Service'}
+
+
+@app.get('/metrics', include_in_schema=False)
+def metrics():
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
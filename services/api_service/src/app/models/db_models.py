@@ -1,16 +1,20 @@
 import uuid
-from datetime import datetime
-from typing import Any
+from datetime import date, datetime
+from typing import Any, ClassVar
 
 from sqlalchemy import (
+    DDL,
     JSON,
     BigInteger,
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    event,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -23,15 +27,28 @@ class Application(Base):
     __tablename__ = 'applications'
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    telegram_id: Mapped[int | None] = mapped_column(
-        BigInteger,
-        unique=False,
+    telegram_id: Mapped[int | None] = mapped_column(BigInteger, unique=False, nullable=True)
+    status: Mapped[str] = mapped_column(String, default='draft', nullable=False)
+    # Potentially large columns are only loaded when a query asks for the 'payload' group.
+    data: Mapped[dict[str, Any]] = mapped_column(
+        JSON,
+        nullable=False,
+        default=dict,
+        deferred=True,
+        deferred_group='payload',
+        deferred_raiseload=True,
+    )
+    admin_comment: Mapped[str | None] = mapped_column(
+        Text,
         nullable=True,
-        index=True,
+        deferred=True,
+        deferred_group='payload',
+        deferred_raiseload=True,
     )
-    status: Mapped[str] = mapped_column(String, default='draft', nullable=False)
-    data: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
-    admin_comment: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Version of the form schema that was active when the application was created.
+    form_version: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Incremented on every write; exposed as the ETag for optimistic concurrency.
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default='1', nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -39,10 +56,18 @@ class Application(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    # PostgreSQL also has generated `search_vector` (tsvector) and `search_text`
+    # (for trigram matching) columns, created by a migration and only referenced
+    # by ApplicationRepository.search. They are not mapped, so they are never loaded.
+
     files: Mapped[list['ApplicationFile']] = relationship(
         back_populates='application', cascade='all, delete-orphan'
     )
 
+    # Fetch server-generated timestamps on write, so no refresh (which would
+    # unload the deferred payload columns) is needed afterwards.
+    __mapper_args__: ClassVar[dict[str, Any]] = {'eager_defaults': True}
+
 
 class ApplicationFile(Base):
     __tablename__ = 'application_files'
@@ -63,6 +88,15 @@ class ApplicationFile(Base):
     application: Mapped['Application'] = relationship(back_populates='files')
 
 
+# Serves "latest application status per Telegram user" lookups as index-only scans.
+Index(
+    'ix_applications_telegram_id_created_at_status',
+    Application.telegram_id,
+    Application.created_at.desc(),
+    postgresql_include=['status'],
+)
+
+
 class FormSchema(Base):
     """Stores versions of the application form schema."""
 
@@ -77,3 +111,178 @@ class FormSchema(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
+
+
+class ApplicationMatchKey(Base):
+    """
+    Normalized identity keys of a submitted application (see services.duplicates).
+    Applications sharing a key are reported as possible duplicates.
+    """
+
+    __tablename__ = 'application_match_keys'
+
+    application_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('applications.id', ondelete='CASCADE'), primary_key=True
+    )
+    key: Mapped[str] = mapped_column(String, primary_key=True, index=True)
+
+
+class ApplicationArchive(Base):
+    """
+    The stored ZIP archive of an application's documents (see zip_service).
+
+    `files_hash` identifies the file list the archive was built from, so an
+    archive is only reused while the application's documents are unchanged.
+    Linking a file also deletes the row. Archives that are replaced or made
+    stale are deleted from file storage too.
+    """
+
+    __tablename__ = 'application_archives'
+
+    application_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey('applications.id', ondelete='CASCADE'), primary_key=True
+    )
+    files_hash: Mapped[str] = mapped_column(String, nullable=False)
+    file_id: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class ApplicationStats(Base):
+    """
+    Number of applications per creation day, form version and status.
+
+    Maintained by database triggers on `applications` (see STATS_TRIGGERS), so
+    the counters stay exact for every writer and dashboards never scan the
+    applications table. Rows may drop to a zero count.
+    """
+
+    __tablename__ = 'application_stats'
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # An empty string stands for applications created before form versions were recorded.
+    form_version: Mapped[str] = mapped_column(String, primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class Job(Base):
+    """
+    A background job (an export, a documents archive or duplicate matching) run
+    by the job worker.
+
+    Workers claim queued jobs with `FOR UPDATE SKIP LOCKED` (see JobRepository),
+    so each job runs once however many workers poll. A result file, if the job
+    produces one, is uploaded to file-storage-service and referenced by
+    `result_file_id`.
+
+    A running job is owned by the worker that claimed it for that attempt: the
+    worker refreshes `heartbeat_at` while it runs, and a failed attempt is only
+    retried after `run_after`.
+    """
+
+    __tablename__ = 'jobs'
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    params: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String, default='queued', nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    result_file_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    result_filename: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __mapper_args__: ClassVar[dict[str, Any]] = {'eager_defaults': True}
+
+
+# Keeps polling for the oldest queued job cheap however many finished jobs accumulate.
+Index('ix_jobs_status_created_at', Job.status, Job.created_at)
+
+
+# Trigger DDL per dialect, for databases created with `metadata.create_all()`.
+# Production databases get the PostgreSQL version from the alembic migration.
+STATS_TRIGGERS: dict[str, list[str]] = {
+    'postgresql': [
+        """
+        CREATE OR REPLACE FUNCTION application_stats_apply() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE application_stats SET count = count - 1
+                WHERE day = (OLD.created_at AT TIME ZONE 'UTC')::date
+                  AND form_version = COALESCE(OLD.form_version, '')
+                  AND status = OLD.status;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO application_stats (day, form_version, status, count)
+                VALUES (
+                    (NEW.created_at AT TIME ZONE 'UTC')::date,
+                    COALESCE(NEW.form_version, ''),
+                    NEW.status,
+                    1
+                )
+                ON CONFLICT (day, form_version, status)
+                DO UPDATE SET count = application_stats.count + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        CREATE TRIGGER applications_stats_insert_delete
+        AFTER INSERT OR DELETE ON applications
+        FOR EACH ROW EXECUTE FUNCTION application_stats_apply()
+        """,
+        """
+        CREATE TRIGGER applications_stats_status_update
+        AFTER UPDATE OF status ON applications
+        FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+        EXECUTE FUNCTION application_stats_apply()
+        """,
+    ],
+    'sqlite': [
+        """
+        CREATE TRIGGER applications_stats_insert AFTER INSERT ON applications
+        BEGIN
+            INSERT INTO application_stats (day, form_version, status, count)
+            VALUES (date(NEW.created_at), COALESCE(NEW.form_version, ''), NEW.status, 1)
+            ON CONFLICT (day, form_version, status) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER applications_stats_delete AFTER DELETE ON applications
+        BEGIN
+            UPDATE application_stats SET count = count - 1
+            WHERE day = date(OLD.created_at)
+              AND form_version = COALESCE(OLD.form_version, '')
+              AND status = OLD.status;
+        END
+        """,
+        """
+        CREATE TRIGGER applications_stats_status_update AFTER UPDATE OF status ON applications
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE application_stats SET count = count - 1
+            WHERE day = date(OLD.created_at)
+              AND form_version = COALESCE(OLD.form_version, '')
+              AND status = OLD.status;
+            INSERT INTO application_stats (day, form_version, status, count)
+            VALUES (date(NEW.created_at), COALESCE(NEW.form_version, ''), NEW.status, 1)
+            ON CONFLICT (day, form_version, status) DO UPDATE SET count = count + 1;
+        END
+        """,
+    ],
+}
+
+for dialect, statements in STATS_TRIGGERS.items():
+    for statement in statements:
+        event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect=dialect))
@@ -1,22 +1,57 @@
 import logging
+import re
+from collections.abc import Collection
+from datetime import date
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import desc
+from sqlalchemy import (
+    String,
+    cast,
+    delete,
+    desc,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload, undefer_group
 
-from app.models.db_models import Application, ApplicationFile
+from app.models.db_models import (
+    Application,
+    ApplicationArchive,
+    ApplicationFile,
+    ApplicationMatchKey,
+    ApplicationStats,
+    FormSchema,
+)
 from app.schemas.applications import (
+    MAX_BULK_APPLICATIONS,
     ApplicationAdminUpdate,
+    ApplicationBulkUpdate,
     ApplicationStatus,
     ApplicationUpdate,
     FileLinkRequest,
+    statuses_allowing_transition_to,
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Generated PostgreSQL columns (see the search migration), not mapped on the model.
+SEARCH_VECTOR = literal_column('applications.search_vector')
+SEARCH_TEXT = literal_column('applications.search_text', String)
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
+
+PHONE_QUERY_RE = re.compile(r'[\d\s()+-]+')
+
 
 class ApplicationRepository:
     def __init__(self, session: AsyncSession):
@@ -25,12 +60,30 @@ class ApplicationRepository:
     async def get_by_uuid(
         self, application_uuid: UUID, with_files: bool = False
     ) -> Application | None:
-        query = select(Application).where(Application.id == application_uuid)
+        query = (
+            select(Application)
+            .where(Application.id == application_uuid)
+            .options(undefer_group('payload'))
+        )
         if with_files:
             query = query.options(selectinload(Application.files))
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_status(self, application_uuid: UUID) -> str | None:
+        """Returns only the status of an application, or None if it does not exist."""
+        query = select(Application.status).where(Application.id == application_uuid)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_status_and_version(self, application_uuid: UUID) -> Row | None:
+        """Returns the (status, version) of an application, or None if it does not exist."""
+        query = select(Application.status, Application.version).where(
+            Application.id == application_uuid
+        )
+        result = await self.session.execute(query)
+        return result.one_or_none()
+
     async def get_draft_by_telegram_id(self, telegram_id: int) -> Application | None:
         query = select(Application).where(
             Application.telegram_id == telegram_id,
@@ -39,9 +92,13 @@ class ApplicationRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_latest_by_telegram_id(self, telegram_id: int) -> Application | None:
+    async def get_latest_status_by_telegram_id(self, telegram_id: int) -> str | None:
+        """
+        Returns only the status of the most recent application for a Telegram user.
+        Selecting just the status lets PostgreSQL answer from the covering index.
+        """
         query = (
-            select(Application)
+            select(Application.status)
             .where(Application.telegram_id == telegram_id)
             .order_by(desc(Application.created_at))
             .limit(1)
@@ -49,6 +106,39 @@ class ApplicationRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_latest_statuses_by_telegram_ids(self, telegram_ids: list[int]) -> dict[int, str]:
+        """
+        Returns the status of the most recent application for each of the given
+        Telegram users in a single query. Users without applications are omitted.
+        """
+        if self.session.get_bind().dialect.name == 'postgresql':
+            query = (
+                select(Application.telegram_id, Application.status)
+                .where(Application.telegram_id.in_(telegram_ids))
+                .distinct(Application.telegram_id)
+                .order_by(Application.telegram_id, desc(Application.created_at))
+            )
+        else:
+            # DISTINCT ON is PostgreSQL-only, other backends rank rows with a window function.
+            ranked = (
+                select(
+                    Application.telegram_id,
+                    Application.status,
+                    func.row_number()
+                    .over(
+                        partition_by=Application.telegram_id,
+                        order_by=desc(Application.created_at),
+                    )
+                    .label('row_number'),
+                )
+                .where(Application.telegram_id.in_(telegram_ids))
+                .subquery()
+            )
+            query = select(ranked.c.telegram_id, ranked.c.status).where(ranked.c.row_number == 1)
+
+        result = await self.session.execute(query)
+        return dict(result.tuples().all())
+
     async def get_all(
         self,
         status: ApplicationStatus | None = None,
@@ -57,7 +147,7 @@ class ApplicationRepository:
     ) -> list[Application]:
         query = (
             select(Application)
-            .options(selectinload(Application.files))
+            .options(undefer_group('payload'), selectinload(Application.files))
             .order_by(Application.created_at)
         )
         if status:
@@ -66,13 +156,101 @@ class ApplicationRepository:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def search(
+        self,
+        query: str,
+        status: ApplicationStatus | None = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> list[Application]:
+        """
+        Finds applications by applicant names, phone, email and free-text answers,
+        most relevant first.
+
+        On PostgreSQL, full-text matches (names weigh most) come from the GIN-indexed
+        `search_vector`, and substring or fuzzy matches of names, email and phone
+        digits from the trigram-indexed `search_text`. Other backends fall back to a
+        substring match over the raw form data.
+        """
+        # A phone number is matched by its digits only, whatever its formatting.
+        digits = re.sub(r'\D', '', query)
+        text_query = digits if digits and PHONE_QUERY_RE.fullmatch(query) else query.lower()
+
+        select_query = select(Application).options(
+            undefer_group('payload'), selectinload(Application.files)
+        )
+        if self.session.get_bind().dialect.name == 'postgresql':
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+            rank = func.greatest(
+                func.ts_rank_cd(SEARCH_VECTOR, ts_query),
+                func.word_similarity(text_query, SEARCH_TEXT),
+            )
+            select_query = select_query.where(
+                or_(
+                    SEARCH_VECTOR.bool_op('@@')(ts_query),
+                    SEARCH_TEXT.contains(text_query, autoescape=True),
+                    literal(text_query, String).bool_op('<%')(SEARCH_TEXT),
+                )
+            ).order_by(desc(rank), desc(Application.created_at))
+        else:
+            select_query = select_query.where(
+                func.lower(cast(Application.data, String)).contains(text_query, autoescape=True)
+            ).order_by(desc(Application.created_at))
+
+        if status:
+            select_query = select_query.where(Application.status == status.value)
+        result = await self.session.execute(select_query.limit(limit).offset(offset))
+        return list(result.scalars().all())
+
+    @staticmethod
+    def _active_form_version():
+        """Subquery for the version of the active form schema, evaluated at INSERT."""
+        return select(FormSchema.version).where(FormSchema.is_active.is_(True)).scalar_subquery()
+
+    async def get_stats(self, since: date) -> dict[str, Any]:
+        """
+        Returns application counts by status, by form version and, from `since`
+        on, by creation day and status. Reads only the trigger-maintained
+        application_stats counters, never the applications table.
+        """
+        total = func.sum(ApplicationStats.count)
+        by_status = await self.session.execute(
+            select(ApplicationStats.status, total).group_by(ApplicationStats.status)
+        )
+        by_form_version = await self.session.execute(
+            select(ApplicationStats.form_version, total).group_by(ApplicationStats.form_version)
+        )
+        by_day = await self.session.execute(
+            select(ApplicationStats.day, ApplicationStats.status, total)
+            .where(ApplicationStats.day >= since)
+            .group_by(ApplicationStats.day, ApplicationStats.status)
+            .order_by(ApplicationStats.day)
+        )
+        days: dict[date, dict[str, int]] = {}
+        for day, status, count in by_day:
+            if count:
+                days.setdefault(day, {})[status] = count
+
+        status_counts = {status: count for status, count in by_status if count}
+        return {
+            'total': sum(status_counts.values()),
+            'by_status': status_counts,
+            'by_form_version': {version: count for version, count in by_form_version if count},
+            'by_day': [
+                {'day': day, 'total': sum(counts.values()), 'by_status': counts}
+                for day, counts in days.items()
+            ],
+        }
+
     async def create_for_telegram_user(self, telegram_id: int) -> Application:
         new_application = Application(
-            telegram_id=telegram_id, status=ApplicationStatus.DRAFT.value, data={}
+            telegram_id=telegram_id,
+            status=ApplicationStatus.DRAFT.value,
+            data={},
+            form_version=self._active_form_version(),
         )
         self.session.add(new_application)
         await self.session.commit()
-        await self.session.refresh(new_application)
         logger.info(
             f'Created new session for telegram_id={telegram_id} '
             f'with new application_uuid={new_application.id}'
@@ -81,42 +259,186 @@ class ApplicationRepository:
 
     async def create_for_web_user(self) -> Application:
         new_application = Application(
-            telegram_id=None, status=ApplicationStatus.DRAFT.value, data={}
+            telegram_id=None,
+            status=ApplicationStatus.DRAFT.value,
+            data={},
+            form_version=self._active_form_version(),
         )
         self.session.add(new_application)
         await self.session.commit()
-        await self.session.refresh(new_application)
         logger.info(f'Created new web session with application_uuid={new_application.id}')
         return new_application
 
     async def update_progress(
-        self, db_application: Application, update_data: ApplicationUpdate
-    ) -> Application:
-        db_application.data = update_data.data
-        self.session.add(db_application)
+        self,
+        application_uuid: UUID,
+        update_data: ApplicationUpdate,
+        expected_versions: Collection[int] | None = None,
+    ) -> Row | None:
+        """
+        Saves the form data of a draft in a single guarded UPDATE.
+
+        If `expected_versions` is given, the UPDATE only matches while the
+        application is still at one of these versions (optimistic concurrency).
+        Returns the (id, status, data, version) of the updated application, or
+        None if it does not exist, is no longer a draft or has another version.
+        """
+        conditions = [
+            Application.id == application_uuid,
+            Application.status == ApplicationStatus.DRAFT.value,
+        ]
+        if expected_versions is not None:
+            conditions.append(Application.version.in_(expected_versions))
+
+        result = await self.session.execute(
+            update(Application)
+            .where(*conditions)
+            .values(data=update_data.data, version=Application.version + 1)
+            .returning(Application.id, Application.status, Application.data, Application.version)
+        )
+        updated = result.one_or_none()
         await self.session.commit()
-        await self.session.refresh(db_application)
-        return db_application
+        return updated
 
     async def update_admin_details(
-        self, db_application: Application, update_data: ApplicationAdminUpdate
-    ) -> Application:
+        self,
+        application_uuid: UUID,
+        update_data: ApplicationAdminUpdate,
+        expected_versions: Collection[int] | None = None,
+    ) -> Application | None:
+        """
+        Applies an admin update in a single guarded UPDATE and returns the updated
+        application with its files.
+
+        A status change only matches if it is allowed from the current status by
+        STATUS_TRANSITIONS, and, if `expected_versions` is given, only while the
+        application is at one of these versions. Returns None if the application
+        does not exist or either condition fails.
+        """
+        conditions = [Application.id == application_uuid]
+        if expected_versions is not None:
+            conditions.append(Application.version.in_(expected_versions))
+        values = {}
+        if update_data.status is not None:
+            sources = statuses_allowing_transition_to(update_data.status)
+            conditions.append(Application.status.in_([source.value for source in sources]))
+            values['status'] = update_data.status.value
+        if update_data.admin_comment is not None:
+            values['admin_comment'] = update_data.admin_comment
+
+        if values:
+            result = await self.session.execute(
+                update(Application)
+                .where(*conditions)
+                .values(**values, version=Application.version + 1)
+                .returning(Application.id)
+            )
+            updated_id = result.scalar_one_or_none()
+            await self.session.commit()
+            if updated_id is None:
+                return None
+
+        application = await self.get_by_uuid(application_uuid, with_files=True)
+        # With nothing to write, the version precondition must still hold.
+        if (
+            application is not None
+            and not values
+            and expected_versions is not None
+            and application.version not in expected_versions
+        ):
+            return None
+        return application
+
+    async def bulk_update_admin_details(
+        self, update_data: ApplicationBulkUpdate
+    ) -> tuple[list[Row], bool]:
+        """
+        Applies one admin update to the selected applications in a single
+        set-based UPDATE and transaction.
+
+        Applications are selected by `application_ids` or by `current_status`.
+        Status changes only match applications whose current status allows the
+        transition. Returns the (id, status) of every updated application and
+        whether more applications are left to update.
+
+        A `current_status` selection updates at most MAX_BULK_APPLICATIONS of
+        the oldest applications the update would change; repeating the request
+        continues with the rest.
+        """
+        values = {}
         if update_data.status is not None:
-            db_application.status = update_data.status.value
+            values['status'] = update_data.status.value
         if update_data.admin_comment is not None:
-            db_application.admin_comment = update_data.admin_comment
-        self.session.add(db_application)
+            values['admin_comment'] = update_data.admin_comment
+
+        conditions = []
+        if update_data.status is not None:
+            sources = statuses_allowing_transition_to(update_data.status)
+            conditions.append(Application.status.in_([source.value for source in sources]))
+        if update_data.application_ids is not None:
+            conditions.append(Application.id.in_(update_data.application_ids))
+        else:
+            # Skip applications that already have the new values, so that a repeated
+            # request moves on to the next batch.
+            not_yet_applied = [
+                getattr(Application, field).is_distinct_from(value)
+                for field, value in values.items()
+            ]
+            conditions += [
+                Application.status == update_data.current_status.value,
+                or_(*not_yet_applied),
+            ]
+            batch = (
+                select(Application.id)
+                .where(*conditions)
+                .order_by(Application.created_at)
+                .limit(MAX_BULK_APPLICATIONS)
+            )
+            # The conditions are checked again by the UPDATE, in case a row changed since.
+            conditions = [Application.id.in_(batch), *conditions]
+
+        result = await self.session.execute(
+            update(Application)
+            .where(*conditions)
+            .values(**values, version=Application.version + 1)
+            .returning(Application.id, Application.status)
+        )
+        updated = list(result.all())
+        has_more = len(updated) == MAX_BULK_APPLICATIONS and update_data.application_ids is None
         await self.session.commit()
-        await self.session.refresh(db_application, attribute_names=['files'])
-        return db_application
+        return updated, has_more
+
+    async def get_statuses(self, application_uuids: Collection[UUID]) -> dict[UUID, str]:
+        """Returns the status of each existing application among the given ones."""
+        query = select(Application.id, Application.status).where(
+            Application.id.in_(application_uuids)
+        )
+        result = await self.session.execute(query)
+        return dict(result.tuples().all())
 
-    async def submit_application(self, db_application: Application) -> Application:
-        db_application.status = ApplicationStatus.NEW.value
-        self.session.add(db_application)
+    async def submit_application(self, application_uuid: UUID) -> bool:
+        """
+        Moves a draft to 'new' in a single guarded UPDATE. Returns False if the
+        application does not exist or is not a draft (e.g. a concurrent submit won).
+        """
+        result = await self.session.execute(
+            update(Application)
+            .where(
+                Application.id == application_uuid,
+                Application.status == ApplicationStatus.DRAFT.value,
+            )
+            .values(status=ApplicationStatus.NEW.value, version=Application.version + 1)
+            .returning(Application.id)
+        )
+        submitted = result.scalar_one_or_none() is not None
         await self.session.commit()
-        return db_application
+        return submitted
 
-    async def link_file(self, application_uuid: UUID, file_link: FileLinkRequest) -> None:
+    async def link_file(self, application_uuid: UUID, file_link: FileLinkRequest) -> str | None:
+        """
+        Links an uploaded file to the application. Returns the file_id of the
+        stored documents archive this made stale, if any, for the caller to delete.
+        """
         new_file_link = ApplicationFile(
             application_id=application_uuid,
             file_id=file_link.file_id,
@@ -124,4 +446,127 @@ class ApplicationRepository:
             form_field_id=file_link.form_field_id,
         )
         self.session.add(new_file_link)
+        # The stored documents archive no longer matches the file list.
+        result = await self.session.execute(
+            delete(ApplicationArchive)
+            .where(ApplicationArchive.application_id == application_uuid)
+            .returning(ApplicationArchive.file_id)
+        )
+        stale_file_id = result.scalar_one_or_none()
         await self.session.commit()
+        return stale_file_id
+
+    async def get_archive_file_id(self, application_uuid: UUID, files_hash: str) -> str | None:
+        """Returns the stored documents archive built from the given file list, if any."""
+        query = select(ApplicationArchive.file_id).where(
+            ApplicationArchive.application_id == application_uuid,
+            ApplicationArchive.files_hash == files_hash,
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def save_archive(
+        self, application_uuid: UUID, files_hash: str, file_id: str
+    ) -> tuple[str, str | None]:
+        """
+        Records the stored documents archive of an application. Returns the
+        file_id of the archive to serve and that of a stored archive no longer
+        referenced, if any, for the caller to delete.
+
+        The current row is locked, so concurrent builds (e.g. a download and a
+        background job) are serialized. An archive of the same file list that
+        is already stored is kept, and the new upload is the one to delete: a
+        completed job may already point at the stored one. An archive of an
+        older file list is replaced.
+        """
+        stored = (
+            await self.session.execute(
+                select(ApplicationArchive.files_hash, ApplicationArchive.file_id)
+                .where(ApplicationArchive.application_id == application_uuid)
+                .with_for_update()
+            )
+        ).one_or_none()
+        if stored is not None and stored.files_hash == files_hash:
+            await self.session.commit()
+            return stored.file_id, file_id
+
+        dialect_insert = (
+            postgresql_insert
+            if self.session.get_bind().dialect.name == 'postgresql'
+            else sqlite_insert
+        )
+        query = dialect_insert(ApplicationArchive).values(
+            application_id=application_uuid, files_hash=files_hash, file_id=file_id
+        )
+        await self.session.execute(
+            query.on_conflict_do_update(
+                index_elements=[ApplicationArchive.application_id],
+                set_={
+                    'files_hash': query.excluded.files_hash,
+                    'file_id': query.excluded.file_id,
+                    'created_at': func.now(),
+                },
+            )
+        )
+        await self.session.commit()
+        return file_id, stored.file_id if stored is not None else None
+
+    async def replace_match_keys(self, application_uuid: UUID, keys: set[str]) -> None:
+        """Stores the identity keys of an application, replacing any previous ones."""
+        await self.session.execute(
+            delete(ApplicationMatchKey).where(
+                ApplicationMatchKey.application_id == application_uuid
+            )
+        )
+        if keys:
+            await self.session.execute(
+                insert(ApplicationMatchKey),
+                [{'application_id': application_uuid, 'key': key} for key in keys],
+            )
+        await self.session.commit()
+
+    async def get_possible_duplicates(
+        self, application_uuid: UUID, limit: int = 20
+    ) -> list[dict[str, Any]]:
+        """
+        Returns other applications sharing an identity key with this one, each
+        with its status and the kinds of keys that matched (e.g. 'phone').
+        Uses only index lookups on the match keys, never a scan of applications.
+        """
+        own_key = aliased(ApplicationMatchKey)
+        other_key = aliased(ApplicationMatchKey)
+        shares_a_key = (
+            select(other_key.application_id)
+            .join(own_key, own_key.key == other_key.key)
+            .where(
+                own_key.application_id == application_uuid,
+                other_key.application_id != application_uuid,
+            )
+        )
+        # The limit is applied in SQL, so a widely shared key (e.g. a fund's contact
+        # email) loads at most `limit` applications.
+        matches = await self.session.execute(
+            select(Application.id, Application.status)
+            .where(Application.id.in_(shares_a_key))
+            .order_by(desc(Application.created_at))
+            .limit(limit)
+        )
+        duplicates = {
+            application_id: {'application_id': application_id, 'status': status, 'matched_on': []}
+            for application_id, status in matches
+        }
+        if not duplicates:
+            return []
+
+        matched_keys = await self.session.execute(
+            select(other_key.application_id, other_key.key)
+            .join(own_key, own_key.key == other_key.key)
+            .where(
+                own_key.application_id == application_uuid,
+                other_key.application_id.in_(duplicates),
+            )
+            .order_by(other_key.key)
+        )
+        for application_id, key in matched_keys:
+            duplicates[application_id]['matched_on'].append(key.partition(':')[0])
+        return list(duplicates.values())
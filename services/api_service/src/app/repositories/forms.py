@@ -18,6 +18,14 @@ class FormSchemaRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_active_schema_id(self) -> int | None:
+        """
+        Returns only the id of the active schema, to check a cached copy cheaply.
+        """
+        query = select(FormSchema.id).where(FormSchema.is_active.is_(True))
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
     async def create_and_set_active_schema(self, schema_upload: FormSchemaUpload) -> FormSchema:
         """
         Creates a new schema, sets it as active, and deactivates all others.
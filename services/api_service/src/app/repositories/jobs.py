@@ -0,0 +1,144 @@
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import func
+
+from app.models.db_models import Job
+from app.schemas.jobs import JobKind, JobStatus
+
+
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def enqueue(self, kind: JobKind, params: dict[str, Any] | None = None) -> Job:
+        """Creates a queued job for the worker to pick up."""
+        job = Job(kind=kind.value, params=params or {}, status=JobStatus.QUEUED.value)
+        self.session.add(job)
+        await self.session.commit()
+        return job
+
+    async def get(self, job_id: UUID) -> Job | None:
+        result = await self.session.execute(select(Job).where(Job.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def claim_next(self) -> Job | None:
+        """
+        Marks the oldest queued job that is due as running and returns it, in
+        one UPDATE.
+
+        The job row is selected with `FOR UPDATE SKIP LOCKED`, so concurrent
+        workers each claim a different job instead of waiting on one another.
+        Returns None if no job is due.
+        """
+        next_job_id = (
+            select(Job.id)
+            .where(Job.status == JobStatus.QUEUED.value, Job.run_after <= datetime.now(UTC))
+            .order_by(Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.id == next_job_id)
+            .values(
+                status=JobStatus.RUNNING.value,
+                attempts=Job.attempts + 1,
+                started_at=func.now(),
+                heartbeat_at=func.now(),
+                error=None,
+            )
+            .returning(Job)
+        )
+        job = result.scalar_one_or_none()
+        await self.session.commit()
+        return job
+
+    # The methods below act on one attempt of a running job, identified by its
+    # `attempts` count. They change nothing if the job was recovered as stale
+    # meanwhile, and possibly claimed again by another worker. They return
+    # whether the job was still owned.
+
+    async def heartbeat(self, job_id: UUID, attempts: int) -> bool:
+        """Records that the attempt is still running."""
+        return await self._update_owned(job_id, attempts, heartbeat_at=func.now())
+
+    async def complete(
+        self,
+        job_id: UUID,
+        attempts: int,
+        result_file_id: str | None = None,
+        result_filename: str | None = None,
+    ) -> bool:
+        """Records a finished attempt and its result file, for jobs that produce one."""
+        return await self._update_owned(
+            job_id,
+            attempts,
+            status=JobStatus.COMPLETED.value,
+            result_file_id=result_file_id,
+            result_filename=result_filename,
+            finished_at=func.now(),
+        )
+
+    async def fail(
+        self, job_id: UUID, attempts: int, error: str, retry_at: datetime | None = None
+    ) -> bool:
+        """Records a failed attempt, queueing the job to run again at `retry_at` if set."""
+        if retry_at is not None:
+            return await self._update_owned(
+                job_id, attempts, status=JobStatus.QUEUED.value, error=error, run_after=retry_at
+            )
+        return await self._update_owned(
+            job_id, attempts, status=JobStatus.FAILED.value, error=error, finished_at=func.now()
+        )
+
+    async def _update_owned(self, job_id: UUID, attempts: int, **values: Any) -> bool:
+        result = await self.session.execute(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.status == JobStatus.RUNNING.value,
+                Job.attempts == attempts,
+            )
+            .values(**values)
+            .returning(Job.id)
+        )
+        owned = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return owned
+
+    async def requeue_stale(self, heartbeat_before: datetime, max_attempts: int) -> int:
+        """
+        Recovers jobs left running by a worker that died: jobs without a
+        heartbeat since `heartbeat_before` are queued again, or failed once they
+        have used up `max_attempts`. Returns the number of recovered jobs.
+        """
+        stale = [Job.status == JobStatus.RUNNING.value, Job.heartbeat_at < heartbeat_before]
+        requeued = await self.session.execute(
+            update(Job)
+            .where(*stale, Job.attempts < max_attempts)
+            .values(
+                status=JobStatus.QUEUED.value,
+                error='The worker running the job stopped.',
+                run_after=func.now(),
+            )
+            .returning(Job.id)
+        )
+        failed = await self.session.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= max_attempts)
+            .values(
+                status=JobStatus.FAILED.value,
+                error='The worker running the job stopped.',
+                finished_at=func.now(),
+            )
+            .returning(Job.id)
+        )
+        recovered = len(requeued.all()) + len(failed.all())
+        await self.session.commit()
+        return recovered
@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class ApplicationStatus(str, Enum):
@@ -13,6 +13,36 @@ class ApplicationStatus(str, Enum):
     REJECTED = 'rejected'
 
 
+MAX_BULK_APPLICATIONS = 1000
+
+# Allowed status changes: current status -> statuses it may move to.
+# Nothing returns to DRAFT: a user may only have one draft at a time. Admins
+# cannot move drafts either: a draft only becomes NEW when it is submitted,
+# which also flushes its buffered autosaves, indexes it for duplicate matching
+# and announces the change.
+STATUS_TRANSITIONS: dict[ApplicationStatus, frozenset[ApplicationStatus]] = {
+    ApplicationStatus.DRAFT: frozenset(),
+    ApplicationStatus.NEW: frozenset(
+        {ApplicationStatus.IN_PROGRESS, ApplicationStatus.COMPLETED, ApplicationStatus.REJECTED}
+    ),
+    ApplicationStatus.IN_PROGRESS: frozenset(
+        {ApplicationStatus.NEW, ApplicationStatus.COMPLETED, ApplicationStatus.REJECTED}
+    ),
+    ApplicationStatus.COMPLETED: frozenset({ApplicationStatus.IN_PROGRESS}),
+    ApplicationStatus.REJECTED: frozenset({ApplicationStatus.IN_PROGRESS}),
+}
+
+
+def statuses_allowing_transition_to(target: ApplicationStatus) -> frozenset[ApplicationStatus]:
+    """
+    Returns every status from which an application may move to `target`,
+    including `target` itself (setting the same status again is a no-op).
+    """
+    return frozenset(
+        source for source, targets in STATUS_TRANSITIONS.items() if target in targets
+    ) | {target}
+
+
 class FileLinkRequest(BaseModel):
     """Schema to link an uploaded file to an application."""
 
@@ -53,6 +83,57 @@ class ApplicationAdminUpdate(BaseModel):
     admin_comment: str | None = Field(None, description='Internal comment from a staff member.')
 
 
+class ApplicationBulkUpdate(ApplicationAdminUpdate):
+    """Input schema for applying one admin update to many applications at once."""
+
+    application_ids: list[UUID] | None = Field(None, min_length=1, max_length=MAX_BULK_APPLICATIONS)
+    current_status: ApplicationStatus | None = Field(
+        None,
+        description=(
+            'Select applications in this status instead of listing ids. At most '
+            f'{MAX_BULK_APPLICATIONS} are updated per request, see `has_more`.'
+        ),
+    )
+
+    @model_validator(mode='after')
+    def check_selection_and_changes(self) -> 'ApplicationBulkUpdate':
+        if (self.application_ids is None) == (self.current_status is None):
+            raise ValueError('Specify either application_ids or current_status.')
+        if self.current_status == ApplicationStatus.DRAFT:
+            # Drafts are still being filled in (and may have unsaved autosaves).
+            raise ValueError('Drafts cannot be selected by status.')
+        if self.status is None and self.admin_comment is None:
+            raise ValueError('Specify a status or an admin_comment to apply.')
+        return self
+
+
+class BulkUpdateResult(str, Enum):
+    UPDATED = 'updated'
+    NOT_FOUND = 'not_found'
+    TRANSITION_NOT_ALLOWED = 'transition_not_allowed'
+
+
+class ApplicationBulkItemResult(BaseModel):
+    """Outcome of a bulk update for a single application."""
+
+    application_id: UUID
+    result: BulkUpdateResult
+    status: ApplicationStatus | None = Field(
+        None, description='Status after the update, or the unchanged current status.'
+    )
+
+
+class ApplicationBulkUpdateResponse(BaseModel):
+    """Response schema for a bulk admin update."""
+
+    updated: int
+    results: list[ApplicationBulkItemResult]
+    has_more: bool = Field(
+        False,
+        description='The batch limit was reached: repeat the request to update the rest.',
+    )
+
+
 class ApplicationPublic(BaseModel):
     """Represents the application data visible to the user (Mini App)."""
 
@@ -71,13 +152,47 @@ class ApplicationAdmin(BaseModel):
     data: dict
     admin_comment: str | None
     telegram_id: int | None
+    form_version: str | None = None
     created_at: datetime
     files: list[ApplicationFileResponse] = []
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class DuplicateMatch(BaseModel):
+    """Another application that shares identity data with the current one."""
+
+    application_id: UUID
+    status: ApplicationStatus
+    matched_on: list[str] = Field(description='Kinds of matching data: phone, email, name_dob')
+
+
+class ApplicationAdminDetail(ApplicationAdmin):
+    """Full application data for the admin detail view, with possible duplicates."""
+
+    possible_duplicates: list[DuplicateMatch] = []
+
+
 class ApplicationStatusResponse(BaseModel):
     """Response schema for getting the status of an application."""
 
     status: ApplicationStatus
+
+
+class DailyApplicationStats(BaseModel):
+    """Number of applications created on a day, by their current status."""
+
+    day: date
+    total: int
+    by_status: dict[ApplicationStatus, int]
+
+
+class ApplicationStatsResponse(BaseModel):
+    """Aggregated application counts for the admin dashboard."""
+
+    total: int
+    by_status: dict[ApplicationStatus, int]
+    by_form_version: dict[str, int] = Field(
+        description='Counts per form schema version; "" for applications without one.'
+    )
+    by_day: list[DailyApplicationStats]
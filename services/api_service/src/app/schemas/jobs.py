@@ -0,0 +1,35 @@
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobKind(str, Enum):
+    APPLICATIONS_EXPORT = 'applications_export'
+    DOCUMENTS_ZIP = 'documents_zip'
+    MATCH_KEYS = 'match_keys'
+
+
+class JobStatus(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+
+class JobResponse(BaseModel):
+    """Output schema describing a background job and, once completed, its result."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    attempts: int
+    error: str | None = None
+    result_filename: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    download_url: str | None = None
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class RequestProfileSummary(BaseModel):
+    """Output schema describing a stored request profile."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    sql_count: int
+    sql_duration_ms: float
+    created_at: datetime
@@ -1,4 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.schemas.applications import ApplicationStatus
+
+
+MAX_BATCH_TELEGRAM_IDS = 5000
 
 
 class TelegramSessionRequest(BaseModel):
@@ -7,3 +12,20 @@ class TelegramSessionRequest(BaseModel):
 
 class SessionResponse(BaseModel):
     application_uuid: str
+
+
+class TelegramStatusBatchRequest(BaseModel):
+    """Request schema for looking up application statuses of many Telegram users."""
+
+    telegram_ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_TELEGRAM_IDS)
+
+
+class TelegramStatusBatchResponse(BaseModel):
+    """Latest application status per Telegram user."""
+
+    statuses: dict[int, ApplicationStatus] = Field(
+        ..., description='Status of the most recent application, keyed by telegram_id.'
+    )
+    not_found: list[int] = Field(
+        ..., description='Requested telegram_ids that have no applications.'
+    )
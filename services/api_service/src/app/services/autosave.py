@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import weakref
+from collections import Counter
+from collections.abc import Callable, Iterator
+from typing import Any
+from uuid import UUID
+
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.repositories.applications import ApplicationRepository
+from app.schemas.applications import ApplicationUpdate
+
+
+logger = logging.getLogger(__name__)
+
+
+class AutosaveBuffer:
+    """
+    Write-behind buffer that coalesces rapid progress saves of the same application.
+
+    The first save of an application starts a window of `window_seconds`; saves
+    arriving within it only replace the buffered data, and a single UPDATE is
+    issued when the window ends. Pending data is also flushed before the
+    application is submitted or read back, and on shutdown.
+
+    Durability: a buffered save is acknowledged before it reaches the database,
+    so a crash of the process loses at most the last `window_seconds` of edits.
+    The buffer is per process: with several workers, a submit handled by another
+    worker does not see this worker's pending data, so only enable it when
+    requests for one application are routed to the same worker.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], window_seconds: float) -> None:
+        self.session_factory = session_factory
+        self.window_seconds = window_seconds
+        self.stats: Counter[str] = Counter()
+        self._pending: dict[UUID, dict[str, Any]] = {}
+        self._timers: dict[UUID, asyncio.Task] = {}
+        self._locks: weakref.WeakValueDictionary[UUID, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    def has_pending(self, application_uuid: UUID) -> bool:
+        return application_uuid in self._pending
+
+    def save(self, application_uuid: UUID, data: dict[str, Any]) -> None:
+        """Buffers the latest form data of a draft application."""
+        self.stats['saves'] += 1
+        if application_uuid in self._pending:
+            self.stats['coalesced'] += 1
+        self._pending[application_uuid] = data
+
+        if application_uuid not in self._timers:
+            self._timers[application_uuid] = asyncio.create_task(
+                self._flush_later(application_uuid)
+            )
+
+    async def flush(self, application_uuid: UUID) -> None:
+        """Writes the pending data of an application, if any, to the database."""
+        timer = self._timers.pop(application_uuid, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+
+        lock = self._locks.get(application_uuid)
+        if lock is None:
+            lock = self._locks[application_uuid] = asyncio.Lock()
+
+        # Serialize writes per application so an older snapshot never overwrites a newer one.
+        async with lock:
+            data = self._pending.pop(application_uuid, None)
+            if data is not None:
+                await self._write(application_uuid, data)
+
+    async def flush_all(self) -> None:
+        """Writes all pending data. Called on shutdown."""
+        for application_uuid in list(self._pending):
+            await self.flush(application_uuid)
+
+    def metrics(self) -> dict[str, int]:
+        return {**self.stats, 'pending': len(self._pending)}
+
+    async def _flush_later(self, application_uuid: UUID) -> None:
+        await asyncio.sleep(self.window_seconds)
+        await self.flush(application_uuid)
+
+    async def _write(self, application_uuid: UUID, data: dict[str, Any]) -> None:
+        try:
+            async with self.session_factory() as session:
+                repo = ApplicationRepository(session=session)
+                updated = await repo.update_progress(application_uuid, ApplicationUpdate(data=data))
+        except Exception:
+            self.stats['flush_errors'] += 1
+            logger.error(f'Failed to flush autosave for {application_uuid}', exc_info=True)
+            # Keep the data unless a newer save has already replaced it, and retry later.
+            if application_uuid not in self._pending:
+                self.save(application_uuid, data)
+            return
+
+        self.stats['flushes'] += 1
+        if updated is None:
+            self.stats['dropped'] += 1
+            logger.warning(f'Dropped autosave for {application_uuid}: no longer a draft.')
+
+
+class AutosaveCollector(Collector):
+    """Exposes the counters of the autosave coalescing buffer."""
+
+    def __init__(self, buffer: AutosaveBuffer) -> None:
+        self.buffer = buffer
+
+    def collect(self) -> Iterator[CounterMetricFamily | GaugeMetricFamily]:
+        stats = self.buffer.metrics()
+        pending = stats.pop('pending')
+        events = CounterMetricFamily(
+            'autosave_events', 'Autosave buffer events by kind.', labels=['event']
+        )
+        for event, count in stats.items():
+            events.add_metric([event], count)
+        yield events
+        yield GaugeMetricFamily(
+            'autosave_pending', 'Applications with buffered, unwritten data.', value=pending
+        )
+
+
+autosave_buffer = AutosaveBuffer(
+    session_factory=AsyncSessionLocal, window_seconds=settings.AUTOSAVE_COALESCE_WINDOW_SECONDS
+)
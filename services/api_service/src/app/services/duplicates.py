@@ -0,0 +1,66 @@
+import re
+from datetime import datetime
+from typing import Any
+
+
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y')
+
+
+def normalize_phone(value: Any) -> str | None:
+    """
+    Reduces a Russian phone number to 11 digits starting with 7, whatever its
+    formatting ('8 (916) 123-45-67', '+79161234567', '9161234567').
+    """
+    if not isinstance(value, str):
+        return None
+    digits = re.sub(r'\D', '', value)
+    if len(digits) == 10:
+        digits = f'7{digits}'
+    elif len(digits) == 11 and digits.startswith('8'):
+        digits = f'7{digits[1:]}'
+    return digits if len(digits) >= 10 else None
+
+
+def normalize_name(value: Any) -> str | None:
+    """
+    Lower-cases a full name, replaces the letter yo with ye and sorts its words, so that
+    'Иванов Иван' and 'иван  ИВАНОВ' produce the same key.
+    """
+    if not isinstance(value, str):
+        return None
+    words = re.findall(r'\w+', value.lower().replace('ё', 'е'))
+    return ' '.join(sorted(words)) or None
+
+
+def normalize_date(value: Any) -> str | None:
+    """Returns a date in ISO format, or None if it cannot be parsed."""
+    if not isinstance(value, str):
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def match_keys(data: dict[str, Any]) -> set[str]:
+    """
+    Builds the blocking keys of an application from its identity fields.
+
+    Two applications sharing any key are likely duplicates: the same contact
+    phone or email, or the same beneficiary name and birth date. Each key is
+    prefixed with its kind, e.g. 'phone:79161234567'.
+    """
+    keys = set()
+    if phone := normalize_phone(data.get('phone')):
+        keys.add(f'phone:{phone}')
+    email = data.get('email')
+    if isinstance(email, str) and '@' in email:
+        keys.add(f'email:{email.strip().lower()}')
+
+    name = normalize_name(data.get('beneficiary_name'))
+    birth_date = normalize_date(data.get('beneficiary_dob'))
+    if name and birth_date:
+        keys.add(f'name_dob:{name}|{birth_date}')
+    return keys
@@ -1,8 +1,6 @@
 import io
 from typing import Any
 
-import pandas as pd
-
 from app.models.db_models import Application
 
 
@@ -19,6 +17,10 @@ def generate_xlsx_export(applications: list[Application]) -> io.BytesIO:
     if not applications:
         return io.BytesIO()
 
+    # Imported on first use: pandas (with numpy and openpyxl) adds about 50 MB and
+    # a noticeable delay to every worker's startup, while exports are rare.
+    import pandas as pd
+
     flat_data: list[dict[str, Any]] = []
     for app in applications:
         app_dict = {
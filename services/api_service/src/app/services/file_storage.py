@@ -0,0 +1,35 @@
+from typing import BinaryIO
+
+import httpx
+
+from app.core.config import Settings
+
+
+async def upload_file(content: BinaryIO, filename: str, media_type: str, settings: Settings) -> str:
+    """Stores a file in file-storage-service and returns its file_id."""
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            f'{settings.FILE_STORAGE_SERVICE_URL}/api/v1/files/',
+            files={'file': (filename, content, media_type)},
+        )
+        response.raise_for_status()
+        return response.json()['file_id']
+
+
+async def delete_file(file_id: str, settings: Settings) -> None:
+    """Deletes a stored file from file-storage-service."""
+    async with httpx.AsyncClient() as client:
+        response = await client.delete(
+            f'{settings.FILE_STORAGE_SERVICE_URL}/api/v1/files/{file_id}'
+        )
+        response.raise_for_status()
+
+
+async def get_download_url(file_id: str, settings: Settings) -> str:
+    """Returns a temporary public download link for a stored file."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(
+            f'{settings.FILE_STORAGE_SERVICE_URL}/api/v1/files/{file_id}/download-link'
+        )
+        response.raise_for_status()
+        return response.json()['download_url']
@@ -0,0 +1,220 @@
+import asyncio
+import contextlib
+import io
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import Settings
+from app.repositories.applications import ApplicationRepository
+from app.repositories.jobs import JobRepository
+from app.schemas.applications import ApplicationStatus
+from app.schemas.jobs import JobKind
+from app.services.duplicates import match_keys
+from app.services.export_service import generate_xlsx_export
+from app.services.file_storage import upload_file
+from app.services.zip_service import build_and_store_documents_archive, documents_hash
+
+
+logger = logging.getLogger(__name__)
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# How often the worker looks for jobs left running by a worker that died.
+STALE_CHECK_INTERVAL_SECONDS = 60.0
+
+
+class JobError(Exception):
+    """A job failure that retrying cannot fix, e.g. the application no longer exists."""
+
+
+@dataclass
+class JobResult:
+    filename: str
+    media_type: str
+    content: io.BytesIO | None = None
+    # Set when the result is already in file storage, so the worker does not upload it.
+    file_id: str | None = None
+
+
+async def export_applications(
+    session: AsyncSession, params: dict[str, Any], settings: Settings
+) -> JobResult:
+    applications = await ApplicationRepository(session).get_all(limit=10000)
+    # Building the workbook is CPU-bound; a thread keeps the other jobs of this worker moving.
+    content = await asyncio.to_thread(generate_xlsx_export, applications)
+    filename = f'applications_export_{datetime.now(UTC):%Y%m%d_%H%M%S}.xlsx'
+    return JobResult(content=content, filename=filename, media_type=XLSX_MEDIA_TYPE)
+
+
+async def archive_documents(
+    session: AsyncSession, params: dict[str, Any], settings: Settings
+) -> JobResult:
+    application_uuid = UUID(params['application_uuid'])
+    repo = ApplicationRepository(session)
+    application = await repo.get_by_uuid(application_uuid, with_files=True)
+    if application is None or not application.files:
+        raise JobError(f'Application {application_uuid} or its documents no longer exist.')
+
+    result = JobResult(
+        filename=f'application_docs_{application_uuid}.zip', media_type='application/zip'
+    )
+    result.file_id = await repo.get_archive_file_id(application_uuid, documents_hash(application))
+    if result.file_id is None:
+        result.content, result.file_id = await build_and_store_documents_archive(
+            application, repo, settings
+        )
+    return result
+
+
+async def index_match_keys(
+    session: AsyncSession, params: dict[str, Any], settings: Settings
+) -> None:
+    """Stores the duplicate matching keys of a submitted application. Produces no file."""
+    application_uuid = UUID(params['application_uuid'])
+    repo = ApplicationRepository(session)
+    application = await repo.get_by_uuid(application_uuid)
+    if application is None:
+        raise JobError(f'Application {application_uuid} no longer exists.')
+    if application.status == ApplicationStatus.DRAFT.value:
+        raise JobError(f'Application {application_uuid} is a draft; drafts are not matched.')
+    await repo.replace_match_keys(application_uuid, match_keys(application.data or {}))
+
+
+JOB_HANDLERS: dict[
+    JobKind, Callable[[AsyncSession, dict[str, Any], Settings], Awaitable[JobResult | None]]
+] = {
+    JobKind.APPLICATIONS_EXPORT: export_applications,
+    JobKind.DOCUMENTS_ZIP: archive_documents,
+    JobKind.MATCH_KEYS: index_match_keys,
+}
+
+
+class JobWorker:
+    """
+    Runs background jobs from the `jobs` table.
+
+    `JOB_WORKER_CONCURRENCY` loops each claim the oldest queued job, run its
+    handler, upload its result file (if any) to file-storage-service and record
+    the outcome.
+    Several worker processes may run side by side: claiming uses SKIP LOCKED,
+    so each queued job is claimed by a single worker.
+
+    A failed job is queued again, after an exponential backoff, until it has
+    been attempted `JOB_MAX_ATTEMPTS` times, except for JobError failures, which
+    are final. While a job runs, its heartbeat is refreshed every
+    `JOB_HEARTBEAT_INTERVAL_SECONDS`; jobs without a heartbeat for
+    `JOB_STALE_AFTER_SECONDS` are assumed lost with their worker and recovered.
+    The outcome of an attempt that was recovered meanwhile is discarded.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], settings: Settings) -> None:
+        self.session_factory = session_factory
+        self.settings = settings
+
+    async def run_next(self) -> bool:
+        """Runs the oldest queued job, if any. Returns False if none was due."""
+        async with self.session_factory() as session:
+            repo = JobRepository(session)
+            job = await repo.claim_next()
+            if job is None:
+                return False
+
+            # A rollback expires the job object, so keep what is needed afterwards.
+            job_id, attempts = job.id, job.attempts
+            logger.info(f'Running job {job_id} ({job.kind}), attempt {attempts}.')
+            heartbeat = asyncio.create_task(self._heartbeat(job_id, attempts))
+            file_id = filename = None
+            try:
+                result = await JOB_HANDLERS[JobKind(job.kind)](session, job.params, self.settings)
+                if result is not None:
+                    filename = result.filename
+                    file_id = result.file_id or await upload_file(
+                        result.content, result.filename, result.media_type, self.settings
+                    )
+            except JobError as e:
+                logger.warning(f'Job {job_id} failed: {e}')
+                await session.rollback()
+                owned = await repo.fail(job_id, attempts, str(e))
+            except Exception as e:
+                retry_at = self._retry_at(attempts)
+                logger.error(f'Job {job_id} failed (retry at: {retry_at}).', exc_info=True)
+                await session.rollback()
+                owned = await repo.fail(job_id, attempts, f'{type(e).__name__}: {e}', retry_at)
+            else:
+                owned = await repo.complete(job_id, attempts, file_id, filename)
+                if owned:
+                    logger.info(f'Job {job_id} completed, result file: {file_id}.')
+            finally:
+                heartbeat.cancel()
+            if not owned:
+                logger.warning(
+                    f'Job {job_id} was recovered as stale during attempt {attempts}; '
+                    'its outcome is discarded.'
+                )
+            return True
+
+    def _retry_at(self, attempts: int) -> datetime | None:
+        """Returns when to retry a job after its failed attempt, or None if out of attempts."""
+        if attempts >= self.settings.JOB_MAX_ATTEMPTS:
+            return None
+        delay = self.settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+        return datetime.now(UTC) + timedelta(seconds=delay)
+
+    async def _heartbeat(self, job_id: UUID, attempts: int) -> None:
+        """Refreshes the heartbeat of a running job, in its own session, until cancelled."""
+        while True:
+            await asyncio.sleep(self.settings.JOB_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                async with self.session_factory() as session:
+                    if not await JobRepository(session).heartbeat(job_id, attempts):
+                        return
+            except Exception:
+                logger.error(f'Failed to refresh the heartbeat of job {job_id}.', exc_info=True)
+
+    async def recover_stale(self) -> int:
+        """Queues again (or fails) the jobs whose worker stopped while running them."""
+        heartbeat_before = datetime.now(UTC) - timedelta(
+            seconds=self.settings.JOB_STALE_AFTER_SECONDS
+        )
+        async with self.session_factory() as session:
+            return await JobRepository(session).requeue_stale(
+                heartbeat_before, max_attempts=self.settings.JOB_MAX_ATTEMPTS
+            )
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Processes jobs until `stop` is set, finishing the jobs already started."""
+        await asyncio.gather(
+            self._recover_stale_loop(stop),
+            *(self._job_loop(stop) for _ in range(self.settings.JOB_WORKER_CONCURRENCY)),
+        )
+
+    async def _job_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                found = await self.run_next()
+            except Exception:
+                logger.error('Failed to fetch the next job.', exc_info=True)
+                found = False
+            if not found:
+                await _wait(stop, self.settings.JOB_POLL_INTERVAL_SECONDS)
+
+    async def _recover_stale_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                recovered = await self.recover_stale()
+                if recovered:
+                    logger.warning(f'Recovered {recovered} jobs left running by a stopped worker.')
+            except Exception:
+                logger.error('Failed to recover stale jobs.', exc_info=True)
+            await _wait(stop, STALE_CHECK_INTERVAL_SECONDS)
+
+
+async def _wait(stop: asyncio.Event, seconds: float) -> None:
+    """Sleeps for `seconds`, returning early once `stop` is set."""
+    with contextlib.suppress(TimeoutError):
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
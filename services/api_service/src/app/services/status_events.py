@@ -0,0 +1,194 @@
+import asyncio
+import contextlib
+import json
+import logging
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from uuid import UUID
+
+import asyncpg
+
+from app.schemas.applications import ApplicationStatus
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'application_status'
+# Delays between attempts to re-establish a lost LISTEN connection.
+RECONNECT_DELAY_SECONDS = 1.0
+RECONNECT_DELAY_MAX_SECONDS = 30.0
+
+# Statuses after which the web widget has nothing left to wait for.
+FINAL_STATUSES = frozenset({ApplicationStatus.COMPLETED.value, ApplicationStatus.REJECTED.value})
+
+
+class StatusEventBus:
+    """
+    Delivers application status changes to subscribers (e.g. open SSE streams).
+
+    Without a database connection, events are dispatched only inside the current
+    process. After `start()` is called, events are published with PostgreSQL
+    NOTIFY and received through LISTEN, so every API worker sees every change.
+
+    If the connection is lost (e.g. a PostgreSQL restart or failover), events are
+    delivered locally while it is re-established in the background; changes made
+    by other workers in the meantime are missed.
+
+    Each subscriber queue holds only the latest status: a slow consumer skips
+    intermediate states instead of accumulating a backlog.
+    """
+
+    def __init__(self):
+        self._subscribers: defaultdict[UUID, set[asyncio.Queue[str]]] = defaultdict(set)
+        self._connection: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._dsn: str | None = None
+        self._reconnect_task: asyncio.Task | None = None
+
+    async def start(self, dsn: str) -> None:
+        """Opens a dedicated connection and starts listening for status changes."""
+        self._dsn = dsn
+        await self._connect()
+        logger.info(f'Listening for status events on channel "{CHANNEL}".')
+
+    async def stop(self) -> None:
+        self._dsn = None
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reconnect_task
+            self._reconnect_task = None
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        await connection.add_listener(CHANNEL, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        # Also called when stop() closes the connection, which it detaches first.
+        if connection is not self._connection or self._dsn is None:
+            return
+        logger.error('Lost the status events connection, reconnecting.')
+        self._connection = None
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = RECONNECT_DELAY_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception:
+                logger.warning(f'Failed to reconnect for status events, retrying in {delay}s.')
+                delay = min(delay * 2, RECONNECT_DELAY_MAX_SECONDS)
+                continue
+            logger.info(f'Listening for status events on channel "{CHANNEL}" again.')
+            self._reconnect_task = None
+            return
+
+    def subscribe(self, application_id: UUID) -> asyncio.Queue[str]:
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=1)
+        self._subscribers[application_id].add(queue)
+        return queue
+
+    def unsubscribe(self, application_id: UUID, queue: asyncio.Queue[str]) -> None:
+        subscribers = self._subscribers.get(application_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[application_id]
+
+    async def publish(self, application_id: UUID, status: str) -> None:
+        """Announces that an application's status has changed."""
+        if self._connection is not None:
+            try:
+                async with self._lock:
+                    await self._connection.execute(
+                        'SELECT pg_notify($1, $2)', CHANNEL, f'{application_id}:{status}'
+                    )
+                return
+            except Exception:
+                logger.error('Failed to publish status event, delivering locally.', exc_info=True)
+        self._dispatch(application_id, status)
+
+    async def publish_many(self, events: list[tuple[UUID, str]]) -> None:
+        """Announces many status changes with a single database round trip."""
+        if not events:
+            return
+        if self._connection is not None:
+            try:
+                async with self._lock:
+                    await self._connection.execute(
+                        'SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload',
+                        CHANNEL,
+                        [f'{application_id}:{status}' for application_id, status in events],
+                    )
+                return
+            except Exception:
+                logger.error('Failed to publish status events, delivering locally.', exc_info=True)
+        for application_id, status in events:
+            self._dispatch(application_id, status)
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        application_id, _, status = payload.partition(':')
+        self._dispatch(UUID(application_id), status)
+
+    def _dispatch(self, application_id: UUID, status: str) -> None:
+        for queue in self._subscribers.get(application_id, ()):
+            if queue.full():
+                with contextlib.suppress(asyncio.QueueEmpty):
+                    queue.get_nowait()
+            queue.put_nowait(status)
+
+
+status_event_bus = StatusEventBus()
+
+
+def _format_status_event(status: str) -> str:
+    return f'event: status\ndata: {json.dumps({"status": status})}\n\n'
+
+
+async def status_event_stream(
+    bus: StatusEventBus,
+    application_id: UUID,
+    queue: asyncio.Queue[str],
+    initial_status: str,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    keepalive_seconds: float,
+    max_seconds: float,
+) -> AsyncIterator[str]:
+    """
+    Yields Server-Sent Events for an application's status.
+
+    The current status is sent immediately, then every change received through
+    `queue`. Comment lines are sent as keepalives while idle. The stream ends when
+    a final status is reached, the client disconnects or `max_seconds` elapse
+    (browsers' EventSource reconnects automatically). The subscription is always
+    released when the stream ends.
+    """
+    try:
+        yield f'retry: {int(keepalive_seconds * 1000)}\n'
+        yield _format_status_event(initial_status)
+        last_status = initial_status
+        deadline = time.monotonic() + max_seconds
+
+        while last_status not in FINAL_STATUSES:
+            timeout = min(keepalive_seconds, deadline - time.monotonic())
+            if timeout <= 0 or await is_disconnected():
+                break
+            try:
+                status = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if status != last_status:
+                last_status = status
+                yield _format_status_event(status)
+    finally:
+        bus.unsubscribe(application_id, queue)
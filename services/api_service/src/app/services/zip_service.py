@@ -1,3 +1,4 @@
+import hashlib
 import io
 import logging
 import zipfile
@@ -6,10 +7,15 @@ import httpx
 
 from app.core.config import Settings
 from app.models.db_models import Application
+from app.repositories.applications import ApplicationRepository
+from app.services.file_storage import delete_file, upload_file
 
 
 logger = logging.getLogger(__name__)
 
+# Suffix of the placeholder entry written for a document that could not be downloaded.
+ERROR_ENTRY_SUFFIX = '.error.txt'
+
 
 async def create_documents_zip_archive(app: Application, settings: Settings) -> io.BytesIO:
     """
@@ -53,7 +59,61 @@ async def create_documents_zip_archive(app: Application, settings: Settings) ->
                         exc_info=True,
                     )
                     error_message = f'Failed to download this file. Error: {e.response.status_code}'
-                    zip_file.writestr(f'{file_record.original_filename}.error.txt', error_message)
+                    zip_file.writestr(
+                        f'{file_record.original_filename}{ERROR_ENTRY_SUFFIX}', error_message
+                    )
 
     zip_buffer.seek(0)
     return zip_buffer
+
+
+def documents_hash(app: Application) -> str:
+    """Fingerprint of the application's file list, which changes whenever a file is linked."""
+    digest = hashlib.sha256()
+    for file_id, filename in sorted((f.file_id, f.original_filename) for f in app.files):
+        digest.update(f'{file_id}\0{filename}\n'.encode())
+    return digest.hexdigest()
+
+
+async def build_and_store_documents_archive(
+    app: Application, repo: ApplicationRepository, settings: Settings
+) -> tuple[io.BytesIO, str | None]:
+    """
+    Builds the documents archive of an application and stores it in
+    file-storage-service, so later downloads are served from storage
+    (see ApplicationArchive) instead of being built again.
+
+    Returns the archive and its stored file_id. An archive in which some
+    documents could not be downloaded is not stored, and neither is one whose
+    upload failed; their file_id is None. A stored archive superseded by this
+    one, or this upload if the same archive was stored meanwhile, is deleted.
+    """
+    files_hash = documents_hash(app)
+    zip_buffer = await create_documents_zip_archive(app=app, settings=settings)
+
+    with zipfile.ZipFile(zip_buffer) as zip_file:
+        complete = not any(name.endswith(ERROR_ENTRY_SUFFIX) for name in zip_file.namelist())
+    file_id = None
+    if complete:
+        zip_buffer.seek(0)
+        try:
+            file_id = await upload_file(
+                zip_buffer, f'application_docs_{app.id}.zip', 'application/zip', settings
+            )
+        except httpx.HTTPError:
+            logger.warning(f'Failed to store the documents archive of {app.id}.', exc_info=True)
+        else:
+            file_id, unused_file_id = await repo.save_archive(app.id, files_hash, file_id)
+            if unused_file_id is not None:
+                await discard_stored_archive(unused_file_id, settings)
+
+    zip_buffer.seek(0)
+    return zip_buffer, file_id
+
+
+async def discard_stored_archive(file_id: str, settings: Settings) -> None:
+    """Deletes an archive that is no longer referenced. A failure only leaves garbage."""
+    try:
+        await delete_file(file_id, settings)
+    except httpx.HTTPError:
+        logger.warning(f'Failed to delete the unused documents archive {file_id}.', exc_info=True)
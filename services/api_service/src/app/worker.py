@@ -0,0 +1,36 @@
+"""
+Background job worker of api-service.
+
+Runs the exports and document archives submitted through the admin API,
+off the request path. Start from the directory containing the app package:
+    python -m app.worker
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.services.jobs import JobWorker
+
+
+logging.basicConfig(
+    level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    logger.info(f'Job worker is starting with {settings.JOB_WORKER_CONCURRENCY} slots...')
+    await JobWorker(AsyncSessionLocal, settings).run(stop)
+    logger.info('Job worker has stopped.')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -8,7 +8,8 @@ This module provides shared fixtures for testing, including:
 """
 
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
 from datetime import datetime
 from typing import cast
 
@@ -18,7 +19,9 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.api.schemas import active_schema_cache
 from app.core.db import Base, get_async_session
+from app.core.query_stats import QueryStats, count_queries, track_queries
 from app.main import app
 from app.models import db_models  # noqa: F401
 from app.models.db_models import Application, ApplicationFile, FormSchema
@@ -31,6 +34,7 @@ test_engine = create_async_engine(
     connect_args={'check_same_thread': False},
     poolclass=StaticPool,
 )
+count_queries(test_engine.sync_engine)
 
 TestSessionLocal = sessionmaker(
     bind=test_engine,
@@ -69,6 +73,27 @@ async def test_client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, N
         yield client
 
     app.dependency_overrides.clear()
+    active_schema_cache.clear()
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[int], AbstractContextManager[QueryStats]]:
+    """
+    Returns a context manager failing the test if the block executes more
+    than `limit` SQL statements, to catch N+1 queries and missing eager loads.
+
+    Usage:
+        with assert_max_queries(2):
+            await test_client.get(...)
+    """
+
+    @contextmanager
+    def check(limit: int) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f'Expected at most {limit} SQL statements, got {stats.count}'
+
+    return check
 
 
 @pytest.fixture
@@ -116,12 +141,12 @@ async def draft_application(db_session: AsyncSession) -> AsyncGenerator[Applicat
         telegram_id=123456789,
         status='draft',
         data={'test_field': 'test_value'},
+        admin_comment=None,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     db_session.add(app_data)
     await db_session.commit()
-    await db_session.refresh(app_data)
     return cast(Application, app_data)
 
 
@@ -133,12 +158,12 @@ async def submitted_application(db_session: AsyncSession) -> AsyncGenerator[Appl
         telegram_id=987654321,
         status='new',
         data={'name': 'John Doe', 'email': 'john@example.com'},
+        admin_comment=None,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     db_session.add(app_data)
     await db_session.commit()
-    await db_session.refresh(app_data)
     return cast(Application, app_data)
 
 
@@ -162,5 +187,5 @@ async def application_with_files(
 
     db_session.add_all([file1, file2])
     await db_session.commit()
-    await db_session.refresh(draft_application)
+    await db_session.refresh(draft_application, attribute_names=['files'])
     return cast(Application, draft_application)
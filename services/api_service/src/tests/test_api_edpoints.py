@@ -4,12 +4,34 @@ Integration tests for API endpoints.
 Tests all public and admin endpoints using a test client and mocked dependencies.
 """
 
+import io
+import logging
+import marshal
 import uuid
-from unittest.mock import AsyncMock, MagicMock, patch
-
-from httpx import AsyncClient
-
-from app.models.db_models import Application
+import zipfile
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from unittest.mock import ANY, AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.schemas import active_schema_cache
+from app.core.compression import select_encoding
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, SharedProfileStore, profile_store
+from app.core.query_stats import QueryBudgetMiddleware
+from app.main import app
+from app.models.db_models import Application, ApplicationFile, Job
+from app.repositories.applications import ApplicationRepository
+from app.repositories.jobs import JobRepository
+from app.schemas.applications import ApplicationAdmin
+from app.schemas.jobs import JobKind
+from app.services.autosave import AutosaveBuffer
+from app.services.jobs import JobWorker, export_applications
 
 
 class TestSessionEndpoints:
@@ -66,6 +88,39 @@ class TestSessionEndpoints:
 
         assert response.status_code == 404
 
+    async def test_get_telegram_statuses_batch(
+        self,
+        test_client: AsyncClient,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test looking up statuses for several Telegram users in one request."""
+        payload = {
+            'telegram_ids': [
+                draft_application.telegram_id,
+                submitted_application.telegram_id,
+                111,
+                draft_application.telegram_id,
+            ]
+        }
+        response = await test_client.post('/api/v1/sessions/telegram/status/batch', json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['statuses'] == {
+            str(draft_application.telegram_id): 'draft',
+            str(submitted_application.telegram_id): 'new',
+        }
+        assert data['not_found'] == [111]
+
+    async def test_get_telegram_statuses_batch_empty(self, test_client: AsyncClient):
+        """Test that an empty list of telegram IDs is rejected."""
+        response = await test_client.post(
+            '/api/v1/sessions/telegram/status/batch', json={'telegram_ids': []}
+        )
+
+        assert response.status_code == 422
+
 
 class TestApplicationPublicEndpoints:
     """Test suite for public application endpoints (used by Mini App)."""
@@ -89,6 +144,31 @@ class TestApplicationPublicEndpoints:
 
         assert response.status_code == 404
 
+    async def test_stream_application_status_final(
+        self, test_client: AsyncClient, submitted_application: Application
+    ):
+        """Test that the status stream sends the current status and ends on a final one."""
+        await test_client.patch(
+            f'/api/v1/admin/applications/{submitted_application.id}',
+            json={'status': 'completed'},
+        )
+
+        response = await test_client.get(
+            f'/api/v1/applications/{submitted_application.id}/public/status/stream'
+        )
+
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/event-stream')
+        assert 'event: status\ndata: {"status": "completed"}' in response.text
+
+    async def test_stream_application_status_not_found(self, test_client: AsyncClient):
+        """Test that streaming the status of a non-existent application returns 404."""
+        response = await test_client.get(
+            f'/api/v1/applications/{uuid.uuid4()}/public/status/stream'
+        )
+
+        assert response.status_code == 404
+
     async def test_get_application_data(
         self, test_client: AsyncClient, draft_application: Application
     ):
@@ -128,6 +208,82 @@ class TestApplicationPublicEndpoints:
 
         assert response.status_code == 400
 
+    async def test_save_application_progress_buffered(
+        self, test_client: AsyncClient, db_session: AsyncSession, draft_application: Application
+    ):
+        """Test that buffered autosaves are written before the application is submitted."""
+        buffer = AutosaveBuffer(
+            session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+            window_seconds=60,
+        )
+        url = f'/api/v1/applications/{draft_application.id}'
+
+        with patch('app.api.applications.autosave_buffer', buffer):
+            for step in range(3):
+                response = await test_client.patch(f'{url}/public', json={'data': {'step': step}})
+                assert response.status_code == 200
+            assert buffer.has_pending(draft_application.id)
+
+            response = await test_client.post(f'{url}/submit')
+
+        assert response.status_code == 200
+        assert buffer.metrics() == {'saves': 3, 'coalesced': 2, 'flushes': 1, 'pending': 0}
+        await db_session.refresh(draft_application, attribute_names=['data'])
+        assert draft_application.data == {'step': 2}
+
+    async def test_save_application_progress_if_match(
+        self, test_client: AsyncClient, draft_application: Application
+    ):
+        """Test that a save with the current ETag succeeds and a stale one gets 412."""
+        url = f'/api/v1/applications/{draft_application.id}/public'
+        etag = (await test_client.get(url)).headers['ETag']
+
+        response = await test_client.patch(
+            url, json={'data': {'tab': 1}}, headers={'If-Match': etag}
+        )
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+        response = await test_client.patch(
+            url, json={'data': {'tab': 2}}, headers={'If-Match': etag}
+        )
+        assert response.status_code == 412
+
+        response = await test_client.get(url)
+        assert response.json()['data'] == {'tab': 1}
+
+    async def test_save_application_progress_not_found(self, test_client: AsyncClient):
+        """Test saving progress for a non-existent application."""
+        response = await test_client.patch(
+            f'/api/v1/applications/{uuid.uuid4()}/public', json={'data': {}}
+        )
+
+        assert response.status_code == 404
+
+    @patch('app.services.zip_service.delete_file', new_callable=AsyncMock)
+    async def test_link_file_deletes_stale_archive(
+        self,
+        mock_delete: AsyncMock,
+        test_client: AsyncClient,
+        db_session: AsyncSession,
+        draft_application: Application,
+    ):
+        """Test that linking a file deletes the stored archive of the old file list."""
+        repo = ApplicationRepository(db_session)
+        await repo.save_archive(draft_application.id, 'hash-1', 'archive.zip')
+        file_link_payload = {
+            'file_id': 'test-file-123.pdf',
+            'original_filename': 'passport.pdf',
+            'form_field_id': 'passport_scan',
+        }
+
+        response = await test_client.post(
+            f'/api/v1/applications/{draft_application.id}/files', json=file_link_payload
+        )
+
+        assert response.status_code == 201
+        assert mock_delete.await_args.args[0] == 'archive.zip'
+
     async def test_link_file_to_application(
         self, test_client: AsyncClient, draft_application: Application
     ):
@@ -148,14 +304,28 @@ class TestApplicationPublicEndpoints:
         assert data['message'] == 'File linked successfully'
 
     async def test_submit_application(
-        self, test_client: AsyncClient, draft_application: Application
+        self, test_client: AsyncClient, db_session: AsyncSession, draft_application: Application
     ):
-        """Test submitting a draft application."""
+        """Test submitting a draft application queues its duplicate matching."""
         response = await test_client.post(f'/api/v1/applications/{draft_application.id}/submit')
 
         assert response.status_code == 200
         data = response.json()
         assert data['message'] == 'Application submitted successfully'
+        job = (await db_session.execute(select(Job))).scalar_one()
+        assert job.kind == 'match_keys'
+        assert job.params == {'application_uuid': str(draft_application.id)}
+
+    async def test_submit_application_when_queueing_fails(
+        self, test_client: AsyncClient, draft_application: Application
+    ):
+        """Test that a failure to queue the duplicate matching does not fail the submission."""
+        with patch.object(
+            JobRepository, 'enqueue', side_effect=OperationalError('INSERT', {}, Exception())
+        ):
+            response = await test_client.post(f'/api/v1/applications/{draft_application.id}/submit')
+
+        assert response.status_code == 200
 
     async def test_submit_application_already_submitted(
         self, test_client: AsyncClient, submitted_application: Application
@@ -183,6 +353,16 @@ class TestApplicationAdminEndpoints:
         assert len(data) >= 2
         assert any(app['id'] == str(draft_application.id) for app in data)
 
+    async def test_get_all_applications_matches_response_model(
+        self, test_client: AsyncClient, application_with_files: Application
+    ):
+        """Test that the fast JSON path renders exactly what response_model would."""
+        response = await test_client.get('/api/v1/admin/applications/')
+
+        assert response.headers['content-type'] == 'application/json'
+        expected = ApplicationAdmin.model_validate(application_with_files).model_dump(mode='json')
+        assert response.json() == [expected]
+
     async def test_get_all_applications_with_filter(
         self, test_client: AsyncClient, draft_application: Application
     ):
@@ -193,6 +373,39 @@ class TestApplicationAdminEndpoints:
         data = response.json()
         assert all(app['status'] == 'draft' for app in data)
 
+    async def test_search_applications(
+        self, test_client: AsyncClient, submitted_application: Application
+    ):
+        """Test the admin search endpoint."""
+        response = await test_client.get(
+            '/api/v1/admin/applications/search', params={'q': 'john@example'}
+        )
+
+        assert response.status_code == 200
+        assert [app['id'] for app in response.json()] == [str(submitted_application.id)]
+
+    async def test_search_applications_query_too_short(self, test_client: AsyncClient):
+        """Test that single-character queries are rejected."""
+        response = await test_client.get('/api/v1/admin/applications/search', params={'q': 'j'})
+
+        assert response.status_code == 422
+
+    async def test_get_application_stats(
+        self,
+        test_client: AsyncClient,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test the dashboard counters endpoint (not shadowed by /{uuid})."""
+        response = await test_client.get('/api/v1/admin/applications/stats', params={'days': 7})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['total'] == 2
+        assert data['by_status'] == {'draft': 1, 'new': 1}
+        assert len(data['by_day']) == 1
+        assert data['by_day'][0]['total'] == 2
+
     async def test_get_application_details_admin(
         self, test_client: AsyncClient, application_with_files: Application
     ):
@@ -205,20 +418,181 @@ class TestApplicationAdminEndpoints:
         assert 'files' in data
         assert len(data['files']) == 2
 
+    async def test_get_application_details_with_duplicates(
+        self, test_client: AsyncClient, db_session: AsyncSession
+    ):
+        """Test that a submitted application lists others with the same phone."""
+        first = Application(status='draft', data={'phone': '8 916 123 45 67'})
+        second = Application(status='draft', data={'phone': '+7 (916) 123-45-67'})
+        db_session.add_all([first, second])
+        await db_session.commit()
+        for application in (first, second):
+            response = await test_client.post(f'/api/v1/applications/{application.id}/submit')
+            assert response.status_code == 200
+        worker = JobWorker(async_sessionmaker(db_session.bind, expire_on_commit=False), settings)
+        while await worker.run_next():
+            pass
+
+        response = await test_client.get(f'/api/v1/admin/applications/{second.id}')
+
+        assert response.json()['possible_duplicates'] == [
+            {'application_id': str(first.id), 'status': 'new', 'matched_on': ['phone']}
+        ]
+
     async def test_update_application_status(
-        self, test_client: AsyncClient, draft_application: Application
+        self, test_client: AsyncClient, submitted_application: Application
     ):
         """Test updating application status as admin."""
         update_payload = {'status': 'in_progress'}
 
         response = await test_client.patch(
-            f'/api/v1/admin/applications/{draft_application.id}', json=update_payload
+            f'/api/v1/admin/applications/{submitted_application.id}', json=update_payload
         )
 
         assert response.status_code == 200
         data = response.json()
         assert data['status'] == 'in_progress'
 
+    @pytest.mark.parametrize('new_status', ['new', 'in_progress', 'completed', 'rejected'])
+    async def test_update_draft_status_is_rejected(
+        self, test_client: AsyncClient, draft_application: Application, new_status: str
+    ):
+        """Test that admins cannot move a draft: it only leaves DRAFT when submitted."""
+        response = await test_client.patch(
+            f'/api/v1/admin/applications/{draft_application.id}', json={'status': new_status}
+        )
+
+        assert response.status_code == 400
+        assert f"from 'draft' to '{new_status}'" in response.json()['detail']
+        status_response = await test_client.get(
+            f'/api/v1/applications/{draft_application.id}/public/status'
+        )
+        assert status_response.json()['status'] == 'draft'
+
+    async def test_update_application_status_disallowed(
+        self, test_client: AsyncClient, submitted_application: Application
+    ):
+        """Test that moving a submitted application back to draft is rejected."""
+        response = await test_client.patch(
+            f'/api/v1/admin/applications/{submitted_application.id}', json={'status': 'draft'}
+        )
+
+        assert response.status_code == 400
+        assert "from 'new' to 'draft'" in response.json()['detail']
+
+    async def test_update_application_stale_if_match(
+        self, test_client: AsyncClient, draft_application: Application
+    ):
+        """Test that an admin update based on an outdated version gets 412."""
+        url = f'/api/v1/admin/applications/{draft_application.id}'
+        etag = (await test_client.get(url)).headers['ETag']
+        await test_client.patch(
+            f'/api/v1/applications/{draft_application.id}/public', json={'data': {'x': 1}}
+        )
+
+        response = await test_client.patch(
+            url, json={'status': 'in_progress'}, headers={'If-Match': etag}
+        )
+
+        assert response.status_code == 412
+
+    async def test_bulk_update_by_ids(
+        self,
+        test_client: AsyncClient,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that a bulk update reports a result for every requested application."""
+        completed = Application(status='completed', data={})
+        db_session.add(completed)
+        await db_session.commit()
+        missing_id = uuid.uuid4()
+        ids = [submitted_application.id, completed.id, missing_id]
+
+        response = await test_client.post(
+            '/api/v1/admin/applications/bulk-update',
+            json={'application_ids': [str(app_id) for app_id in ids], 'status': 'rejected'},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['updated'] == 1
+        results = {item['application_id']: item for item in data['results']}
+        assert results[str(submitted_application.id)]['result'] == 'updated'
+        assert results[str(completed.id)] == {
+            'application_id': str(completed.id),
+            'result': 'transition_not_allowed',
+            'status': 'completed',
+        }
+        assert results[str(missing_id)]['result'] == 'not_found'
+
+    async def test_bulk_update_by_current_status(
+        self,
+        test_client: AsyncClient,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test selecting applications by their current status."""
+        response = await test_client.post(
+            '/api/v1/admin/applications/bulk-update',
+            json={'current_status': 'new', 'status': 'in_progress', 'admin_comment': 'Triage'},
+        )
+
+        assert response.json()['updated'] == 1
+        detail = await test_client.get(f'/api/v1/admin/applications/{submitted_application.id}')
+        assert detail.json()['status'] == 'in_progress'
+        assert detail.json()['admin_comment'] == 'Triage'
+
+    async def test_bulk_update_by_current_status_is_batched(
+        self, test_client: AsyncClient, db_session: AsyncSession
+    ):
+        """Test that a status selection is updated in batches until nothing is left."""
+        db_session.add_all([Application(status='new', data={}) for _ in range(3)])
+        await db_session.commit()
+        payload = {'current_status': 'new', 'admin_comment': 'Triage'}
+
+        with patch('app.repositories.applications.MAX_BULK_APPLICATIONS', 2):
+            batches = [
+                (await test_client.post('/api/v1/admin/applications/bulk-update', json=payload))
+                for _ in range(3)
+            ]
+
+        assert [(r.json()['updated'], r.json()['has_more']) for r in batches] == [
+            (2, True),
+            (1, False),
+            (0, False),
+        ]
+
+    async def test_bulk_update_rejects_draft_selection(self, test_client: AsyncClient):
+        """Test that drafts, which are still being edited, cannot be selected by status."""
+        response = await test_client.post(
+            '/api/v1/admin/applications/bulk-update',
+            json={'current_status': 'draft', 'admin_comment': 'Stale'},
+        )
+
+        assert response.status_code == 422
+
+    async def test_bulk_update_requires_one_selection(self, test_client: AsyncClient):
+        """Test that ids and a status filter cannot be combined."""
+        response = await test_client.post(
+            '/api/v1/admin/applications/bulk-update',
+            json={
+                'application_ids': [str(uuid.uuid4())],
+                'current_status': 'new',
+                'status': 'rejected',
+            },
+        )
+
+        assert response.status_code == 422
+
+    async def test_update_application_not_found(self, test_client: AsyncClient):
+        """Test updating a non-existent application as admin."""
+        response = await test_client.patch(
+            f'/api/v1/admin/applications/{uuid.uuid4()}', json={'status': 'rejected'}
+        )
+
+        assert response.status_code == 404
+
     async def test_add_admin_comment(
         self, test_client: AsyncClient, draft_application: Application
     ):
@@ -233,32 +607,30 @@ class TestApplicationAdminEndpoints:
         data = response.json()
         assert data['admin_comment'] == 'Waiting for additional documents'
 
-    @patch('app.services.export_service.generate_xlsx_export')
-    async def test_export_applications(self, mock_export: MagicMock, test_client: AsyncClient):
-        """Test exporting applications to XLSX."""
-        mock_export.return_value = MagicMock()
-        mock_export.return_value.seek = MagicMock()
-        mock_export.return_value.read = MagicMock(return_value=b'fake xlsx data')
-
+    async def test_deprecated_export_redirects_to_job(
+        self, test_client: AsyncClient, db_session: AsyncSession
+    ):
+        """Test that the GET export queues an export job and redirects to its status."""
         response = await test_client.get('/api/v1/admin/applications/export')
 
-        assert response.status_code == 200
-        assert (
-            response.headers['content-type']
-            == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        assert response.status_code == 303
+        job = (await db_session.execute(select(Job))).scalar_one()
+        assert job.kind == 'applications_export'
+        assert response.headers['location'] == f'/api/v1/admin/jobs/{job.id}'
 
-    @patch('app.services.zip_service.create_documents_zip_archive')
+    @patch('app.services.zip_service.upload_file', new_callable=AsyncMock)
+    @patch('app.services.zip_service.create_documents_zip_archive', new_callable=AsyncMock)
     async def test_download_documents_as_zip(
         self,
         mock_zip: AsyncMock,
+        mock_upload: AsyncMock,
         test_client: AsyncClient,
         application_with_files: Application,
     ):
         """Test downloading application documents as ZIP."""
-        mock_zip.return_value = MagicMock()
-        mock_zip.return_value.seek = MagicMock()
-        mock_zip.return_value.read = MagicMock(return_value=b'fake zip data')
+        mock_zip.return_value = io.BytesIO()
+        zipfile.ZipFile(mock_zip.return_value, 'w').close()
+        mock_upload.return_value = 'archive.zip'
 
         response = await test_client.get(
             f'/api/v1/admin/applications/{application_with_files.id}/download-documents'
@@ -266,6 +638,50 @@ class TestApplicationAdminEndpoints:
 
         assert response.status_code == 200
         assert response.headers['content-type'] == 'application/zip'
+        assert response.content == mock_zip.return_value.getvalue()
+        mock_upload.assert_awaited_once()
+
+    @patch('app.api.applications.get_download_url', new_callable=AsyncMock)
+    @patch('app.services.zip_service.upload_file', new_callable=AsyncMock)
+    @patch('app.services.zip_service.create_documents_zip_archive', new_callable=AsyncMock)
+    async def test_download_documents_redirects_to_stored_archive(
+        self,
+        mock_zip: AsyncMock,
+        mock_upload: AsyncMock,
+        mock_link: AsyncMock,
+        test_client: AsyncClient,
+        application_with_files: Application,
+    ):
+        """Test that the archive is built once and rebuilt after a file is linked."""
+
+        def build_zip(**kwargs) -> io.BytesIO:
+            buffer = io.BytesIO()
+            zipfile.ZipFile(buffer, 'w').close()
+            return buffer
+
+        mock_zip.side_effect = build_zip
+        mock_upload.side_effect = ['first.zip', 'second.zip']
+        mock_link.return_value = 'http://localhost:9000/bucket/first.zip?signature=1'
+        url = f'/api/v1/admin/applications/{application_with_files.id}/download-documents'
+
+        first = await test_client.get(url)
+        second = await test_client.get(url)
+        await test_client.post(
+            f'/api/v1/applications/{application_with_files.id}/files',
+            json={
+                'file_id': 'file3.pdf',
+                'original_filename': 'certificate.pdf',
+                'form_field_id': 'passport_scan',
+            },
+        )
+        third = await test_client.get(url)
+
+        assert first.status_code == 200
+        assert second.status_code == 307
+        assert second.headers['location'] == mock_link.return_value
+        mock_link.assert_awaited_once_with('first.zip', ANY)
+        assert third.status_code == 200
+        assert mock_zip.await_count == 2
 
     async def test_download_documents_no_files(
         self, test_client: AsyncClient, draft_application: Application
@@ -278,6 +694,95 @@ class TestApplicationAdminEndpoints:
         assert response.status_code == 404
 
 
+class TestJobEndpoints:
+    """Test suite for background export and archive jobs."""
+
+    async def test_submit_export_job(self, test_client: AsyncClient):
+        """Test that an export is queued and pointed to by the Location header."""
+        response = await test_client.post('/api/v1/admin/applications/export')
+
+        assert response.status_code == 202
+        job = response.json()
+        assert job['kind'] == 'applications_export'
+        assert job['status'] == 'queued'
+        assert job['download_url'] is None
+        assert response.headers['location'] == f'/api/v1/admin/jobs/{job["id"]}'
+
+        status_response = await test_client.get(response.headers['location'])
+        assert status_response.status_code == 200
+        assert status_response.json()['status'] == 'queued'
+
+    async def test_submit_documents_zip_job(
+        self,
+        test_client: AsyncClient,
+        db_session: AsyncSession,
+        application_with_files: Application,
+        submitted_application: Application,
+    ):
+        """Test that an archive job is queued only for an application with documents."""
+        url = '/api/v1/admin/applications/{}/download-documents'
+
+        response = await test_client.post(url.format(application_with_files.id))
+        no_files = await test_client.post(url.format(submitted_application.id))
+        missing = await test_client.post(url.format(uuid.uuid4()))
+
+        assert response.status_code == 202
+        job = await db_session.get(Job, uuid.UUID(response.json()['id']))
+        assert job.kind == 'documents_zip'
+        assert job.params == {'application_uuid': str(application_with_files.id)}
+        assert no_files.status_code == 404
+        assert missing.status_code == 404
+
+    @patch('app.api.jobs.get_download_url', new_callable=AsyncMock)
+    async def test_completed_job_has_download_url(
+        self, mock_link: AsyncMock, test_client: AsyncClient, db_session: AsyncSession
+    ):
+        """Test that a completed job links to its result in file storage."""
+        mock_link.return_value = 'http://localhost:9000/bucket/result.xlsx?signature=1'
+        repo = JobRepository(db_session)
+        job = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        await repo.claim_next()
+        await repo.complete(job.id, 1, 'result.xlsx', 'applications_export.xlsx')
+
+        response = await test_client.get(f'/api/v1/admin/jobs/{job.id}')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['status'] == 'completed'
+        assert data['result_filename'] == 'applications_export.xlsx'
+        assert data['download_url'] == mock_link.return_value
+        mock_link.assert_awaited_once()
+        assert mock_link.await_args.args[0] == 'result.xlsx'
+
+    async def test_submit_match_keys_job(
+        self,
+        test_client: AsyncClient,
+        db_session: AsyncSession,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test that a submitted application can be re-indexed, but a draft cannot."""
+        url = '/api/v1/admin/applications/{}/match-keys'
+
+        response = await test_client.post(url.format(submitted_application.id))
+        draft = await test_client.post(url.format(draft_application.id))
+        missing = await test_client.post(url.format(uuid.uuid4()))
+
+        assert response.status_code == 202
+        assert response.headers['location'] == f'/api/v1/admin/jobs/{response.json()["id"]}'
+        job = await db_session.get(Job, uuid.UUID(response.json()['id']))
+        assert job.kind == 'match_keys'
+        assert job.params == {'application_uuid': str(submitted_application.id)}
+        assert draft.status_code == 400
+        assert missing.status_code == 404
+
+    async def test_get_unknown_job(self, test_client: AsyncClient):
+        """Test that an unknown job id returns 404."""
+        response = await test_client.get(f'/api/v1/admin/jobs/{uuid.uuid4()}')
+
+        assert response.status_code == 404
+
+
 class TestFormSchemaEndpoints:
     """Test suite for form schema endpoints."""
 
@@ -290,6 +795,34 @@ class TestFormSchemaEndpoints:
         assert data['version'] == '1.0'
         assert 'steps' in data
 
+    async def test_get_active_schema_precompressed(
+        self, test_client: AsyncClient, active_form_schema
+    ):
+        """Test that the schema is served from the cached compressed variant."""
+        response = await test_client.get(
+            '/api/v1/forms/schema/active', headers={'Accept-Encoding': 'gzip'}
+        )
+
+        assert response.status_code == 200
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['vary'] == 'Accept-Encoding'
+        assert response.json()['version'] == '1.0'
+        assert active_form_schema.id in active_schema_cache
+
+    async def test_get_active_schema_reloaded_after_upload(
+        self, test_client: AsyncClient, active_form_schema, sample_form_schema: dict
+    ):
+        """Test that a newly activated schema replaces the cached one."""
+        await test_client.get('/api/v1/forms/schema/active')
+        new_schema = {**sample_form_schema, 'version': '2.0'}
+        await test_client.post(
+            '/api/v1/admin/forms/schema', json={'version': '2.0', 'schema_data': new_schema}
+        )
+
+        response = await test_client.get('/api/v1/forms/schema/active')
+
+        assert response.json()['version'] == '2.0'
+
     async def test_get_active_schema_none_exists(self, test_client: AsyncClient):
         """Test error when no active schema exists."""
         response = await test_client.get('/api/v1/forms/schema/active')
@@ -307,6 +840,53 @@ class TestFormSchemaEndpoints:
         assert 'version 2.0 has been uploaded' in data['message']
 
 
+class TestCompression:
+    """Test suite for response compression."""
+
+    async def test_large_response_is_compressed(
+        self, test_client: AsyncClient, db_session: AsyncSession
+    ):
+        """Test that a large JSON response is gzipped for clients that accept it."""
+        db_session.add(Application(status='new', data={'essay': 'text ' * 1000}))
+        await db_session.commit()
+
+        response = await test_client.get(
+            '/api/v1/admin/applications/', headers={'Accept-Encoding': 'gzip'}
+        )
+
+        assert response.headers['content-encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['vary']
+        assert response.json()[0]['data']['essay'].startswith('text')
+
+    async def test_response_not_compressed_without_accept_encoding(
+        self, test_client: AsyncClient, db_session: AsyncSession
+    ):
+        """Test that clients that do not accept compression get the plain body."""
+        db_session.add(Application(status='new', data={'essay': 'text ' * 1000}))
+        await db_session.commit()
+
+        response = await test_client.get(
+            '/api/v1/admin/applications/', headers={'Accept-Encoding': 'identity'}
+        )
+
+        assert 'content-encoding' not in response.headers
+
+    async def test_small_response_is_not_compressed(self, test_client: AsyncClient):
+        """Test that responses below the size threshold are sent as is."""
+        response = await test_client.get('/api/v1/health', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'content-encoding' not in response.headers
+
+    def test_select_encoding(self):
+        """Test content coding negotiation, including q=0 exclusions."""
+        assert select_encoding('gzip, deflate, br') == 'br'
+        assert select_encoding('gzip, deflate') == 'gzip'
+        assert select_encoding('br;q=0, gzip') == 'gzip'
+        assert select_encoding('gzip;q=0, deflate') is None
+        assert select_encoding('*') == 'br'
+        assert select_encoding('') is None
+
+
 class TestHealthCheck:
     """Test suite for health check endpoint."""
 
@@ -318,3 +898,215 @@ class TestHealthCheck:
         data = response.json()
         assert data['status'] == 'ok'
         assert data['service'] == 'API Service'
+
+
+class TestMetrics:
+    """Test suite for the Prometheus metrics endpoint."""
+
+    async def test_metrics_expose_request_latency_by_route(self, test_client: AsyncClient):
+        """Test that requests are recorded under their route template, not the raw path."""
+        await test_client.get('/api/v1/health')
+        await test_client.get(f'/api/v1/applications/{uuid.uuid4()}/public')
+
+        response = await test_client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/plain')
+        body = response.text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/api/v1/health",status="200"}'
+            in body
+        )
+        assert 'route="/api/v1/applications/{application_uuid}/public",status="404"' in body
+        assert 'http_requests_in_progress' in body
+
+    async def test_metrics_expose_pool_and_autosave_state(self, test_client: AsyncClient):
+        """Test that the database pool and autosave buffer are reported at scrape time."""
+        response = await test_client.get('/metrics')
+
+        body = response.text
+        assert 'db_pool_connections{state="checked_out"}' in body
+        assert 'db_pool_size' in body
+        assert 'autosave_pending 0.0' in body
+
+    async def test_metrics_aggregate_workers_in_multiprocess_mode(
+        self, test_client: AsyncClient, tmp_path, monkeypatch
+    ):
+        """Test that /metrics reads the shared directory when several workers run."""
+        monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+
+        response = await test_client.get('/metrics')
+
+        assert response.status_code == 200
+        # Per-process collectors are left out, since they describe only one worker.
+        assert 'db_pool_size' not in response.text
+
+
+class TestProfiling:
+    """Test suite for the opt-in request profiler."""
+
+    @pytest.fixture
+    async def profiled_client(self, test_client: AsyncClient) -> AsyncGenerator[AsyncClient, None]:
+        """Provides a client for the app wrapped in the profiling middleware."""
+        transport = ASGITransport(app=ProfilingMiddleware(app, store=profile_store))
+        async with AsyncClient(transport=transport, base_url='http://test') as client:
+            yield client
+        profile_store.clear()
+
+    async def test_admin_request_with_header_is_profiled(
+        self,
+        profiled_client: AsyncClient,
+        test_client: AsyncClient,
+        submitted_application: Application,
+    ):
+        """Test that the header triggers a profile with SQL stats, downloadable by admins."""
+        response = await profiled_client.get(
+            '/api/v1/admin/applications/', headers={'X-Profile': '1'}
+        )
+
+        profile_id = response.headers['x-profile-id']
+        assert 'db;dur=' in response.headers['server-timing']
+
+        profiles = (await test_client.get('/api/v1/admin/profiles/')).json()
+        assert profiles[0]['id'] == profile_id
+        assert profiles[0]['path'] == '/api/v1/admin/applications/'
+        assert profiles[0]['sql_count'] >= 1
+
+        report = await test_client.get(f'/api/v1/admin/profiles/{profile_id}?format=text')
+        assert 'cumulative' in report.text
+        download = await test_client.get(f'/api/v1/admin/profiles/{profile_id}')
+        assert download.headers['content-type'] == 'application/octet-stream'
+        assert isinstance(marshal.loads(download.content), dict)
+
+    async def test_header_is_ignored_outside_admin_paths(self, profiled_client: AsyncClient):
+        """Test that public requests cannot trigger profiling with the header."""
+        response = await profiled_client.get('/api/v1/health', headers={'X-Profile': '1'})
+
+        assert 'x-profile-id' not in response.headers
+        assert profile_store.list() == []
+
+    async def test_unknown_profile_returns_404(self, test_client: AsyncClient):
+        """Test downloading a profile that does not exist."""
+        response = await test_client.get('/api/v1/admin/profiles/missing')
+
+        assert response.status_code == 404
+
+    async def test_shared_store_serves_profiles_of_other_workers(
+        self, test_client: AsyncClient, tmp_path: Path
+    ):
+        """Test that a profile taken by one worker is listed and served by another."""
+        profiling_worker = SharedProfileStore(max_items=2, directory=str(tmp_path))
+        serving_worker = SharedProfileStore(max_items=2, directory=str(tmp_path))
+        transport = ASGITransport(app=ProfilingMiddleware(app, store=profiling_worker))
+        profile_ids = []
+        async with AsyncClient(transport=transport, base_url='http://test') as client:
+            for _ in range(3):
+                response = await client.get(
+                    '/api/v1/admin/applications/', headers={'X-Profile': '1'}
+                )
+                profile_ids.append(response.headers['x-profile-id'])
+
+        with patch('app.api.profiles.profile_store', serving_worker):
+            profiles = (await test_client.get('/api/v1/admin/profiles/')).json()
+            report = await test_client.get(f'/api/v1/admin/profiles/{profile_ids[-1]}?format=text')
+            pruned = await test_client.get(f'/api/v1/admin/profiles/{profile_ids[0]}')
+            outside = await test_client.get('/api/v1/admin/profiles/..%2Fprofile')
+
+        assert {profile['id'] for profile in profiles} == set(profile_ids[1:])
+        assert profiles[0]['path'] == '/api/v1/admin/applications/'
+        assert 'cumulative' in report.text
+        assert pruned.status_code == 404
+        assert outside.status_code == 404
+
+
+class TestQueryBudgets:
+    """Test suite pinning the number of SQL statements of the main endpoints."""
+
+    @pytest.fixture
+    async def applications_with_files(self, db_session: AsyncSession) -> list[Application]:
+        """Creates several submitted applications with two files each."""
+        applications = [Application(status='new', data={'name': f'User {i}'}) for i in range(5)]
+        db_session.add_all(applications)
+        await db_session.flush()
+        db_session.add_all(
+            ApplicationFile(
+                application_id=application.id,
+                file_id=f'{application.id}-{i}.pdf',
+                original_filename=f'document{i}.pdf',
+                form_field_id='passport_scan',
+            )
+            for application in applications
+            for i in range(2)
+        )
+        await db_session.commit()
+        return applications
+
+    async def test_admin_list_does_not_query_per_application(
+        self,
+        test_client: AsyncClient,
+        applications_with_files: list[Application],
+        assert_max_queries,
+    ):
+        """Test that files of all listed applications are loaded in one extra statement."""
+        with assert_max_queries(2):
+            response = await test_client.get('/api/v1/admin/applications/')
+
+        assert len(response.json()) == 5
+
+    async def test_admin_export_does_not_query_per_application(
+        self,
+        db_session: AsyncSession,
+        applications_with_files: list[Application],
+        assert_max_queries,
+    ):
+        """Test the number of statements of the XLSX export job."""
+        with assert_max_queries(2):
+            result = await export_applications(db_session, {}, settings)
+
+        assert result.content.getvalue()[:2] == b'PK'
+
+    async def test_admin_detail_and_update(
+        self,
+        test_client: AsyncClient,
+        applications_with_files: list[Application],
+        assert_max_queries,
+    ):
+        """Test the statements of the admin card: application, files and duplicates."""
+        url = f'/api/v1/admin/applications/{applications_with_files[0].id}'
+
+        with assert_max_queries(3):
+            await test_client.get(url)
+        with assert_max_queries(3):
+            response = await test_client.patch(url, json={'admin_comment': 'Checked'})
+
+        assert response.status_code == 200
+
+    async def test_public_draft_flow(
+        self, test_client: AsyncClient, draft_application: Application, assert_max_queries
+    ):
+        """Test that reading and autosaving a draft take a single statement each."""
+        url = f'/api/v1/applications/{draft_application.id}'
+
+        with assert_max_queries(1):
+            await test_client.get(f'{url}/public')
+        with assert_max_queries(1):
+            await test_client.patch(f'{url}/public', json={'data': {'name': 'John'}})
+        with assert_max_queries(3):
+            response = await test_client.post(f'{url}/submit')
+
+        assert response.status_code == 200
+
+    async def test_budget_overrun_is_logged(
+        self, test_client: AsyncClient, applications_with_files: list[Application], caplog
+    ):
+        """Test that the middleware warns about requests over the query budget."""
+        transport = ASGITransport(app=QueryBudgetMiddleware(app, budget=1))
+        async with AsyncClient(transport=transport, base_url='http://test') as client:
+            with caplog.at_level(logging.WARNING, logger='app.core.query_stats'):
+                await client.get('/api/v1/admin/applications/')
+                await client.get(
+                    f'/api/v1/applications/{applications_with_files[0].id}/public/status'
+                )
+
+        assert len(caplog.records) == 1
+        assert 'GET /api/v1/admin/applications/ executed 2 SQL statements' in caplog.text
@@ -1,19 +1,22 @@
 """
 Unit tests for repository layer.
 
-Tests the ApplicationRepository and FormSchemaRepository classes
-using an in-memory SQLite database.
+Tests the ApplicationRepository, FormSchemaRepository and JobRepository
+classes using an in-memory SQLite database.
 """
 
 import uuid
+from datetime import UTC, datetime, timedelta
 from typing import cast
 
 import pytest
+from sqlalchemy import inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.db_models import Application, FormSchema
+from app.models.db_models import Application, FormSchema, Job
 from app.repositories.applications import ApplicationRepository
 from app.repositories.forms import FormSchemaRepository
+from app.repositories.jobs import JobRepository
 from app.schemas.applications import (
     ApplicationAdminUpdate,
     ApplicationStatus,
@@ -21,6 +24,7 @@ from app.schemas.applications import (
     FileLinkRequest,
 )
 from app.schemas.forms import FormSchemaUpload
+from app.schemas.jobs import JobKind, JobStatus
 
 
 class TestApplicationRepository:
@@ -82,15 +86,45 @@ class TestApplicationRepository:
         result = await repo.get_draft_by_telegram_id(submitted_application.telegram_id)
         assert result is None
 
-    async def test_get_latest_by_telegram_id(
-        self, repo: ApplicationRepository, draft_application: Application
+    async def test_get_latest_status_by_telegram_id(
+        self, repo: ApplicationRepository, submitted_application: Application
     ):
-        """Test retrieving the most recent application for a telegram user."""
-        result = await repo.get_latest_by_telegram_id(draft_application.telegram_id)
+        """Test retrieving only the status of the latest application."""
+        result = await repo.get_latest_status_by_telegram_id(submitted_application.telegram_id)
 
-        assert result is not None
-        assert isinstance(result, Application)
-        assert result.id == draft_application.id
+        assert result == ApplicationStatus.NEW.value
+
+    async def test_get_latest_status_by_telegram_id_nonexistent(self, repo: ApplicationRepository):
+        """Test that a user without applications has no status."""
+        result = await repo.get_latest_status_by_telegram_id(999999999)
+        assert result is None
+
+    async def test_get_latest_statuses_by_telegram_ids(
+        self,
+        repo: ApplicationRepository,
+        db_session: AsyncSession,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test that the batch lookup returns the latest status per telegram user."""
+        older = Application(
+            telegram_id=draft_application.telegram_id,
+            status=ApplicationStatus.COMPLETED.value,
+            data={},
+            created_at=draft_application.created_at - timedelta(days=1),
+            updated_at=datetime.utcnow(),
+        )
+        db_session.add(older)
+        await db_session.commit()
+
+        result = await repo.get_latest_statuses_by_telegram_ids(
+            [draft_application.telegram_id, submitted_application.telegram_id, 555]
+        )
+
+        assert result == {
+            draft_application.telegram_id: ApplicationStatus.DRAFT.value,
+            submitted_application.telegram_id: ApplicationStatus.NEW.value,
+        }
 
     async def test_get_all_no_filter(
         self,
@@ -152,22 +186,97 @@ class TestApplicationRepository:
         assert result.status == ApplicationStatus.DRAFT.value
         assert result.data == {}
 
+    async def test_search(
+        self,
+        repo: ApplicationRepository,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test finding applications by a value from the form data."""
+        results = await repo.search('JOHN')
+
+        assert [app.id for app in results] == [submitted_application.id]
+        assert await repo.search('john', status=ApplicationStatus.DRAFT) == []
+
+    async def test_create_records_active_form_version(
+        self, repo: ApplicationRepository, db_session: AsyncSession, active_form_schema: FormSchema
+    ):
+        """Test that a new application remembers the active form schema version."""
+        result = await repo.create_for_web_user()
+
+        form_version = await db_session.scalar(
+            select(Application.form_version).where(Application.id == result.id)
+        )
+        assert form_version == '1.0'
+
+    async def test_stats_follow_status_changes(
+        self,
+        repo: ApplicationRepository,
+        draft_application: Application,
+        submitted_application: Application,
+    ):
+        """Test that the trigger-maintained counters track inserts and status changes."""
+        await repo.update_admin_details(
+            submitted_application.id,
+            ApplicationAdminUpdate(status=ApplicationStatus.IN_PROGRESS),
+        )
+        await repo.submit_application(draft_application.id)
+
+        stats = await repo.get_stats(since=datetime.utcnow().date())
+
+        assert stats['total'] == 2
+        assert stats['by_status'] == {'new': 1, 'in_progress': 1}
+        assert stats['by_form_version'] == {'': 2}
+        assert stats['by_day'][0]['by_status'] == {'new': 1, 'in_progress': 1}
+
     async def test_update_progress(
         self, repo: ApplicationRepository, draft_application: Application
     ):
         """Test updating application data."""
         update_data = ApplicationUpdate(data={'new_field': 'new_value'})
-        result = await repo.update_progress(draft_application, update_data)
+        result = await repo.update_progress(draft_application.id, update_data)
 
+        assert result is not None
         assert result.data == {'new_field': 'new_value'}
+        assert result.status == ApplicationStatus.DRAFT.value
 
-    async def test_update_admin_details_status(
+    async def test_update_progress_non_draft(
+        self, repo: ApplicationRepository, submitted_application: Application
+    ):
+        """Test that the guarded update does not touch submitted applications."""
+        update_data = ApplicationUpdate(data={'new_field': 'new_value'})
+        result = await repo.update_progress(submitted_application.id, update_data)
+
+        assert result is None
+        full = await repo.get_by_uuid(submitted_application.id)
+        assert full is not None
+        assert full.data == {'name': 'John Doe', 'email': 'john@example.com'}
+
+    async def test_update_progress_increments_version(
         self, repo: ApplicationRepository, draft_application: Application
+    ):
+        """Test that every save bumps the version and a stale version is rejected."""
+        first = await repo.update_progress(
+            draft_application.id, ApplicationUpdate(data={'step': 1}), expected_versions={1}
+        )
+        stale = await repo.update_progress(
+            draft_application.id, ApplicationUpdate(data={'step': 2}), expected_versions={1}
+        )
+
+        assert first is not None
+        assert first.version == 2
+        assert stale is None
+        state = await repo.get_status_and_version(draft_application.id)
+        assert state.version == 2
+
+    async def test_update_admin_details_status(
+        self, repo: ApplicationRepository, submitted_application: Application
     ):
         """Test updating application status by admin."""
         update_data = ApplicationAdminUpdate(status=ApplicationStatus.IN_PROGRESS)
-        result = await repo.update_admin_details(draft_application, update_data)
+        result = await repo.update_admin_details(submitted_application.id, update_data)
 
+        assert result is not None
         assert result.status == ApplicationStatus.IN_PROGRESS.value
 
     async def test_update_admin_details_comment(
@@ -175,17 +284,76 @@ class TestApplicationRepository:
     ):
         """Test adding admin comment to application."""
         update_data = ApplicationAdminUpdate(admin_comment='Needs more documents')
-        result = await repo.update_admin_details(draft_application, update_data)
+        result = await repo.update_admin_details(draft_application.id, update_data)
 
+        assert result is not None
         assert result.admin_comment == 'Needs more documents'
 
+    async def test_update_admin_details_disallowed_transition(
+        self, repo: ApplicationRepository, submitted_application: Application
+    ):
+        """Test that a status change not allowed by the transition table is rejected."""
+        update_data = ApplicationAdminUpdate(status=ApplicationStatus.DRAFT)
+        result = await repo.update_admin_details(submitted_application.id, update_data)
+
+        assert result is None
+        assert await repo.get_status(submitted_application.id) == ApplicationStatus.NEW.value
+
+    async def test_update_admin_details_stale_version(
+        self, repo: ApplicationRepository, draft_application: Application
+    ):
+        """Test that an admin update with an outdated version is not applied."""
+        update_data = ApplicationAdminUpdate(admin_comment='Late comment')
+        result = await repo.update_admin_details(
+            draft_application.id, update_data, expected_versions={0}
+        )
+
+        assert result is None
+
+    async def test_update_admin_details_nonexistent(self, repo: ApplicationRepository):
+        """Test that updating a non-existent application returns None."""
+        update_data = ApplicationAdminUpdate(status=ApplicationStatus.REJECTED)
+        result = await repo.update_admin_details(uuid.uuid4(), update_data)
+
+        assert result is None
+
     async def test_submit_application(
         self, repo: ApplicationRepository, draft_application: Application
     ):
         """Test submitting a draft application."""
-        result = await repo.submit_application(draft_application)
+        assert await repo.submit_application(draft_application.id) is True
+
+        assert await repo.get_status(draft_application.id) == ApplicationStatus.NEW.value
+
+    async def test_submit_application_only_once(
+        self, repo: ApplicationRepository, draft_application: Application
+    ):
+        """Test that a second submit of the same application does not match."""
+        assert await repo.submit_application(draft_application.id) is True
+        assert await repo.submit_application(draft_application.id) is False
+
+    async def test_get_status(self, repo: ApplicationRepository, draft_application: Application):
+        """Test retrieving only the status of an application."""
+        assert await repo.get_status(draft_application.id) == ApplicationStatus.DRAFT.value
+        assert await repo.get_status(uuid.uuid4()) is None
+
+    async def test_payload_columns_are_deferred(
+        self,
+        repo: ApplicationRepository,
+        db_session: AsyncSession,
+        draft_application: Application,
+    ):
+        """Test that data and admin_comment are only loaded by full-entity reads."""
+        db_session.expunge_all()
+
+        draft = await repo.get_draft_by_telegram_id(draft_application.telegram_id)
+        assert draft is not None
+        assert 'data' not in inspect(draft).dict
+        assert 'admin_comment' not in inspect(draft).dict
 
-        assert result.status == ApplicationStatus.NEW.value
+        full = await repo.get_by_uuid(draft_application.id)
+        assert full is not None
+        assert full.data == {'test_field': 'test_value'}
 
     async def test_link_file(self, repo: ApplicationRepository, draft_application: Application):
         """Test linking a file to an application."""
@@ -206,6 +374,69 @@ class TestApplicationRepository:
         assert len(app_with_files.files) == 1
         assert app_with_files.files[0].file_id == 'test-file.pdf'
 
+    async def test_stored_archive_matches_file_list_until_file_linked(
+        self, repo: ApplicationRepository, draft_application: Application
+    ):
+        """Test that a stored archive is found by its files hash and dropped by link_file."""
+        assert await repo.save_archive(draft_application.id, 'hash-1', 'old.zip') == (
+            'old.zip',
+            None,
+        )
+        assert await repo.save_archive(draft_application.id, 'hash-2', 'archive.zip') == (
+            'archive.zip',
+            'old.zip',
+        )
+
+        assert await repo.get_archive_file_id(draft_application.id, 'hash-1') is None
+        assert await repo.get_archive_file_id(draft_application.id, 'hash-2') == 'archive.zip'
+
+        stale_archive_id = await repo.link_file(
+            draft_application.id,
+            FileLinkRequest(
+                file_id='new.pdf', original_filename='new.pdf', form_field_id='passport_scan'
+            ),
+        )
+
+        assert stale_archive_id == 'archive.zip'
+        assert await repo.get_archive_file_id(draft_application.id, 'hash-2') is None
+
+    async def test_save_archive_keeps_stored_archive_of_same_file_list(
+        self, repo: ApplicationRepository, draft_application: Application, assert_max_queries
+    ):
+        """Test that a concurrent build of a stored archive is discarded, not swapped in."""
+        await repo.save_archive(draft_application.id, 'hash-1', 'first.zip')
+
+        with assert_max_queries(2):
+            kept, unused = await repo.save_archive(draft_application.id, 'hash-1', 'second.zip')
+
+        assert (kept, unused) == ('first.zip', 'second.zip')
+        assert await repo.get_archive_file_id(draft_application.id, 'hash-1') == 'first.zip'
+
+    async def test_get_possible_duplicates_returns_newest_matches_up_to_limit(
+        self, repo: ApplicationRepository
+    ):
+        """Test that duplicates are limited in the query and list every matched key kind."""
+        now = datetime.now()
+        target, *others = [
+            Application(status='new', data={}, created_at=now - timedelta(days=days))
+            for days in (0, 3, 2, 1, 0)
+        ]
+        repo.session.add_all([target, *others])
+        await repo.session.commit()
+        phone, email = 'phone:79161234567', 'email:a@b.ru'
+        await repo.replace_match_keys(target.id, {phone, email})
+        await repo.replace_match_keys(others[0].id, {phone})
+        await repo.replace_match_keys(others[1].id, {phone, email})
+        await repo.replace_match_keys(others[2].id, {email})
+        await repo.replace_match_keys(others[3].id, {'email:c@d.ru'})
+
+        duplicates = await repo.get_possible_duplicates(target.id, limit=2)
+
+        assert duplicates == [
+            {'application_id': others[2].id, 'status': 'new', 'matched_on': ['email']},
+            {'application_id': others[1].id, 'status': 'new', 'matched_on': ['email', 'phone']},
+        ]
+
 
 class TestFormSchemaRepository:
     """Test suite for FormSchemaRepository."""
@@ -259,3 +490,124 @@ class TestFormSchemaRepository:
         assert isinstance(old_schema, FormSchema)
         assert old_schema.id == new_schema.id
         assert old_schema.version == '2.0'
+
+
+class TestJobRepository:
+    """Test suite for JobRepository."""
+
+    @pytest.fixture
+    def repo(self, db_session: AsyncSession) -> JobRepository:
+        """Provides a repository instance for each test."""
+        return JobRepository(session=db_session)
+
+    async def test_claim_next_takes_oldest_queued_job_once(
+        self, repo: JobRepository, db_session: AsyncSession
+    ):
+        """Test that jobs are claimed oldest first and never twice."""
+        now = datetime.now()
+        newer = Job(kind=JobKind.APPLICATIONS_EXPORT.value, params={}, created_at=now)
+        older = Job(
+            kind=JobKind.DOCUMENTS_ZIP.value,
+            params={'application_uuid': str(uuid.uuid4())},
+            created_at=now - timedelta(minutes=1),
+        )
+        db_session.add_all([newer, older])
+        await db_session.commit()
+
+        first = await repo.claim_next()
+        second = await repo.claim_next()
+
+        assert first is not None
+        assert second is not None
+        assert [first.id, second.id] == [older.id, newer.id]
+        assert first.status == JobStatus.RUNNING.value
+        assert first.attempts == 1
+        assert first.started_at is not None
+        assert await repo.claim_next() is None
+
+    async def test_fail_with_retry_queues_job_again(self, repo: JobRepository):
+        """Test that a retried job can be claimed again and counts its attempts."""
+        job = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        await repo.claim_next()
+
+        assert await repo.fail(job.id, 1, 'S3 unavailable', retry_at=datetime.now(UTC))
+        claimed = await repo.claim_next()
+
+        assert claimed is not None
+        assert claimed.id == job.id
+        assert claimed.attempts == 2
+        assert claimed.error is None
+
+    async def test_fail_without_retry_and_complete_are_final(self, repo: JobRepository):
+        """Test that failed and completed jobs are not claimed again."""
+        failed = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        completed = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        await repo.claim_next()
+        await repo.claim_next()
+
+        await repo.fail(failed.id, 1, 'Application not found')
+        await repo.complete(completed.id, 1, 'result.xlsx', 'export.xlsx')
+
+        assert await repo.claim_next() is None
+        failed_job = await repo.get(failed.id)
+        completed_job = await repo.get(completed.id)
+        await repo.session.refresh(failed_job)
+        await repo.session.refresh(completed_job)
+        assert failed_job.status == JobStatus.FAILED.value
+        assert failed_job.error == 'Application not found'
+        assert completed_job.status == JobStatus.COMPLETED.value
+        assert completed_job.result_file_id == 'result.xlsx'
+        assert completed_job.finished_at is not None
+
+    async def test_requeue_stale_recovers_jobs_of_stopped_workers(self, repo: JobRepository):
+        """Test that stale running jobs are retried, or failed once out of attempts."""
+        retried = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        exhausted = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        await repo.claim_next()
+        await repo.claim_next()
+        await repo.session.execute(update(Job).where(Job.id == exhausted.id).values(attempts=3))
+        await repo.session.commit()
+
+        assert await repo.requeue_stale(datetime.now() - timedelta(hours=1), max_attempts=3) == 0
+        recovered = await repo.requeue_stale(datetime.now() + timedelta(hours=1), max_attempts=3)
+
+        assert recovered == 2
+        statuses = dict((await repo.session.execute(select(Job.id, Job.status))).tuples().all())
+        assert statuses == {
+            retried.id: JobStatus.QUEUED.value,
+            exhausted.id: JobStatus.FAILED.value,
+        }
+
+    async def test_retried_job_waits_until_run_after(self, repo: JobRepository):
+        """Test that a job queued again with a backoff is not claimed before it is due."""
+        job = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        await repo.claim_next()
+
+        await repo.fail(
+            job.id, 1, 'S3 unavailable', retry_at=datetime.now(UTC) + timedelta(hours=1)
+        )
+
+        assert await repo.claim_next() is None
+        await repo.session.execute(
+            update(Job).where(Job.id == job.id).values(run_after=datetime.now(UTC))
+        )
+        await repo.session.commit()
+        assert (await repo.claim_next()).id == job.id
+
+    async def test_recovered_attempt_can_no_longer_record_its_outcome(self, repo: JobRepository):
+        """Test that a stale attempt does not overwrite the job once it was claimed again."""
+        job = await repo.enqueue(JobKind.APPLICATIONS_EXPORT)
+        await repo.claim_next()
+        assert await repo.heartbeat(job.id, 1) is True
+
+        await repo.requeue_stale(datetime.now() + timedelta(hours=1), max_attempts=3)
+        assert (await repo.claim_next()).attempts == 2
+
+        assert await repo.heartbeat(job.id, 1) is False
+        assert await repo.complete(job.id, 1, 'stale.xlsx', 'export.xlsx') is False
+        assert await repo.fail(job.id, 1, 'Timed out') is False
+        assert await repo.complete(job.id, 2, 'result.xlsx', 'export.xlsx') is True
+        job = await repo.get(job.id)
+        await repo.session.refresh(job)
+        assert job.status == JobStatus.COMPLETED.value
+        assert job.result_file_id == 'result.xlsx'
@@ -1,17 +1,52 @@
 """
 Unit tests for service layer.
 
-Tests the export_service and zip_service with mocked dependencies.
+Tests the export_service and zip_service with mocked dependencies, and the
+in-process autosave buffer, status event bus, duplicate match keys and
+background job worker, and the cold start of the application.
 """
 
+import asyncio
 import io
+import json
+import os
+import runpy
+import subprocess
+import sys
+import uuid
+import zipfile
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
-
-from app.models.db_models import Application, ApplicationFile
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.db import STARTUP_LOCK_KEY, acquire_startup_lock
+from app.core.tracing import FileSpanExporter, instrument_engine
+from app.models.db_models import Application, ApplicationFile, Job
+from app.repositories.applications import ApplicationRepository
+from app.repositories.jobs import JobRepository
+from app.schemas.applications import ApplicationStatus
+from app.schemas.jobs import JobKind, JobStatus
+from app.services.autosave import AutosaveBuffer
+from app.services.duplicates import match_keys
 from app.services.export_service import generate_xlsx_export
-from app.services.zip_service import create_documents_zip_archive
+from app.services.jobs import JobWorker
+from app.services.status_events import StatusEventBus, status_event_stream
+from app.services.zip_service import (
+    build_and_store_documents_archive,
+    create_documents_zip_archive,
+    documents_hash,
+)
 
 
 class TestExportService:
@@ -166,3 +201,659 @@ class TestZipService:
         content = result.getvalue()
         assert len(content) > 0
         assert content[:2] == b'PK'
+
+    def test_documents_hash_depends_on_the_file_list_only(self, application_with_mock_files):
+        """Test that the hash ignores file order and changes when a file is added."""
+        original = documents_hash(application_with_mock_files)
+
+        application_with_mock_files.files.reverse()
+        reordered = documents_hash(application_with_mock_files)
+        new_file = MagicMock(spec=ApplicationFile)
+        new_file.file_id = 'file3.pdf'
+        new_file.original_filename = 'certificate.pdf'
+        application_with_mock_files.files.append(new_file)
+
+        assert reordered == original
+        assert documents_hash(application_with_mock_files) != original
+
+    @pytest.mark.parametrize(
+        ('entries', 'stored'),
+        [(['passport.pdf', 'photo.jpg'], True), (['passport.pdf', 'photo.jpg.error.txt'], False)],
+    )
+    @patch('app.services.zip_service.upload_file', new_callable=AsyncMock)
+    @patch('app.services.zip_service.create_documents_zip_archive', new_callable=AsyncMock)
+    async def test_build_and_store_archive(
+        self,
+        mock_create: AsyncMock,
+        mock_upload: AsyncMock,
+        entries: list[str],
+        stored: bool,
+        application_with_mock_files,
+        mock_settings,
+    ):
+        """Test that only archives with every document are stored for reuse."""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            for name in entries:
+                zip_file.writestr(name, b'content')
+        mock_create.return_value = archive
+        mock_upload.return_value = 'archive.zip'
+        repo = MagicMock()
+        repo.save_archive = AsyncMock(return_value=('archive.zip', None))
+
+        result, file_id = await build_and_store_documents_archive(
+            application_with_mock_files, repo, mock_settings
+        )
+
+        assert result.tell() == 0
+        assert result.getvalue() == archive.getvalue()
+        if stored:
+            assert file_id == 'archive.zip'
+            repo.save_archive.assert_awaited_once_with(
+                'test-uuid-123', documents_hash(application_with_mock_files), 'archive.zip'
+            )
+        else:
+            assert file_id is None
+            mock_upload.assert_not_called()
+            repo.save_archive.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ('saved', 'expected_file_id', 'deleted'),
+        [
+            (('archive.zip', 'old.zip'), 'archive.zip', 'old.zip'),
+            (('stored.zip', 'archive.zip'), 'stored.zip', 'archive.zip'),
+        ],
+    )
+    @patch('app.services.zip_service.delete_file', new_callable=AsyncMock)
+    @patch('app.services.zip_service.upload_file', new_callable=AsyncMock)
+    @patch('app.services.zip_service.create_documents_zip_archive', new_callable=AsyncMock)
+    async def test_build_and_store_archive_deletes_unused_archive(
+        self,
+        mock_create: AsyncMock,
+        mock_upload: AsyncMock,
+        mock_delete: AsyncMock,
+        saved: tuple[str, str],
+        expected_file_id: str,
+        deleted: str,
+        application_with_mock_files,
+        mock_settings,
+    ):
+        """Test that the replaced archive, or the redundant new upload, is deleted."""
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zip_file:
+            zip_file.writestr('passport.pdf', b'content')
+        mock_create.return_value = archive
+        mock_upload.return_value = 'archive.zip'
+        repo = MagicMock()
+        repo.save_archive = AsyncMock(return_value=saved)
+
+        _, file_id = await build_and_store_documents_archive(
+            application_with_mock_files, repo, mock_settings
+        )
+
+        assert file_id == expected_file_id
+        mock_delete.assert_awaited_once_with(deleted, mock_settings)
+
+
+class TestStatusEvents:
+    """Test suite for the status event bus and the SSE stream."""
+
+    @pytest.fixture
+    def bus(self) -> StatusEventBus:
+        return StatusEventBus()
+
+    async def test_publish_reaches_only_matching_subscribers(self, bus: StatusEventBus):
+        """Test that events are delivered to subscribers of the same application."""
+        app_id, other_id = uuid.uuid4(), uuid.uuid4()
+        queue = bus.subscribe(app_id)
+        other_queue = bus.subscribe(other_id)
+
+        await bus.publish(app_id, 'new')
+
+        assert queue.get_nowait() == 'new'
+        assert other_queue.empty()
+
+    async def test_subscriber_keeps_only_latest_status(self, bus: StatusEventBus):
+        """Test that a slow subscriber sees the latest status, not a backlog."""
+        app_id = uuid.uuid4()
+        queue = bus.subscribe(app_id)
+
+        await bus.publish(app_id, 'new')
+        await bus.publish(app_id, 'in_progress')
+
+        assert queue.get_nowait() == 'in_progress'
+        assert queue.empty()
+
+    async def test_publish_many_dispatches_each_event(self, bus: StatusEventBus):
+        """Test that batched events reach the subscribers of each application."""
+        first_id, second_id = uuid.uuid4(), uuid.uuid4()
+        first_queue, second_queue = bus.subscribe(first_id), bus.subscribe(second_id)
+
+        await bus.publish_many([(first_id, 'rejected'), (second_id, 'completed')])
+
+        assert first_queue.get_nowait() == 'rejected'
+        assert second_queue.get_nowait() == 'completed'
+
+    async def test_notification_payload_is_dispatched(self, bus: StatusEventBus):
+        """Test that a LISTEN notification is delivered to local subscribers."""
+        app_id = uuid.uuid4()
+        queue = bus.subscribe(app_id)
+
+        bus._on_notification(None, 1, 'application_status', f'{app_id}:rejected')
+
+        assert queue.get_nowait() == 'rejected'
+
+    @patch('app.services.status_events.RECONNECT_DELAY_SECONDS', 0)
+    @patch('app.services.status_events.asyncpg.connect', new_callable=AsyncMock)
+    async def test_lost_connection_is_reestablished(
+        self, mock_connect: AsyncMock, bus: StatusEventBus
+    ):
+        """Test that LISTEN is registered again after the connection drops, e.g. on failover."""
+        first, second = MagicMock(add_listener=AsyncMock()), MagicMock(add_listener=AsyncMock())
+        mock_connect.side_effect = [first, OSError('connection refused'), second]
+        app_id = uuid.uuid4()
+        queue = bus.subscribe(app_id)
+        await bus.start('postgresql://db/test')
+        (on_termination,), _ = first.add_termination_listener.call_args
+
+        on_termination(first)
+        # Events are delivered locally until the connection is back.
+        await bus.publish(app_id, 'in_progress')
+        assert queue.get_nowait() == 'in_progress'
+        await bus._reconnect_task
+
+        assert mock_connect.await_count == 3
+        second.add_listener.assert_awaited_once_with('application_status', bus._on_notification)
+        second.close = AsyncMock()
+        await bus.stop()
+        on_termination(second)
+        assert bus._reconnect_task is None
+        second.close.assert_awaited_once()
+
+    async def test_stream_pushes_changes_until_final_status(self, bus: StatusEventBus):
+        """Test that the stream sends the initial status, changes and then ends."""
+        app_id = uuid.uuid4()
+        queue = bus.subscribe(app_id)
+        stream = status_event_stream(
+            bus=bus,
+            application_id=app_id,
+            queue=queue,
+            initial_status='new',
+            is_disconnected=AsyncMock(return_value=False),
+            keepalive_seconds=5,
+            max_seconds=60,
+        )
+
+        assert (await anext(stream)).startswith('retry:')
+        assert '"new"' in await anext(stream)
+
+        next_event = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        await bus.publish(app_id, 'completed')
+        assert '"completed"' in await next_event
+
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        assert app_id not in bus._subscribers
+
+    async def test_stream_sends_keepalives_and_stops_on_disconnect(self, bus: StatusEventBus):
+        """Test that an idle stream sends keepalives and ends when the client leaves."""
+        app_id = uuid.uuid4()
+        stream = status_event_stream(
+            bus=bus,
+            application_id=app_id,
+            queue=bus.subscribe(app_id),
+            initial_status='draft',
+            is_disconnected=AsyncMock(side_effect=[False, True]),
+            keepalive_seconds=0.01,
+            max_seconds=60,
+        )
+
+        events = [event async for event in stream]
+
+        assert events[-1] == ': keepalive\n\n'
+        assert app_id not in bus._subscribers
+
+
+class TestAutosaveBuffer:
+    """Test suite for the autosave write-coalescing buffer."""
+
+    @pytest.fixture
+    def session_factory(self, db_session: AsyncSession) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+    @pytest.fixture
+    def buffer(self, session_factory: async_sessionmaker[AsyncSession]) -> AutosaveBuffer:
+        return AutosaveBuffer(session_factory=session_factory, window_seconds=60)
+
+    async def test_saves_within_window_are_coalesced(
+        self, buffer: AutosaveBuffer, db_session: AsyncSession, draft_application: Application
+    ):
+        """Test that several saves produce a single write of the latest data."""
+        app_id = draft_application.id
+        buffer.save(app_id, {'step': 1})
+        buffer.save(app_id, {'step': 2})
+        buffer.save(app_id, {'step': 3})
+
+        assert buffer.has_pending(app_id)
+        await buffer.flush(app_id)
+
+        await db_session.refresh(draft_application, attribute_names=['data'])
+        assert draft_application.data == {'step': 3}
+        assert not buffer.has_pending(app_id)
+        assert buffer.metrics() == {'saves': 3, 'coalesced': 2, 'flushes': 1, 'pending': 0}
+
+    async def test_window_expiry_flushes_automatically(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        db_session: AsyncSession,
+        draft_application: Application,
+    ):
+        """Test that pending data is written once the window ends."""
+        buffer = AutosaveBuffer(session_factory=session_factory, window_seconds=0.01)
+        buffer.save(draft_application.id, {'step': 1})
+
+        await asyncio.sleep(0.1)
+
+        await db_session.refresh(draft_application, attribute_names=['data'])
+        assert draft_application.data == {'step': 1}
+        assert buffer.stats['flushes'] == 1
+
+    async def test_save_for_submitted_application_is_dropped(
+        self, buffer: AutosaveBuffer, db_session: AsyncSession, submitted_application: Application
+    ):
+        """Test that buffered data never overwrites an application that left draft."""
+        buffer.save(submitted_application.id, {'late': True})
+        await buffer.flush_all()
+
+        await db_session.refresh(submitted_application, attribute_names=['data', 'status'])
+        assert submitted_application.data != {'late': True}
+        assert submitted_application.status == ApplicationStatus.NEW.value
+        assert buffer.stats['dropped'] == 1
+
+
+class TestDuplicateMatchKeys:
+    """Test suite for identity normalization used by duplicate detection."""
+
+    def test_same_person_in_different_formats_gets_same_keys(self):
+        """Test that formatting differences do not prevent a match."""
+        first = match_keys(
+            {
+                'phone': '8 (916) 123-45-67',
+                'email': ' Ivanova@Example.com',
+                'beneficiary_name': 'Иванов Пётр',
+                'beneficiary_dob': '01.03.2015',
+            }
+        )
+        second = match_keys(
+            {
+                'phone': '+79161234567',
+                'email': 'ivanova@example.com',
+                'beneficiary_name': 'петр  ИВАНОВ',
+                'beneficiary_dob': '2015-03-01',
+            }
+        )
+
+        assert first == second
+        assert 'phone:79161234567' in first
+
+    def test_incomplete_identity_yields_no_keys(self):
+        """Test that partial or malformed identity data is not used as a key."""
+        keys = match_keys({'phone': '123', 'email': 'none', 'beneficiary_name': 'Иванов'})
+
+        assert keys == set()
+
+
+class TestTracing:
+    """Test suite for database query tracing."""
+
+    async def test_queries_are_traced_as_children_of_the_current_span(self):
+        """Test that queries, including failing ones, are recorded under the request span."""
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        engine = create_async_engine('sqlite+aiosqlite://')
+        instrument_engine(engine.sync_engine, tracer_provider=provider)
+
+        with provider.get_tracer(__name__).start_as_current_span('request') as request_span:
+            async with engine.connect() as conn:
+                await conn.execute(text('SELECT 1'))
+                with pytest.raises(OperationalError):
+                    await conn.execute(text('SELECT * FROM missing_table'))
+        await engine.dispose()
+
+        query_spans = [span for span in exporter.get_finished_spans() if span.name != 'request']
+        assert [span.name for span in query_spans] == ['SELECT', 'SELECT']
+        assert all(
+            span.parent.span_id == request_span.get_span_context().span_id for span in query_spans
+        )
+        assert query_spans[0].attributes['db.statement'] == 'SELECT 1'
+        assert query_spans[1].status.status_code == StatusCode.ERROR
+
+    def test_file_exporter_writes_json_lines_and_closes_on_shutdown(self, tmp_path: Path):
+        """Test that spans are appended one per line and the file is closed on shutdown."""
+        path = tmp_path / 'spans.jsonl'
+        exporter = FileSpanExporter(str(path))
+        provider = TracerProvider(shutdown_on_exit=False)
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+        for name in ('first', 'second'):
+            provider.get_tracer(__name__).start_span(name).end()
+        provider.shutdown()
+
+        assert exporter.out.closed
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['name'] for line in lines] == ['first', 'second']
+
+
+class TestJobWorker:
+    """Test suite for the background job worker."""
+
+    @pytest.fixture
+    def session_factory(self, db_session: AsyncSession) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+    @pytest.fixture
+    def worker(self, session_factory: async_sessionmaker[AsyncSession]) -> JobWorker:
+        return JobWorker(
+            session_factory,
+            settings.model_copy(
+                update={
+                    'JOB_MAX_ATTEMPTS': 2,
+                    'JOB_POLL_INTERVAL_SECONDS': 0.01,
+                    'JOB_RETRY_BACKOFF_SECONDS': 0,
+                }
+            ),
+        )
+
+    async def _get_job(self, db_session: AsyncSession, job: Job) -> Job:
+        await db_session.refresh(job)
+        return job
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_export_job_uploads_result(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that a completed export is uploaded and recorded on the job."""
+        mock_upload.return_value = 'stored.xlsx'
+        job = await JobRepository(db_session).enqueue(JobKind.APPLICATIONS_EXPORT)
+
+        assert await worker.run_next() is True
+
+        content, filename, _, _ = mock_upload.await_args.args
+        assert content.getvalue()[:2] == b'PK'
+        assert filename.endswith('.xlsx')
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.COMPLETED.value
+        assert job.result_file_id == 'stored.xlsx'
+        assert job.result_filename == filename
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_archive_job_reuses_stored_archive(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        application_with_files: Application,
+    ):
+        """Test that an archive job completes with the stored archive, without building it."""
+        await ApplicationRepository(db_session).save_archive(
+            application_with_files.id, documents_hash(application_with_files), 'stored.zip'
+        )
+        job = await JobRepository(db_session).enqueue(
+            JobKind.DOCUMENTS_ZIP, {'application_uuid': str(application_with_files.id)}
+        )
+
+        with patch('app.services.jobs.build_and_store_documents_archive') as mock_build:
+            await worker.run_next()
+
+        mock_build.assert_not_called()
+        mock_upload.assert_not_called()
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.COMPLETED.value
+        assert job.result_file_id == 'stored.zip'
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_match_keys_job_indexes_application_without_result_file(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that a match keys job stores the keys and completes without uploading."""
+        repo = ApplicationRepository(db_session)
+        submitted_application.data = {'phone': '8 916 123 45 67'}
+        await db_session.commit()
+        other = Application(status='new', data={'phone': '+79161234567'})
+        db_session.add(other)
+        await db_session.commit()
+        await repo.replace_match_keys(other.id, {'phone:79161234567'})
+        job = await JobRepository(db_session).enqueue(
+            JobKind.MATCH_KEYS, {'application_uuid': str(submitted_application.id)}
+        )
+
+        assert await worker.run_next() is True
+
+        mock_upload.assert_not_called()
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.COMPLETED.value
+        assert job.result_file_id is None
+        duplicates = await repo.get_possible_duplicates(submitted_application.id)
+        assert [match['application_id'] for match in duplicates] == [other.id]
+
+    async def test_job_for_missing_application_fails_without_retry(
+        self, worker: JobWorker, db_session: AsyncSession
+    ):
+        """Test that a JobError fails the job at the first attempt."""
+        job = await JobRepository(db_session).enqueue(
+            JobKind.DOCUMENTS_ZIP, {'application_uuid': str(uuid.uuid4())}
+        )
+
+        await worker.run_next()
+
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.FAILED.value
+        assert job.attempts == 1
+        assert 'no longer exist' in job.error
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_failed_job_is_retried_up_to_max_attempts(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that unexpected errors are retried until JOB_MAX_ATTEMPTS is reached."""
+        mock_upload.side_effect = httpx.ConnectError('file storage is down')
+        job = await JobRepository(db_session).enqueue(JobKind.APPLICATIONS_EXPORT)
+
+        await worker.run_next()
+        assert (await self._get_job(db_session, job)).status == JobStatus.QUEUED.value
+
+        await worker.run_next()
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.FAILED.value
+        assert job.attempts == 2
+        assert job.error == 'ConnectError: file storage is down'
+        assert await worker.run_next() is False
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_failed_job_is_retried_after_backoff(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that a retry waits for the backoff instead of running right away."""
+        mock_upload.side_effect = httpx.ConnectError('file storage is down')
+        worker.settings.JOB_RETRY_BACKOFF_SECONDS = 60
+        job = await JobRepository(db_session).enqueue(JobKind.APPLICATIONS_EXPORT)
+
+        await worker.run_next()
+
+        assert await worker.run_next() is False
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.QUEUED.value
+        assert job.run_after.replace(tzinfo=None) > datetime.now(UTC).replace(tzinfo=None)
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_outcome_of_recovered_attempt_is_discarded(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that a job recovered as stale while running is not marked completed."""
+        job = await JobRepository(db_session).enqueue(JobKind.APPLICATIONS_EXPORT)
+
+        async def upload_after_recovery(*args):
+            await JobRepository(db_session).requeue_stale(
+                datetime.now(UTC) + timedelta(hours=1), max_attempts=2
+            )
+            return 'stored.xlsx'
+
+        mock_upload.side_effect = upload_after_recovery
+
+        assert await worker.run_next() is True
+
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.QUEUED.value
+        assert job.result_file_id is None
+
+    @patch('app.services.jobs.upload_file', new_callable=AsyncMock)
+    async def test_run_processes_jobs_until_stopped(
+        self,
+        mock_upload: AsyncMock,
+        worker: JobWorker,
+        db_session: AsyncSession,
+        submitted_application: Application,
+    ):
+        """Test that the worker loop picks up queued jobs and exits on stop."""
+        mock_upload.return_value = 'stored.xlsx'
+        job = await JobRepository(db_session).enqueue(JobKind.APPLICATIONS_EXPORT)
+        # The test database is a single shared SQLite connection: a second loop's session
+        # closing would roll back the first loop's statements, so only one loop may use it.
+        worker.settings.JOB_WORKER_CONCURRENCY = 1
+        job_done = asyncio.Event()
+        run_next = worker.run_next
+
+        async def run_next_and_signal() -> bool:
+            found = await run_next()
+            if found:
+                job_done.set()
+            return found
+
+        stop = asyncio.Event()
+        with (
+            patch.object(worker, 'run_next', run_next_and_signal),
+            patch.object(worker, 'recover_stale', AsyncMock(return_value=0)),
+        ):
+            run = asyncio.create_task(worker.run(stop))
+            await asyncio.wait_for(job_done.wait(), timeout=5)
+            stop.set()
+            await asyncio.wait_for(run, timeout=5)
+
+        job = await self._get_job(db_session, job)
+        assert job.status == JobStatus.COMPLETED.value
+
+
+class TestStartup:
+    """Test suite for the worker process model and the cold start of the app."""
+
+    # Loaded on first use only; see export_service and main.
+    LAZY_MODULES = ('pandas', 'numpy', 'openpyxl', 'opentelemetry.sdk')
+    # Generous enough for a slow CI runner; a cold import takes about 1.5 s locally.
+    IMPORT_TIME_BUDGET = 5.0
+
+    def test_cold_import_of_app(self):
+        """Test that importing the app is fast and skips the heavy optional modules."""
+        script = (
+            'import json, sys, time\n'
+            'start = time.perf_counter()\n'
+            'import app.main\n'
+            'print(json.dumps({"seconds": time.perf_counter() - start,'
+            f' "loaded": [m for m in {self.LAZY_MODULES!r} if m in sys.modules]}}))\n'
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        report = json.loads(result.stdout.splitlines()[-1])
+
+        assert report['loaded'] == []
+        assert report['seconds'] < self.IMPORT_TIME_BUDGET, report
+
+    @staticmethod
+    def _load_gunicorn_config(monkeypatch: pytest.MonkeyPatch) -> dict:
+        # The config sets PROMETHEUS_MULTIPROC_DIR and PROFILING_DIR for several workers.
+        # setenv records each variable's original state, so monkeypatch restores it after
+        # the test.
+        for name in ('PROMETHEUS_MULTIPROC_DIR', 'PROFILING_DIR'):
+            monkeypatch.setenv(name, '')
+            monkeypatch.delenv(name)
+        return runpy.run_path(str(Path(__file__).parent.parent / 'app' / 'gunicorn_conf.py'))
+
+    def test_gunicorn_config_uses_settings(self, monkeypatch):
+        """Test that the worker settings are applied and enable multiprocess metrics."""
+        monkeypatch.setattr(settings, 'API_WORKERS', 4)
+        monkeypatch.setattr(settings, 'API_WORKER_MAX_REQUESTS', 1000)
+
+        config = self._load_gunicorn_config(monkeypatch)
+
+        assert config['workers'] == 4
+        assert config['worker_class'] == 'uvicorn.workers.UvicornWorker'
+        assert config['max_requests'] == 1000
+        assert config['max_requests_jitter'] == 100
+        assert 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+    def test_gunicorn_config_shares_profiles_between_workers(self, monkeypatch):
+        """Test that profiles are stored in a shared directory only with several workers."""
+        monkeypatch.setattr(settings, 'PROFILING_ENABLED', True)
+        monkeypatch.setattr(settings, 'API_WORKERS', 1)
+        self._load_gunicorn_config(monkeypatch)
+        assert 'PROFILING_DIR' not in os.environ
+
+        monkeypatch.setattr(settings, 'API_WORKERS', 4)
+        self._load_gunicorn_config(monkeypatch)
+        assert 'PROFILING_DIR' in os.environ
+
+    def test_gunicorn_config_defaults_to_one_worker_per_core(self, monkeypatch):
+        """Test that API_WORKERS=0 starts one worker per available core."""
+        monkeypatch.setattr(settings, 'API_WORKERS', 0)
+
+        config = self._load_gunicorn_config(monkeypatch)
+
+        assert config['workers'] == len(os.sched_getaffinity(0))
+
+    def test_gunicorn_config_leaves_the_environment_unchanged(self, monkeypatch):
+        """Test that loading the config does not switch later tests to multiprocess metrics."""
+        metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+        with monkeypatch.context() as patched:
+            patched.setattr(settings, 'API_WORKERS', 4)
+            self._load_gunicorn_config(patched)
+
+        assert os.environ.get('PROMETHEUS_MULTIPROC_DIR') == metrics_dir
+
+    async def test_startup_lock_is_taken_on_postgres_only(self, db_session: AsyncSession):
+        """Test that the advisory lock is requested on PostgreSQL and skipped on SQLite."""
+        await acquire_startup_lock(db_session)
+
+        postgres_session = MagicMock()
+        postgres_session.get_bind.return_value.dialect.name = 'postgresql'
+        postgres_session.execute = AsyncMock()
+        await acquire_startup_lock(postgres_session)
+
+        statement, params = postgres_session.execute.await_args.args
+        assert 'pg_advisory_xact_lock' in str(statement)
+        assert params == {'key': STARTUP_LOCK_KEY}
@@ -0,0 +1,152 @@
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import Message, TelegramObject
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind
+
+from app.core.metrics import HANDLER_LATENCY
+
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer(__name__)
+
+THROTTLED_MESSAGE = 'Вы отправляете команды слишком часто. Пожалуйста, подождите немного.'
+
+
+@dataclass
+class _UserWindow:
+    timestamps: deque[float] = field(default_factory=deque)
+    notified: bool = False
+
+
+class SlidingWindowLimiter:
+    """
+    Per-key sliding-window rate limiter.
+
+    Allows at most `limit` hits per `period` seconds for each key. State is kept
+    in an LRU of at most `max_keys` entries, so memory stays bounded no matter
+    how many distinct users talk to the bot.
+    """
+
+    def __init__(self, limit: int, period: float, max_keys: int):
+        self.limit = limit
+        self.period = period
+        self.max_keys = max_keys
+        self._windows: OrderedDict[int, _UserWindow] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def hit(self, key: int) -> tuple[bool, bool]:
+        """
+        Registers a hit for `key`.
+
+        Returns a tuple `(allowed, first_rejection)`, where `first_rejection` is True
+        only for the first rejected hit since the key was last allowed.
+        """
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _UserWindow()
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+
+        while window.timestamps and now - window.timestamps[0] >= self.period:
+            window.timestamps.popleft()
+
+        if len(window.timestamps) < self.limit:
+            window.timestamps.append(now)
+            window.notified = False
+            return True, False
+
+        first_rejection = not window.notified
+        window.notified = True
+        return False, first_rejection
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Drops messages from users who trigger handlers too often and replies
+    once with a soft "slow down" message.
+    """
+
+    def __init__(self, limit: int, period: float, max_tracked_users: int):
+        self.limiter = SlidingWindowLimiter(limit=limit, period=period, max_keys=max_tracked_users)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Message) or not event.from_user:
+            return await handler(event, data)
+
+        user_id = event.from_user.id
+        allowed, first_rejection = self.limiter.hit(user_id)
+        if allowed:
+            return await handler(event, data)
+
+        logger.warning(f'Throttled message from user {user_id}.')
+        if first_rejection:
+            await event.answer(THROTTLED_MESSAGE)
+        return None
+
+
+def _handler_name(data: dict[str, Any]) -> str:
+    return getattr(getattr(data.get('handler'), 'callback', None), '__name__', 'unknown')
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Records the latency of each handler and whether it raised.
+
+    Must be registered as an inner middleware, so that it only runs once a
+    handler has matched and `data['handler']` is available.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        name = _handler_name(data)
+        outcome = 'error'
+        start = time.perf_counter()
+        try:
+            result = await handler(event, data)
+            outcome = 'success'
+            return result
+        finally:
+            HANDLER_LATENCY.labels(handler=name, outcome=outcome).observe(
+                time.perf_counter() - start
+            )
+
+
+class HandlerTracingMiddleware(BaseMiddleware):
+    """
+    Starts a trace for each handler call, so that the calls it makes to
+    api-service are grouped under it. Registered as an inner middleware.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        name = _handler_name(data)
+        with tracer.start_as_current_span(
+            f'bot {name}', kind=SpanKind.CONSUMER, attributes={'bot.handler': name}
+        ):
+            return await handler(event, data)
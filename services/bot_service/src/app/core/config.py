@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,28 @@ class Settings(BaseSettings):
     MINI_APP_URL: str
     API_SERVICE_URL: str
 
+    # Resilience of calls to api-service
+    API_REQUEST_TIMEOUT: float = 5.0
+    API_MAX_RETRIES: int = 2
+    API_RETRY_BACKOFF_BASE: float = 0.2
+    API_RETRY_BACKOFF_MAX: float = 2.0
+    API_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    API_CIRCUIT_RESET_TIMEOUT: float = 30.0
+
+    # Per-user throttling of bot commands
+    THROTTLE_RATE_LIMIT: int = 5
+    THROTTLE_PERIOD: float = 10.0
+    THROTTLE_MAX_TRACKED_USERS: int = 10000
+
+    # Port of the Prometheus metrics endpoint
+    METRICS_PORT: int = 9100
+
+    # OpenTelemetry tracing: 'otlp' sends spans to the collector, 'file' appends them as JSON lines
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal['otlp', 'file'] = 'otlp'
+    TRACING_OTLP_ENDPOINT: str = 'http://jaeger:4318/v1/traces'
+    TRACING_FILE_PATH: str = 'traces.jsonl'
+
     model_config = SettingsConfigDict(env_file='.env', extra='ignore')
 
 
@@ -0,0 +1,52 @@
+from collections.abc import Iterator
+
+from prometheus_client import Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.internal_clients.api_client import ApiClient
+from app.internal_clients.resilience import CircuitState
+
+
+HANDLER_LATENCY = Histogram(
+    'bot_handler_duration_seconds',
+    'Time spent in bot handlers, including calls to api-service.',
+    ['handler', 'outcome'],
+)
+
+
+class ApiClientCollector(Collector):
+    """Exposes the call outcomes and circuit breaker state of an ApiClient at scrape time."""
+
+    def __init__(self, client: ApiClient) -> None:
+        self.client = client
+
+    def collect(self) -> Iterator[CounterMetricFamily | GaugeMetricFamily]:
+        snapshot = self.client.metrics()
+        circuit = snapshot['circuit']
+
+        outcomes = CounterMetricFamily(
+            'bot_api_client_calls', 'Calls to api-service by outcome.', labels=['outcome']
+        )
+        for outcome, count in snapshot['outcomes'].items():
+            outcomes.add_metric([outcome], count)
+        yield outcomes
+
+        state = GaugeMetricFamily(
+            'bot_api_client_circuit_state',
+            'Circuit breaker state; 1 for the current state.',
+            labels=['state'],
+        )
+        for circuit_state in CircuitState:
+            state.add_metric([circuit_state.value], float(circuit['state'] == circuit_state.value))
+        yield state
+        yield CounterMetricFamily(
+            'bot_api_client_circuit_opened',
+            'Times the circuit breaker has opened.',
+            value=circuit['opened_total'],
+        )
+        yield CounterMetricFamily(
+            'bot_api_client_circuit_rejected',
+            'Calls rejected while the circuit was open.',
+            value=circuit['rejected_total'],
+        )
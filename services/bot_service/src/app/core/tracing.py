@@ -0,0 +1,44 @@
+from opentelemetry import trace
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+
+from app.core.config import settings
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """Appends spans to a file as JSON lines, one span per line."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(
+            out=open(path, 'a', encoding='utf-8'),  # noqa: SIM115 - closed in shutdown()
+            formatter=lambda span: span.to_json(indent=None) + '\n',
+        )
+
+    def shutdown(self) -> None:
+        # Called by the span processor on TracerProvider.shutdown(), at interpreter exit.
+        self.out.close()
+
+
+def build_exporter() -> SpanExporter:
+    """Returns the span exporter selected by TRACING_EXPORTER."""
+    if settings.TRACING_EXPORTER == 'file':
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def setup_tracing() -> None:
+    """
+    Enables OpenTelemetry tracing. Each handler call starts a trace (see
+    HandlerTracingMiddleware), and the ApiClient's httpx calls propagate it to
+    api-service through `traceparent` headers.
+    """
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: 'bot-service'}))
+    provider.add_span_processor(BatchSpanProcessor(build_exporter()))
+    trace.set_tracer_provider(provider)
+
+    HTTPXClientInstrumentor().instrument(tracer_provider=provider)
@@ -1,16 +1,105 @@
+import asyncio
 import logging
+from collections import Counter
+from typing import Any
 
 import httpx
 
 from app.core.config import settings
+from app.internal_clients.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
 
 
 logger = logging.getLogger(__name__)
 
+RETRYABLE_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
 
 class ApiClient:
-    def __init__(self, base_url: str):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = settings.API_REQUEST_TIMEOUT,
+        max_retries: int = settings.API_MAX_RETRIES,
+        backoff_base: float = settings.API_RETRY_BACKOFF_BASE,
+        backoff_max: float = settings.API_RETRY_BACKOFF_MAX,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
         self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            name='api-service',
+            failure_threshold=settings.API_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.API_CIRCUIT_RESET_TIMEOUT,
+        )
+        self.outcomes: Counter[str] = Counter()
+
+    def metrics(self) -> dict[str, Any]:
+        """Returns call outcome counters and the circuit breaker state."""
+        return {'outcomes': dict(self.outcomes), 'circuit': self.circuit_breaker.metrics()}
+
+    async def _request(
+        self, method: str, path: str, *, idempotent: bool, **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Sends a request to the API service through the circuit breaker.
+
+        Idempotent calls are retried on transport errors and 5xx responses using
+        jittered exponential backoff. While the circuit is open, CircuitOpenError
+        is raised immediately without touching the network.
+        """
+        if not self.circuit_breaker.allow_request():
+            self.outcomes['circuit_open'] += 1
+            raise CircuitOpenError(f'Circuit "{self.circuit_breaker.name}" is open')
+
+        url = f'{self.base_url}{path}'
+        retries = self.max_retries if idempotent else 0
+        attempt = 0
+
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                while True:
+                    try:
+                        response = await getattr(client, method)(url, **kwargs)
+                        if response.status_code in RETRYABLE_STATUS_CODES:
+                            response.raise_for_status()
+                    except Exception as e:
+                        if _is_retryable(e) and attempt < retries:
+                            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                            attempt += 1
+                            logger.warning(
+                                f'{method.upper()} {path} failed ({e!r}), '
+                                f'retrying in {delay:.2f}s ({attempt}/{retries})'
+                            )
+                            self.outcomes['retry'] += 1
+                            await asyncio.sleep(delay)
+                            continue
+
+                        if isinstance(e, httpx.HTTPStatusError) and not _is_retryable(e):
+                            # The service answered with a client error, so it is reachable.
+                            self.circuit_breaker.record_success()
+                        else:
+                            self.circuit_breaker.record_failure()
+                        self.outcomes['error'] += 1
+                        raise
+
+                    self.circuit_breaker.record_success()
+                    self.outcomes['success'] += 1
+                    return response
+        except asyncio.CancelledError:
+            # E.g. a handler timeout or shutdown. A cancelled half-open trial must release
+            # its slot, or the circuit would keep rejecting every call.
+            self.circuit_breaker.record_cancelled()
+            self.outcomes['cancelled'] += 1
+            raise
 
     async def create_telegram_session(self, telegram_id: int) -> str | None:
         """
@@ -18,56 +107,87 @@ class ApiClient:
         Sends the user's telegram_id in the request body.
         Returns the application_uuid if successful, otherwise None.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                payload = {'telegram_id': telegram_id}
-                response = await client.post(
-                    f'{self.base_url}/api/v1/sessions/telegram', json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get('application_uuid')
-            except httpx.HTTPStatusError as e:
-                logger.error(
-                    f'HTTP error creating session for {telegram_id}: {e.response.status_code} - '
-                    f'{e.response.text}'
-                )
-                return None
-            except Exception as e:
-                logger.error(
-                    f'Unexpected error creating session for {telegram_id}: {e}', exc_info=True
-                )
-                return None
+        try:
+            payload = {'telegram_id': telegram_id}
+            # Safe to retry: the endpoint resumes the existing draft on repeated calls.
+            response = await self._request(
+                'post', '/api/v1/sessions/telegram', idempotent=True, json=payload
+            )
+            response.raise_for_status()
+            data = response.json()
+            return data.get('application_uuid')
+        except CircuitOpenError:
+            logger.warning(f'API service unavailable, not creating session for {telegram_id}')
+            return None
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                f'HTTP error creating session for {telegram_id}: {e.response.status_code} - '
+                f'{e.response.text}'
+            )
+            return None
+        except Exception as e:
+            logger.error(f'Unexpected error creating session for {telegram_id}: {e}', exc_info=True)
+            return None
 
     async def get_telegram_application_status(self, telegram_id: int) -> str | None:
         """
         Calls the API service to get the status of the latest application
         for a Telegram user.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                params = {'telegram_id': telegram_id}
-                response = await client.get(
-                    f'{self.base_url}/api/v1/sessions/telegram/status', params=params
-                )
-
-                if response.status_code == 404:
-                    return 'not_found'
-
-                response.raise_for_status()
-                data = response.json()
-                return data.get('status')
-            except httpx.HTTPStatusError as e:
-                logger.error(
-                    f'HTTP error getting status for {telegram_id}: {e.response.status_code} - '
-                    f'{e.response.text}'
-                )
-                return None
-            except Exception as e:
-                logger.error(
-                    f'Unexpected error getting status for {telegram_id}: {e}', exc_info=True
-                )
-                return None
+        try:
+            params = {'telegram_id': telegram_id}
+            response = await self._request(
+                'get', '/api/v1/sessions/telegram/status', idempotent=True, params=params
+            )
+
+            if response.status_code == 404:
+                return 'not_found'
+
+            response.raise_for_status()
+            data = response.json()
+            return data.get('status')
+        except CircuitOpenError:
+            logger.warning(f'API service unavailable, not getting status for {telegram_id}')
+            return None
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                f'HTTP error getting status for {telegram_id}: {e.response.status_code} - '
+                f'{e.response.text}'
+            )
+            return None
+        except Exception as e:
+            logger.error(f'Unexpected error getting status for {telegram_id}: {e}', exc_info=True)
+            return None
+
+    async def get_telegram_application_statuses(
+        self, telegram_ids: list[int]
+    ) -> dict[int, str] | None:
+        """
+        Calls the API service to get the statuses of the latest applications
+        for many Telegram users in a single request. Users without applications
+        are omitted from the result. Returns None on failure.
+        """
+        try:
+            payload = {'telegram_ids': telegram_ids}
+            # A read-only lookup, so it is safe to retry despite being a POST.
+            response = await self._request(
+                'post', '/api/v1/sessions/telegram/status/batch', idempotent=True, json=payload
+            )
+            response.raise_for_status()
+            data = response.json()
+            return {int(telegram_id): status for telegram_id, status in data['statuses'].items()}
+        except CircuitOpenError:
+            logger.warning('API service unavailable, not getting statuses in batch')
+            return None
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                f'HTTP error getting statuses for {len(telegram_ids)} users: '
+                f'{e.response.status_code} - {e.response.text}'
+            )
+            return None
+        except Exception as e:
+            logger.error(f'Unexpected error getting statuses in batch: {e}', exc_info=True)
+            return None
 
 
 api_client = ApiClient(base_url=settings.API_SERVICE_URL)
@@ -0,0 +1,104 @@
+import logging
+import random
+import time
+from enum import Enum
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    A minimal circuit breaker for calls to a single downstream service.
+
+    After `failure_threshold` consecutive failures the circuit opens and every call
+    is rejected immediately for `reset_timeout` seconds. After that a single trial
+    call is let through (half-open): its success closes the circuit, its failure
+    opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+        self.opened_total = 0
+        self.rejected_total = 0
+
+    def allow_request(self) -> bool:
+        """Returns True if a call may be attempted right now."""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected_total += 1
+                return False
+            self._set_state(CircuitState.HALF_OPEN)
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self.trial_in_flight:
+                self.rejected_total += 1
+                return False
+            self.trial_in_flight = True
+
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.trial_in_flight = False
+        if self.state != CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+            if self.state != CircuitState.OPEN:
+                self.opened_total += 1
+                self._set_state(CircuitState.OPEN)
+
+    def record_cancelled(self) -> None:
+        """
+        Records a call cancelled before its outcome was known, e.g. by a handler
+        timeout or shutdown. This says nothing about the service, so only a
+        half-open trial slot is released, for the next call to take.
+        """
+        self.trial_in_flight = False
+
+    def metrics(self) -> dict[str, float | str]:
+        """Returns a snapshot of the breaker state for monitoring."""
+        return {
+            'state': self.state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'opened_total': self.opened_total,
+            'rejected_total': self.rejected_total,
+        }
+
+    def _set_state(self, state: CircuitState) -> None:
+        logger.warning(f'Circuit "{self.name}" changed state: {self.state.value} -> {state.value}')
+        self.state = state
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Returns a "full jitter" exponential backoff delay for the given retry attempt
+    (0-based): a random value between 0 and min(cap, base * 2**attempt).
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -3,9 +3,18 @@ import logging
 
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
+from prometheus_client import REGISTRY, start_http_server
 
 from app.bot.handlers import router as main_router
+from app.bot.middlewares import (
+    HandlerMetricsMiddleware,
+    HandlerTracingMiddleware,
+    ThrottlingMiddleware,
+)
 from app.core.config import settings
+from app.core.metrics import ApiClientCollector
+from app.core.tracing import setup_tracing
+from app.internal_clients.api_client import api_client
 
 
 logging.basicConfig(
@@ -16,8 +25,22 @@ logging.basicConfig(
 async def main():
     bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
     dp = Dispatcher(storage=MemoryStorage())
+    dp.message.middleware(
+        ThrottlingMiddleware(
+            limit=settings.THROTTLE_RATE_LIMIT,
+            period=settings.THROTTLE_PERIOD,
+            max_tracked_users=settings.THROTTLE_MAX_TRACKED_USERS,
+        )
+    )
+    dp.message.middleware(HandlerMetricsMiddleware())
+    if settings.TRACING_ENABLED:
+        setup_tracing()
+        dp.message.middleware(HandlerTracingMiddleware())
     dp.include_router(main_router)
 
+    REGISTRY.register(ApiClientCollector(api_client))
+    start_http_server(settings.METRICS_PORT)
+
     logging.info('Starting Telegram Bot Service...')
     await dp.start_polling(bot)
 
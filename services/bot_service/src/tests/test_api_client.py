@@ -2,12 +2,16 @@
 Unit tests for the ApiClient.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from httpx import HTTPStatusError, Request, Response
+from httpx import ConnectError, HTTPStatusError, Request, Response
+from prometheus_client import CollectorRegistry
 
+from app.core.metrics import ApiClientCollector
 from app.internal_clients.api_client import ApiClient
+from app.internal_clients.resilience import CircuitBreaker, CircuitState
 
 
 BASE_URL = 'http://test-api'
@@ -15,8 +19,13 @@ BASE_URL = 'http://test-api'
 
 @pytest.fixture
 def api_client() -> ApiClient:
-    """Provides an ApiClient instance with a test URL."""
-    return ApiClient(base_url=BASE_URL)
+    """Provides an ApiClient instance with a test URL and no backoff delays."""
+    return ApiClient(
+        base_url=BASE_URL,
+        max_retries=2,
+        backoff_base=0,
+        circuit_breaker=CircuitBreaker('test', failure_threshold=2, reset_timeout=60),
+    )
 
 
 @pytest.mark.asyncio
@@ -100,3 +109,160 @@ async def test_get_status_http_error(mock_async_client_cls, api_client: ApiClien
     result = await api_client.get_telegram_application_status(telegram_id=123)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_get_statuses_batch_success(mock_async_client_cls, api_client: ApiClient):
+    """Test that the batch lookup returns statuses keyed by integer telegram_id."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json = MagicMock(
+        return_value={'statuses': {'123': 'new', '456': 'draft'}, 'not_found': [789]}
+    )
+    mock_client.post.return_value = mock_response
+
+    result = await api_client.get_telegram_application_statuses([123, 456, 789])
+
+    assert result == {123: 'new', 456: 'draft'}
+    mock_client.post.assert_awaited_once_with(
+        f'{BASE_URL}/api/v1/sessions/telegram/status/batch',
+        json={'telegram_ids': [123, 456, 789]},
+    )
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_get_status_retries_transient_errors(mock_async_client_cls, api_client: ApiClient):
+    """Test that transport errors are retried and a later success is returned."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    mock_response = AsyncMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.status_code = 200
+    mock_response.json = MagicMock(return_value={'status': 'new'})
+    mock_client.get.side_effect = [ConnectError('refused'), mock_response]
+
+    result = await api_client.get_telegram_application_status(telegram_id=123)
+
+    assert result == 'new'
+    assert mock_client.get.await_count == 2
+    assert api_client.outcomes['retry'] == 1
+    assert api_client.outcomes['success'] == 1
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_get_status_retries_5xx_responses(mock_async_client_cls, api_client: ApiClient):
+    """Test that 5xx responses are retried until retries are exhausted."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    mock_client.get.return_value = Response(503, request=Request('GET', BASE_URL))
+
+    result = await api_client.get_telegram_application_status(telegram_id=123)
+
+    assert result is None
+    assert mock_client.get.await_count == 3
+    assert api_client.outcomes['error'] == 1
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_client_errors_are_not_retried(mock_async_client_cls, api_client: ApiClient):
+    """Test that 4xx responses are neither retried nor counted against the circuit."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    mock_client.post.return_value = Response(422, request=Request('POST', BASE_URL))
+
+    result = await api_client.create_telegram_session(telegram_id=123)
+
+    assert result is None
+    mock_client.post.assert_awaited_once()
+    assert api_client.circuit_breaker.consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_open_circuit_fails_fast(mock_async_client_cls, api_client: ApiClient):
+    """Test that once the circuit opens, calls are rejected without network access."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    mock_client.get.side_effect = ConnectError('refused')
+
+    for _ in range(2):
+        assert await api_client.get_telegram_application_status(telegram_id=123) is None
+
+    assert api_client.circuit_breaker.state == CircuitState.OPEN
+    calls_before = mock_client.get.await_count
+
+    result = await api_client.get_telegram_application_status(telegram_id=123)
+
+    assert result is None
+    assert mock_client.get.await_count == calls_before
+    metrics = api_client.metrics()
+    assert metrics['outcomes']['circuit_open'] == 1
+    assert metrics['circuit']['state'] == 'open'
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_collector_exposes_outcomes_and_circuit_state(
+    mock_async_client_cls, api_client: ApiClient
+):
+    """Test that call outcomes and the circuit state are exported to Prometheus."""
+    mock_client = AsyncMock()
+    mock_client.post.side_effect = ConnectError('down')
+    mock_async_client_cls.return_value.__aenter__.return_value = mock_client
+    registry = CollectorRegistry()
+    registry.register(ApiClientCollector(api_client))
+
+    for _ in range(3):
+        await api_client.create_telegram_session(telegram_id=1)
+
+    assert registry.get_sample_value('bot_api_client_calls_total', {'outcome': 'error'}) == 2
+    assert registry.get_sample_value('bot_api_client_calls_total', {'outcome': 'circuit_open'}) == 1
+    assert registry.get_sample_value('bot_api_client_circuit_state', {'state': 'open'}) == 1
+    assert registry.get_sample_value('bot_api_client_circuit_opened_total') == 1
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_cancelled_trial_call_releases_the_circuit(
+    mock_async_client_cls, api_client: ApiClient
+):
+    """Test that a cancelled half-open trial frees the slot for the next call."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    breaker = api_client.circuit_breaker
+    breaker.state, breaker.opened_at = CircuitState.OPEN, 0.0
+    mock_client.get.side_effect = asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        await api_client.get_telegram_application_status(telegram_id=123)
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.trial_in_flight is False
+    assert api_client.metrics()['outcomes']['cancelled'] == 1
+
+    mock_client.get.side_effect = None
+    mock_client.get.return_value = Response(
+        200, json={'status': 'new'}, request=Request('GET', BASE_URL)
+    )
+
+    assert await api_client.get_telegram_application_status(telegram_id=123) == 'new'
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+@patch('app.internal_clients.api_client.httpx.AsyncClient')
+async def test_cancelled_calls_do_not_open_the_circuit(
+    mock_async_client_cls, api_client: ApiClient
+):
+    """Test that cancellations (handler timeouts, shutdown) are not counted as failures."""
+    mock_client = mock_async_client_cls.return_value.__aenter__.return_value
+    mock_client.get.side_effect = asyncio.CancelledError
+
+    for _ in range(5):
+        with pytest.raises(asyncio.CancelledError):
+            await api_client.get_telegram_application_status(telegram_id=123)
+
+    assert api_client.circuit_breaker.state == CircuitState.CLOSED
+    assert api_client.circuit_breaker.consecutive_failures == 0
+    assert api_client.metrics()['outcomes']['cancelled'] == 5
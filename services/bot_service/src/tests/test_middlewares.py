@@ -0,0 +1,138 @@
+"""
+Unit tests for the bot middlewares.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from prometheus_client import REGISTRY
+
+from app.bot.middlewares import (
+    THROTTLED_MESSAGE,
+    HandlerMetricsMiddleware,
+    HandlerTracingMiddleware,
+    SlidingWindowLimiter,
+    ThrottlingMiddleware,
+)
+
+
+class TestSlidingWindowLimiter:
+    """Test suite for the per-user sliding-window limiter."""
+
+    @patch('app.bot.middlewares.time.monotonic')
+    def test_limit_within_window(self, mock_monotonic):
+        """Test that hits over the limit are rejected until the window slides."""
+        limiter = SlidingWindowLimiter(limit=2, period=10, max_keys=100)
+
+        mock_monotonic.return_value = 0.0
+        assert limiter.hit(1) == (True, False)
+        mock_monotonic.return_value = 5.0
+        assert limiter.hit(1) == (True, False)
+        assert limiter.hit(1) == (False, True)
+        assert limiter.hit(1) == (False, False)
+
+        mock_monotonic.return_value = 10.0
+        assert limiter.hit(1) == (True, False)
+
+    def test_users_are_limited_independently(self):
+        """Test that one user's hits do not affect another user."""
+        limiter = SlidingWindowLimiter(limit=1, period=60, max_keys=100)
+
+        assert limiter.hit(1)[0] is True
+        assert limiter.hit(1)[0] is False
+        assert limiter.hit(2)[0] is True
+
+    def test_tracked_users_are_bounded(self):
+        """Test that the least recently seen users are evicted beyond max_keys."""
+        limiter = SlidingWindowLimiter(limit=1, period=60, max_keys=2)
+
+        limiter.hit(1)
+        limiter.hit(2)
+        limiter.hit(1)
+        limiter.hit(3)
+
+        assert len(limiter) == 2
+        assert limiter.hit(2)[0] is True
+        assert limiter.hit(1)[0] is True
+
+
+@pytest.mark.asyncio
+class TestThrottlingMiddleware:
+    """Test suite for the throttling middleware."""
+
+    async def test_passes_allowed_messages(self, mock_message):
+        """Test that messages within the limit reach the handler."""
+        middleware = ThrottlingMiddleware(limit=1, period=60, max_tracked_users=100)
+        handler = AsyncMock(return_value='handled')
+
+        result = await middleware(handler, mock_message, {})
+
+        assert result == 'handled'
+        handler.assert_awaited_once_with(mock_message, {})
+        mock_message.answer.assert_not_awaited()
+
+    async def test_throttles_with_single_warning(self, mock_message):
+        """Test that excess messages are dropped and the user is warned once."""
+        middleware = ThrottlingMiddleware(limit=1, period=60, max_tracked_users=100)
+        handler = AsyncMock()
+
+        for _ in range(3):
+            await middleware(handler, mock_message, {})
+
+        handler.assert_awaited_once()
+        mock_message.answer.assert_awaited_once_with(THROTTLED_MESSAGE)
+
+
+@pytest.mark.asyncio
+class TestHandlerMetricsMiddleware:
+    """Test suite for the handler latency middleware."""
+
+    @staticmethod
+    def _count(outcome: str) -> float:
+        labels = {'handler': 'cmd_test', 'outcome': outcome}
+        return REGISTRY.get_sample_value('bot_handler_duration_seconds_count', labels) or 0
+
+    async def test_records_latency_by_handler(self, mock_message):
+        """Test that successful and failing handler calls are observed separately."""
+        middleware = HandlerMetricsMiddleware()
+
+        async def cmd_test(event, data):
+            return 'handled'
+
+        data = {'handler': HandlerObject(callback=cmd_test)}
+        before_success, before_error = self._count('success'), self._count('error')
+
+        assert await middleware(cmd_test, mock_message, data) == 'handled'
+        with pytest.raises(RuntimeError):
+            await middleware(AsyncMock(side_effect=RuntimeError), mock_message, data)
+
+        assert self._count('success') == before_success + 1
+        assert self._count('error') == before_error + 1
+
+
+@pytest.mark.asyncio
+class TestHandlerTracingMiddleware:
+    """Test suite for the handler tracing middleware."""
+
+    async def test_handler_runs_inside_its_span(self, mock_message):
+        """Test that the handler runs with its own span current, so outgoing calls join it."""
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        middleware = HandlerTracingMiddleware()
+
+        async def cmd_test(event, data):
+            return trace.get_current_span().get_span_context()
+
+        data = {'handler': HandlerObject(callback=cmd_test)}
+        with patch('app.bot.middlewares.tracer', provider.get_tracer(__name__)):
+            span_context = await middleware(cmd_test, mock_message, data)
+
+        (span,) = exporter.get_finished_spans()
+        assert span.name == 'bot cmd_test'
+        assert span.context.span_id == span_context.span_id
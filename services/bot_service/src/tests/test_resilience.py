@@ -0,0 +1,71 @@
+"""
+Unit tests for the circuit breaker and backoff helpers.
+"""
+
+from unittest.mock import patch
+
+from app.internal_clients.resilience import CircuitBreaker, CircuitState, backoff_delay
+
+
+def test_circuit_opens_after_threshold():
+    """Test that consecutive failures open the circuit and reject calls."""
+    breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=30)
+
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.allow_request() is False
+    assert breaker.metrics()['rejected_total'] == 1
+    assert breaker.metrics()['opened_total'] == 1
+
+
+def test_success_resets_failure_count():
+    """Test that a success between failures keeps the circuit closed."""
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+@patch('app.internal_clients.resilience.time.monotonic')
+def test_half_open_allows_single_trial(mock_monotonic):
+    """Test that after the reset timeout only one trial call is let through."""
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    mock_monotonic.return_value = 131.0
+    assert breaker.allow_request() is True
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request() is True
+
+
+@patch('app.internal_clients.resilience.time.monotonic')
+def test_failed_trial_reopens_circuit(mock_monotonic):
+    """Test that a failed half-open trial opens the circuit again."""
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    mock_monotonic.return_value = 131.0
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_backoff_delay_is_capped():
+    """Test that the jittered delay never exceeds the cap."""
+    for attempt in range(10):
+        delay = backoff_delay(attempt, base=0.5, cap=2.0)
+        assert 0 <= delay <= min(2.0, 0.5 * 2**attempt)
@@ -85,3 +85,25 @@ async def get_download_link(file_id: str, s3_client: S3Client = Depends(get_s3_c
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f'An S3 error occurred: {e}',
         ) from e
+
+
+@router.delete(
+    '/{file_id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Delete a stored file',
+)
+async def delete_file(file_id: str, s3_client: S3Client = Depends(get_s3_client)):
+    """
+    Deletes a file from MinIO, e.g. a documents archive that api-service no
+    longer references. Deleting a missing file succeeds, so retries are safe.
+    Only other services may call it: the gateway does not proxy DELETE.
+    """
+    try:
+        await s3_client.delete_object(Bucket=settings.MINIO_BUCKET_NAME, Key=file_id)
+    except ClientError as e:
+        logger.error(f'Failed to delete file_id {file_id} from S3.', exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f'An S3 error occurred: {e}',
+        ) from e
+    logger.info(f'Deleted file_id "{file_id}".')
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,6 +12,12 @@ class Settings(BaseSettings):
     MINIO_ROOT_PASSWORD: str
     MINIO_BUCKET_NAME: str
 
+    # OpenTelemetry tracing: 'otlp' sends spans to the collector, 'file' appends them as JSON lines
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal['otlp', 'file'] = 'otlp'
+    TRACING_OTLP_ENDPOINT: str = 'http://jaeger:4318/v1/traces'
+    TRACING_FILE_PATH: str = 'traces.jsonl'
+
     model_config = SettingsConfigDict(env_file='.env', extra='ignore')
 
 
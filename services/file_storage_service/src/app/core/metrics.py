@@ -0,0 +1,97 @@
+import time
+from typing import Any
+
+from prometheus_client import Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling HTTP requests, by route template.',
+    ['method', 'route', 'status'],
+)
+S3_REQUEST_LATENCY = Histogram(
+    's3_request_duration_seconds',
+    'Time spent in S3 API calls, by operation.',
+    ['operation', 'outcome'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'HTTP requests currently being handled.', ['method']
+)
+
+
+class PrometheusMiddleware:
+    """
+    Records the latency and the number of in-flight HTTP requests.
+
+    Requests are labelled with the route template (e.g. '/api/v1/files/{file_id}/download-link'),
+    never the raw path, to keep label cardinality bounded. Requests that match
+    no route share the 'unmatched' label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope.
+            route = scope.get('route')
+            REQUEST_LATENCY.labels(
+                method=method,
+                route=getattr(route, 'path', 'unmatched'),
+                status=str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+def _start_s3_timer(model: Any, context: dict[str, Any], **kwargs: Any) -> None:
+    context['metrics_operation'] = model.name
+    context['metrics_start'] = time.perf_counter()
+
+
+def _observe_s3_call(context: dict[str, Any], outcome: str) -> None:
+    start = context.pop('metrics_start', None)
+    if start is not None:
+        S3_REQUEST_LATENCY.labels(operation=context['metrics_operation'], outcome=outcome).observe(
+            time.perf_counter() - start
+        )
+
+
+def _on_s3_response(http_response: Any, context: dict[str, Any], **kwargs: Any) -> None:
+    _observe_s3_call(context, 'success' if http_response.status_code < 400 else 'error')
+
+
+def _on_s3_exception(context: dict[str, Any], **kwargs: Any) -> None:
+    _observe_s3_call(context, 'exception')
+
+
+def instrument_s3_client(client: Any) -> None:
+    """
+    Times every API call made by a botocore S3 client, through its event hooks.
+
+    Managed transfers such as `upload_fileobj` are recorded as the underlying
+    calls (PutObject, or the multipart upload operations). Presigned URLs are
+    generated locally and make no calls.
+    """
+    events = client.meta.events
+    events.register('before-call.s3.*', _start_s3_timer)
+    events.register('after-call.s3.*', _on_s3_response)
+    events.register('after-call-error.s3.*', _on_s3_exception)
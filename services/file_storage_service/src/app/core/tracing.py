@@ -0,0 +1,86 @@
+from typing import Any
+
+from fastapi import FastAPI
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from app.core.config import settings
+
+
+# Scrapes and health checks would only add noise to the traces.
+EXCLUDED_URLS = 'metrics,api/v1/health'
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """Appends spans to a file as JSON lines, one span per line."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(
+            out=open(path, 'a', encoding='utf-8'),  # noqa: SIM115 - closed in shutdown()
+            formatter=lambda span: span.to_json(indent=None) + '\n',
+        )
+
+    def shutdown(self) -> None:
+        # Called by the span processor on TracerProvider.shutdown(), at interpreter exit.
+        self.out.close()
+
+
+def build_exporter() -> SpanExporter:
+    """Returns the span exporter selected by TRACING_EXPORTER."""
+    if settings.TRACING_EXPORTER == 'file':
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def trace_s3_client(client: Any, tracer_provider: TracerProvider | None = None) -> None:
+    """
+    Records a client span for every API call made by a botocore S3 client,
+    as a child of the current span.
+    """
+    tracer = trace.get_tracer(__name__, tracer_provider=tracer_provider)
+
+    def start_span(model: Any, context: dict[str, Any], **kwargs: Any) -> None:
+        context['otel_span'] = tracer.start_span(
+            f'S3.{model.name}',
+            kind=SpanKind.CLIENT,
+            attributes={'rpc.system': 'aws-api', 'rpc.service': 'S3', 'rpc.method': model.name},
+        )
+
+    def end_span(http_response: Any, context: dict[str, Any], **kwargs: Any) -> None:
+        span = context.pop('otel_span', None)
+        if span is not None:
+            span.set_attribute('http.status_code', http_response.status_code)
+            if http_response.status_code >= 400:
+                span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+    def fail_span(exception: Exception, context: dict[str, Any], **kwargs: Any) -> None:
+        span = context.pop('otel_span', None)
+        if span is not None:
+            span.record_exception(exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+    events = client.meta.events
+    events.register('before-call.s3.*', start_span)
+    events.register('after-call.s3.*', end_span)
+    events.register('after-call-error.s3.*', fail_span)
+
+
+def setup_tracing(app: FastAPI) -> None:
+    """
+    Enables OpenTelemetry tracing of incoming requests. S3 calls are traced by
+    `get_s3_client`, and spans join the traces propagated by api-service.
+    """
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: 'file-storage-service'}))
+    provider.add_span_processor(BatchSpanProcessor(build_exporter()))
+    trace.set_tracer_provider(provider)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=provider, excluded_urls=EXCLUDED_URLS)
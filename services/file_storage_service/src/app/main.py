@@ -1,10 +1,13 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.api import files
 from app.core.config import settings
+from app.core.metrics import PrometheusMiddleware
+from app.core.tracing import setup_tracing
 
 from .s3_client import create_bucket_if_not_exists
 
@@ -21,6 +24,10 @@ async def lifespan(app: FastAPI):
 
 
 app = FastAPI(title=settings.APP_TITLE, lifespan=lifespan)
+app.add_middleware(PrometheusMiddleware)
+
+if settings.TRACING_ENABLED:
+    setup_tracing(app)
 
 
 app.include_router(files.router, prefix='/api/v1/files', tags=['Files'])
@@ -29,3 +36,8 @@ app.include_router(files.router, prefix='/api/v1/files', tags=['Files'])
 @app.get('/api/v1/health')
 def health_check():
     return {'status': 'ok', 'service': 'File Storage Service'}
+
+
+@app.get('/metrics', include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
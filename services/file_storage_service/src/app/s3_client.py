@@ -4,6 +4,8 @@ import aioboto3
 from botocore.exceptions import ClientError
 
 from app.core.config import settings
+from app.core.metrics import instrument_s3_client
+from app.core.tracing import trace_s3_client
 
 
 logger = logging.getLogger(__name__)
@@ -22,6 +24,9 @@ async def get_s3_client():
     when it's no longer needed.
     """
     async with session.client('s3', endpoint_url=settings.S3_ENDPOINT_URL) as s3:
+        instrument_s3_client(s3)
+        if settings.TRACING_ENABLED:
+            trace_s3_client(s3)
         yield s3
 
 
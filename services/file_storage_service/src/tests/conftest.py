@@ -55,12 +55,17 @@ def s3_client() -> AsyncGenerator:
             raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'GetObject')
         return {'Body': io.BytesIO(storage[Key])}
 
+    async def async_delete_object(Bucket, Key):
+        storage.pop(Key, None)
+        return {'ResponseMetadata': {'HTTPStatusCode': 204}}
+
     def generate_presigned_url(ClientMethod, Params, ExpiresIn):
         return f'{settings.S3_PUBLIC_URL}/{Params["Key"]}?X-Amz-Test'
 
     client.upload_fileobj.side_effect = async_upload_fileobj
     client.head_object.side_effect = async_head_object
     client.get_object.side_effect = async_get_object
+    client.delete_object.side_effect = async_delete_object
     client.generate_presigned_url.side_effect = generate_presigned_url
 
     return client
@@ -93,3 +93,43 @@ class TestDownloadLinkEndpoint:
         response = await test_client.get(f'/api/v1/files/{file_id}/download-link')
         assert response.status_code == 500
         assert 'An S3 error occurred' in response.json()['detail']
+
+
+class TestDeleteEndpoint:
+    @pytest.mark.asyncio
+    async def test_delete_file(self, test_client: AsyncClient):
+        file_to_upload = {'file': ('archive.zip', io.BytesIO(b'zip'), 'application/zip')}
+        upload_resp = await test_client.post('/api/v1/files/', files=file_to_upload)
+        file_id = upload_resp.json()['file_id']
+
+        response = await test_client.delete(f'/api/v1/files/{file_id}')
+        assert response.status_code == 204
+
+        link_resp = await test_client.get(f'/api/v1/files/{file_id}/download-link')
+        assert link_resp.status_code == 404
+        again = await test_client.delete(f'/api/v1/files/{file_id}')
+        assert again.status_code == 204
+
+    @pytest.mark.asyncio
+    async def test_delete_file_s3_error(self, test_client: AsyncClient, s3_client):
+        async def delete_object_fail(**kwargs):
+            raise ClientError(
+                {'Error': {'Code': '500', 'Message': 'Internal Error'}}, 'DeleteObject'
+            )
+
+        s3_client.delete_object.side_effect = delete_object_fail
+
+        response = await test_client.delete('/api/v1/files/archive.zip')
+        assert response.status_code == 500
+        assert 'An S3 error occurred' in response.json()['detail']
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_metrics_expose_request_latency_by_route(self, test_client: AsyncClient):
+        await test_client.get('/api/v1/files/some-file.txt/download-link')
+
+        response = await test_client.get('/metrics')
+
+        assert response.status_code == 200
+        assert 'route="/api/v1/files/{file_id}/download-link",status="404"' in response.text
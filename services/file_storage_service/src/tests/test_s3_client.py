@@ -3,11 +3,20 @@ Unit tests for app.s3_client.py
 Covers bucket creation, S3 errors, and the async generator.
 """
 
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 from botocore.exceptions import ClientError
-
+from botocore.hooks import HierarchicalEmitter
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+from prometheus_client import REGISTRY
+
+from app.core.metrics import instrument_s3_client
+from app.core.tracing import trace_s3_client
 from app.s3_client import create_bucket_if_not_exists, get_s3_client
 
 
@@ -64,3 +73,51 @@ async def test_create_bucket_if_not_exists_unexpected_error(monkeypatch):
 
     with pytest.raises(ClientError):
         await create_bucket_if_not_exists()
+
+
+def test_s3_calls_are_timed_by_operation():
+    def sample(outcome):
+        return REGISTRY.get_sample_value(
+            's3_request_duration_seconds_count', {'operation': 'HeadBucket', 'outcome': outcome}
+        )
+
+    before_success, before_exception = sample('success') or 0, sample('exception') or 0
+    events = HierarchicalEmitter()
+    instrument_s3_client(SimpleNamespace(meta=SimpleNamespace(events=events)))
+    model = SimpleNamespace(name='HeadBucket')
+
+    context = {}
+    events.emit('before-call.s3.HeadBucket', model=model, context=context)
+    response = SimpleNamespace(status_code=200)
+    events.emit('after-call.s3.HeadBucket', http_response=response, model=model, context=context)
+    context = {}
+    events.emit('before-call.s3.HeadBucket', model=model, context=context)
+    events.emit('after-call-error.s3.HeadBucket', exception=ConnectionError(), context=context)
+
+    assert sample('success') == before_success + 1
+    assert sample('exception') == before_exception + 1
+
+
+def test_s3_calls_are_traced():
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    events = HierarchicalEmitter()
+    trace_s3_client(SimpleNamespace(meta=SimpleNamespace(events=events)), tracer_provider=provider)
+    model = SimpleNamespace(name='PutObject')
+
+    with provider.get_tracer(__name__).start_as_current_span('request') as request_span:
+        context = {}
+        events.emit('before-call.s3.PutObject', model=model, context=context)
+        response = SimpleNamespace(status_code=200)
+        events.emit('after-call.s3.PutObject', http_response=response, model=model, context=context)
+        context = {}
+        events.emit('before-call.s3.PutObject', model=model, context=context)
+        events.emit('after-call-error.s3.PutObject', exception=ConnectionError(), context=context)
+
+    spans = [span for span in exporter.get_finished_spans() if span.name != 'request']
+    ok_span, failed_span = spans
+    assert ok_span.name == 'S3.PutObject'
+    assert ok_span.parent.span_id == request_span.get_span_context().span_id
+    assert ok_span.attributes['http.status_code'] == 200
+    assert failed_span.status.status_code == StatusCode.ERROR